@@ -0,0 +1,157 @@
+"""Per-user daily activity history with rolling-window sums.
+
+Each user gets a fixed-size ring of daily buckets per metric (an
+``array('H')``), so memory is bounded by ``days`` regardless of how long the
+bot runs. Running totals for each configured window are adjusted as days
+roll over, which makes ``window_sum`` O(1). History is persisted as a packed
+binary file, not JSON.
+"""
+
+from array import array
+from pathlib import Path
+import os
+import struct
+import tempfile
+import time
+
+PATH = Path("data/activity_history.bin")
+
+METRICS = ("chat_msgs", "wins")
+_METRIC_INDEX = {name: i for i, name in enumerate(METRICS)}
+_BUCKET_MAX = 0xFFFF
+
+_HEADER = struct.Struct("<4sHHI")  # magic, version, days, row count
+_ROW_HEADER = struct.Struct("<QI")  # user_id, newest day
+_MAGIC = b"THCH"
+_VERSION = 1
+
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+
+class _Row:
+    __slots__ = ("day", "buckets", "sums")
+
+    def __init__(self, day: int, days: int, windows: int):
+        self.day = day
+        self.buckets = array("H", bytes(2 * days * len(METRICS)))
+        self.sums = array("I", bytes(4 * windows * len(METRICS)))
+
+
+class ActivityHistory:
+    def __init__(self, days: int = 30, windows: tuple[int, ...] = (7, 30)):
+        if any(w > days for w in windows):
+            raise ValueError("Every window must fit inside the history length")
+        self.days = days
+        self.windows = tuple(windows)
+        self._window_index = {w: i for i, w in enumerate(self.windows)}
+        self._rows: dict[int, _Row] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _advance(self, row: _Row, today: int):
+        """Roll ``row`` forward to ``today``, expiring buckets that leave each window."""
+        if today <= row.day:
+            return
+        days, buckets, sums = self.days, row.buckets, row.sums
+        if today - row.day >= days:
+            buckets[:] = array("H", bytes(len(buckets) * 2))
+            sums[:] = array("I", bytes(len(sums) * 4))
+            row.day = today
+            return
+        n_windows = len(self.windows)
+        for d in range(row.day + 1, today + 1):
+            for m in range(len(METRICS)):
+                base = m * days
+                for wi, w in enumerate(self.windows):
+                    sums[m * n_windows + wi] -= buckets[base + (d - w) % days]
+                buckets[base + d % days] = 0
+        row.day = today
+
+    def _row(self, user_id: int, today: int) -> _Row:
+        row = self._rows.get(user_id)
+        if row is None:
+            row = self._rows[user_id] = _Row(today, self.days, len(self.windows))
+        else:
+            self._advance(row, today)
+        return row
+
+    def add(self, user_id: int, metric: str, amount: int = 1, day: int | None = None):
+        today = _today() if day is None else day
+        row = self._row(user_id, today)
+        m = _METRIC_INDEX[metric]
+        slot = m * self.days + today % self.days
+        added = min(amount, _BUCKET_MAX - row.buckets[slot])
+        row.buckets[slot] += added
+        n_windows = len(self.windows)
+        for wi in range(n_windows):
+            row.sums[m * n_windows + wi] += added
+
+    def window_sum(self, user_id: int, metric: str, window: int, day: int | None = None) -> int:
+        row = self._rows.get(user_id)
+        if row is None:
+            return 0
+        self._advance(row, _today() if day is None else day)
+        return row.sums[_METRIC_INDEX[metric] * len(self.windows) + self._window_index[window]]
+
+    def series(self, user_id: int, metric: str, n: int, day: int | None = None) -> list[int]:
+        """Daily counts for the last ``n`` days (oldest first, today last)."""
+        n = min(n, self.days)
+        row = self._rows.get(user_id)
+        if row is None:
+            return [0] * n
+        today = _today() if day is None else day
+        self._advance(row, today)
+        base = _METRIC_INDEX[metric] * self.days
+        return [row.buckets[base + d % self.days] for d in range(today - n + 1, today + 1)]
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                        #
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> list[tuple[int, int, bytes]]:
+        """Cheap copy of the live rows, dropping users idle for the whole history."""
+        cutoff = _today() - self.days
+        for user_id in [uid for uid, row in self._rows.items() if row.day <= cutoff]:
+            del self._rows[user_id]
+        return [(uid, row.day, row.buckets.tobytes()) for uid, row in self._rows.items()]
+
+    def save(self, snapshot: list[tuple[int, int, bytes]], path: Path = PATH):
+        """Write a ``snapshot()`` to disk. Blocking — call from a worker thread."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=str(path.parent), delete=False, suffix=".tmp") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.days, len(snapshot)))
+            for user_id, day, buckets in snapshot:
+                f.write(_ROW_HEADER.pack(user_id, day))
+                f.write(buckets)
+            tmp = f.name
+        os.replace(tmp, str(path))
+
+    def load(self, path: Path = PATH):
+        if not path.exists():
+            return
+        data = path.read_bytes()
+        if len(data) < _HEADER.size:
+            return
+        magic, version, days, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION or days != self.days:
+            return  # stale format or history length changed; start fresh
+        row_size = _ROW_HEADER.size + 2 * days * len(METRICS)
+        offset = _HEADER.size
+        n_windows = len(self.windows)
+        for _ in range(count):
+            if offset + row_size > len(data):
+                break
+            user_id, day = _ROW_HEADER.unpack_from(data, offset)
+            row = _Row(day, days, n_windows)
+            row.buckets = array("H", data[offset + _ROW_HEADER.size:offset + row_size])
+            for m in range(len(METRICS)):
+                base = m * days
+                for wi, w in enumerate(self.windows):
+                    row.sums[m * n_windows + wi] = sum(
+                        row.buckets[base + d % days] for d in range(day - w + 1, day + 1)
+                    )
+            self._rows[user_id] = row
+            offset += row_size
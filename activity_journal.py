@@ -0,0 +1,119 @@
+"""Append-only journal of activity counter changes.
+
+Every counter change is written as one fixed-size record holding the user ID,
+the field and the field's *new* value. Because records carry absolute values,
+replaying a record twice is harmless, which keeps compaction simple:
+
+1. on the event loop, ``rotate()`` starts a new segment and hands back the
+   previous ones together with a snapshot taken at the same instant;
+2. in a worker thread, the snapshot is written to the activity database and
+   the old segments are deleted.
+
+If the bot dies anywhere in between, startup replays every remaining segment
+on top of the last snapshot.
+"""
+
+from pathlib import Path
+import logging
+import os
+import struct
+import threading
+
+from activity_stats import FIELDS, ActivityTable
+
+logger = logging.getLogger("thcbot")
+
+JOURNAL_DIR = Path("data/activity_journal")
+
+_FIELD_CODES = {name: i for i, name in enumerate(FIELDS)}
+
+# user_id (u64), field code (u8), new value (i64) — 17 bytes per event
+_RECORD = struct.Struct("<QBq")
+
+
+class ActivityJournal:
+    def __init__(self, directory: Path = JOURNAL_DIR):
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._seq = max(self._segment_seqs(), default=0) + 1
+        self._file = open(self._segment_path(self._seq), "ab")
+
+    def _segment_path(self, seq: int) -> Path:
+        return self._dir / f"{seq:08d}.log"
+
+    def _segment_seqs(self) -> list[int]:
+        seqs = []
+        for p in self._dir.glob("*.log"):
+            try:
+                seqs.append(int(p.stem))
+            except ValueError:
+                continue
+        return sorted(seqs)
+
+    def replay(self, activity: ActivityTable) -> set[int]:
+        """Apply every record from older segments onto ``activity``. Returns the IDs of
+        the users it touched: their replayed values are not in the database yet."""
+        count = 0
+        users: set[int] = set()
+        for seq in self._segment_seqs():
+            if seq >= self._seq:
+                continue
+            data = self._segment_path(seq).read_bytes()
+            usable = len(data) - len(data) % _RECORD.size  # drop a torn trailing record
+            for user_id, code, value in _RECORD.iter_unpack(data[:usable]):
+                if code >= len(FIELDS):
+                    continue
+                activity.get_or_create(user_id)[FIELDS[code]] = value
+                users.add(user_id)
+                count += 1
+        if count:
+            logger.info("Replayed %d activity journal records for %d users", count, len(users))
+        return users
+
+    def append(self, user_id: int, field: str, value: int):
+        """Record a new counter value. Cheap: only buffers in memory until ``sync``."""
+        record = _RECORD.pack(int(user_id), _FIELD_CODES[field], int(value))
+        with self._lock:
+            self._pending += record
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def sync(self):
+        """Write and fsync buffered records. Blocking — call from a worker thread."""
+        with self._lock:
+            if not self._pending:
+                return
+            self._file.write(self._pending)
+            self._pending.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def rotate(self) -> list[int]:
+        """Start a new segment. Returns the sequence numbers now covered by a snapshot
+        taken at the same instant; pass them to ``discard`` once it is persisted."""
+        with self._lock:
+            if self._pending:
+                self._file.write(self._pending)
+                self._pending.clear()
+            self._file.close()
+            old = [s for s in self._segment_seqs() if s <= self._seq]
+            self._seq += 1
+            self._file = open(self._segment_path(self._seq), "ab")
+        return old
+
+    def discard(self, seqs: list[int]):
+        """Delete compacted segments. Blocking — call from a worker thread."""
+        for seq in seqs:
+            try:
+                self._segment_path(seq).unlink()
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        self.sync()
+        with self._lock:
+            self._file.close()
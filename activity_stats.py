@@ -0,0 +1,90 @@
+"""Compact in-memory activity table keyed by integer snowflakes.
+
+``ActivityTable`` replaces the old ``{str(user_id): {"chat_msgs", "wins", "gmv"}}``
+dict-of-dicts. Each user is a ``UserStats`` record with ``__slots__`` (no
+per-record ``__dict__``), and keys are ints so callers never have to parse
+``int(uid_str)``. Both classes still answer the dict-style calls the cogs
+use (``stats["wins"]``, ``stats.get("gmv", 0)``, ``table.items()``), and
+``str`` keys are accepted for compatibility.
+"""
+
+from collections.abc import Mapping
+
+FIELDS = ("chat_msgs", "wins", "gmv")
+
+
+class UserStats:
+    __slots__ = FIELDS
+
+    def __init__(self, chat_msgs: int = 0, wins: int = 0, gmv: int = 0):
+        self.chat_msgs = chat_msgs
+        self.wins = wins
+        self.gmv = gmv
+
+    def __getitem__(self, field: str) -> int:
+        if field not in FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field: str, value: int):
+        if field not in FIELDS:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def get(self, field: str, default=None):
+        return getattr(self, field) if field in FIELDS else default
+
+    def keys(self):
+        return FIELDS
+
+    def as_dict(self) -> dict:
+        return {"chat_msgs": self.chat_msgs, "wins": self.wins, "gmv": self.gmv}
+
+    def __repr__(self):
+        return f"UserStats(chat_msgs={self.chat_msgs}, wins={self.wins}, gmv={self.gmv})"
+
+
+class ActivityTable(Mapping):
+    """Mapping of ``int`` user ID -> ``UserStats``."""
+
+    __slots__ = ("_rows",)
+
+    def __init__(self, records: Mapping | None = None):
+        self._rows: dict[int, UserStats] = {}
+        for user_id, stats in (records or {}).items():
+            self._rows[int(user_id)] = UserStats(
+                int(stats.get("chat_msgs", 0)),
+                int(stats.get("wins", 0)),
+                int(stats.get("gmv", 0)),
+            )
+
+    def __getitem__(self, user_id: int | str) -> UserStats:
+        return self._rows[int(user_id)]
+
+    def __contains__(self, user_id) -> bool:
+        try:
+            return int(user_id) in self._rows
+        except (TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, user_id: int | str, default=None):
+        return self._rows.get(int(user_id), default)
+
+    def items(self):
+        return self._rows.items()
+
+    def get_or_create(self, user_id: int) -> UserStats:
+        stats = self._rows.get(user_id)
+        if stats is None:
+            stats = self._rows[user_id] = UserStats()
+        return stats
+
+    def to_dict(self) -> dict:
+        """Plain ``{str(user_id): {...}}`` copy, safe to hand to a worker thread."""
+        return {str(user_id): stats.as_dict() for user_id, stats in self._rows.items()}
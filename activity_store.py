@@ -1,11 +1,20 @@
 from pathlib import Path
 import json
+import logging
+import sqlite3
 import tempfile
+import threading
 import os
 
+logger = logging.getLogger("thcbot")
+
 PATH = Path("data/activity.json")
+DB_PATH = Path("data/activity.db")
 WEEKLY_PATH = Path("data/weekly_snapshot.json")
 
+_conn: sqlite3.Connection | None = None
+_conn_lock = threading.Lock()
+
 
 def _safe_write(path: Path, data):
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -17,18 +26,74 @@ def _safe_write(path: Path, data):
     os.replace(tmp, str(path))
 
 
-def _read():
+def _read_json():
     if PATH.exists():
         try:
             return json.loads(PATH.read_text(encoding="utf-8"))
         except Exception:
             pass
-    # default structure: map of str(user_id) -> stats dict
     return {}
 
 
-def _write(data: dict):
-    _safe_write(PATH, data)
+def _get_conn() -> sqlite3.Connection:
+    """Open the activity database once (WAL mode) and run the JSON migration."""
+    global _conn
+    if _conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS activity ("
+            " user_id INTEGER PRIMARY KEY,"
+            " chat_msgs INTEGER NOT NULL DEFAULT 0,"
+            " wins INTEGER NOT NULL DEFAULT 0,"
+            " gmv INTEGER NOT NULL DEFAULT 0"
+            ")"
+        )
+        _conn = conn
+        _migrate_json(conn)
+    return _conn
+
+
+def _migrate_json(conn: sqlite3.Connection):
+    """One-shot import of the legacy data/activity.json into SQLite.
+
+    The JSON file is renamed to ``activity.json.migrated`` afterwards so the
+    import never runs twice.
+    """
+    if not PATH.exists():
+        return
+    legacy = _read_json()
+    _upsert_rows(conn, legacy)
+    os.replace(str(PATH), str(PATH.with_suffix(".json.migrated")))
+    logger.info("Migrated %d activity records from %s to %s", len(legacy), PATH, DB_PATH)
+
+
+def _upsert_rows(conn: sqlite3.Connection, records: dict):
+    rows = [
+        (
+            int(user_id),
+            int(stats.get("chat_msgs", 0)),
+            int(stats.get("wins", 0)),
+            int(stats.get("gmv", 0)),
+        )
+        for user_id, stats in records.items()
+    ]
+    if not rows:
+        return
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(
+            "INSERT INTO activity (user_id, chat_msgs, wins, gmv) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET "
+            "chat_msgs = excluded.chat_msgs, wins = excluded.wins, gmv = excluded.gmv",
+            rows,
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
 
 
 def load_activity() -> dict:
@@ -38,19 +103,34 @@ def load_activity() -> dict:
       "1234567890123": {"chat_msgs": int, "wins": int, "gmv": int}
     }
     """
-    return _read()
+    with _conn_lock:
+        rows = _get_conn().execute(
+            "SELECT user_id, chat_msgs, wins, gmv FROM activity"
+        ).fetchall()
+    return {
+        str(user_id): {"chat_msgs": chat_msgs, "wins": wins, "gmv": gmv}
+        for user_id, chat_msgs, wins, gmv in rows
+    }
 
 
 def save_activity(activity: dict):
-    _write(activity)
+    """Upsert the given users' stats. Users not present in ``activity`` are left untouched,
+    so callers can pass only the records that changed."""
+    with _conn_lock:
+        _upsert_rows(_get_conn(), activity)
 
 
 def load_weekly_snapshot() -> dict:
     """
     Returns:
     {
-      "wins_snapshot": {"user_id": int, ...},
-      "members_joined": [{"id": int, "name": str, "joined_at": str}, ...],
+      "weeks": {
+        "2026-W42": {
+          "wins": {"user_id": int, ...},
+          "chat_msgs": {"user_id": int, ...},
+          "members_joined": [{"id": int, "name": str, "joined_at": str}, ...]
+        }
+      },
       "snapshot_at": str | None
     }
     """
@@ -59,7 +139,7 @@ def load_weekly_snapshot() -> dict:
             return json.loads(WEEKLY_PATH.read_text(encoding="utf-8"))
         except Exception:
             pass
-    return {"wins_snapshot": {}, "members_joined": [], "snapshot_at": None}
+    return {"weeks": {}, "snapshot_at": None}
 
 
 def save_weekly_snapshot(data: dict):
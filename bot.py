@@ -9,11 +9,15 @@ from config import (
     BADGE_ROLE_IDS,
     BIG_WINS_CHANNEL_ID,
     MAIN_CHAT_ID,
+    RESOLVER_MAX_ENTRIES,
+    RESOLVER_TTL_SECONDS,
     TIER_ROLE_IDS,
     WELCOME_CHANNEL_ID,
     WEEKLY_SUMMARY_CHANNEL_ID,
     WINS_CHANNEL_ID,
 )
+from message_router import MessageRouter
+from resolver import Resolver
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
@@ -46,6 +50,12 @@ _EXTENSIONS = [
 class SonOfAndOn(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix="!", intents=intents)
+        self.router = MessageRouter(self)
+        self.resolver = Resolver(self, max_entries=RESOLVER_MAX_ENTRIES, ttl=RESOLVER_TTL_SECONDS)
+
+    async def on_message(self, message: discord.Message):
+        await self.router.dispatch(message)
+        await self.process_commands(message)
 
     async def setup_hook(self):
         for ext in _EXTENSIONS:
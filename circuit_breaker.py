@@ -0,0 +1,119 @@
+"""Retry with jittered exponential backoff, and a circuit breaker.
+
+``retry_async`` re-runs a coroutine factory on transient errors, sleeping a
+random ("full jitter") delay that doubles each attempt up to a cap, or the
+server's ``Retry-After`` if it asked for longer.
+
+``CircuitBreaker`` counts consecutive failed calls. After ``failure_threshold``
+of them it opens and ``allow()`` fast-fails every call for ``reset_timeout``
+seconds; then one probe call is let through (half-open). A successful probe
+closes the breaker, a failed one re-opens it.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger("thcbot")
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+def _retry_after(exc: Exception) -> float:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def retry_async(
+    call: Callable[[], Awaitable[T]],
+    *,
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    retry_on: tuple[type[BaseException], ...],
+    name: str = "call",
+) -> T:
+    for attempt in range(attempts):
+        try:
+            return await call()
+        except retry_on as e:
+            if attempt == attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            delay = min(max_delay, max(delay, _retry_after(e)))
+            logger.warning(
+                "%s failed (%s); retry %d/%d in %.2fs",
+                name, type(e).__name__, attempt + 1, attempts - 1, delay,
+            )
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probing = False
+
+    @property
+    def probe_due(self) -> bool:
+        """Whether the next ``allow()`` would let a probe call through."""
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= self._reset_timeout
+        return self.state == HALF_OPEN and not self._probing
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now. Counts a rejection if not."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self._reset_timeout:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> bool:
+        """Returns True if this success closed an open breaker."""
+        self.failures = 0
+        self._probing = False
+        if self.state == CLOSED:
+            return False
+        self.state = CLOSED
+        logger.info("Circuit %s closed.", self.name)
+        return True
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self._failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+                logger.warning(
+                    "Circuit %s opened after %d failure(s); fast-failing for %.0fs.",
+                    self.name, self.failures, self._reset_timeout,
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
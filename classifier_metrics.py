@@ -0,0 +1,128 @@
+"""Latency, token and cost accounting for the wins classifier.
+
+``LatencyHistogram`` keeps counts in fixed buckets, so memory and the cost of
+a percentile query don't depend on how many calls were observed.
+``ClassifierMetrics`` holds the histograms, token totals taken from each
+response's ``usage`` and event counters, and appends one line per OpenAI
+call to a daily JSONL cost ledger (``data/wins_ai_costs/YYYY-MM-DD.jsonl``,
+UTC days). Ledger files older than ``retention_days`` are deleted.
+"""
+
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
+import logging
+
+logger = logging.getLogger("thcbot")
+
+LEDGER_DIR = Path("data/wins_ai_costs")
+
+# Upper bounds in seconds; the last bucket is everything slower.
+LATENCY_BOUNDS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+
+
+class LatencyHistogram:
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the ``p``-th percentile (0–100),
+        capped at the slowest observation."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+
+class ClassifierMetrics:
+    def __init__(
+        self,
+        prices: dict[str, tuple[float, float]],
+        retention_days: int,
+        ledger_dir: Path = LEDGER_DIR,
+    ):
+        self._prices = prices
+        self._retention_days = retention_days
+        self._ledger_dir = ledger_dir
+        self.since = datetime.now(timezone.utc)
+
+        self.latency: dict[str, LatencyHistogram] = {}  # stage -> histogram
+        self.end_to_end = LatencyHistogram()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.cost_by_stage: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def incr(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        input_price, output_price = self._prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    def record_call(self, stage: str, model: str, seconds: float, usage, message_id: int | None = None):
+        """Record one completed OpenAI call. ``usage`` is ``response.usage`` (may be None)."""
+        prompt = getattr(usage, "prompt_tokens", 0) or 0
+        completion = getattr(usage, "completion_tokens", 0) or 0
+        cost = self.cost(model, prompt, completion)
+
+        self.latency.setdefault(stage, LatencyHistogram()).observe(seconds)
+        self.calls += 1
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cost_usd += cost
+        self.cost_by_stage[stage] = self.cost_by_stage.get(stage, 0.0) + cost
+
+        self._append_ledger({
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "stage": stage,
+            "model": model,
+            "message_id": message_id,
+            "latency_ms": round(seconds * 1000),
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "cost_usd": round(cost, 6),
+        })
+
+    def _append_ledger(self, entry: dict):
+        now = datetime.now(timezone.utc)
+        path = self._ledger_dir / f"{now:%Y-%m-%d}.jsonl"
+        try:
+            if not path.exists():
+                self._ledger_dir.mkdir(parents=True, exist_ok=True)
+                self._prune_ledger(now)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        except OSError:
+            logger.warning("Could not write wins AI cost ledger %s", path, exc_info=True)
+
+    def _prune_ledger(self, now: datetime):
+        cutoff = f"{now - timedelta(days=self._retention_days):%Y-%m-%d}"
+        for old in self._ledger_dir.glob("*.jsonl"):
+            if old.stem < cutoff:
+                old.unlink(missing_ok=True)
@@ -200,15 +200,60 @@ class Admin(commands.Cog):
 
         from cogs.badges import assign_badge  # lazy import — badges cog loaded after admin
 
+        # The role edit waits its turn in the role queue; don't miss the 3 s deadline.
+        await interaction.response.defer(ephemeral=True)
         try:
             await assign_badge(user, badge, reason=f"Manual override by {interaction.user}")
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 f"✅ Assigned **{badge}** badge to {user.mention}.",
                 allowed_mentions=discord.AllowedMentions(users=[user]),
                 ephemeral=True,
             )
         except Exception as e:
-            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            await interaction.followup.send(f"❌ {e}", ephemeral=True)
+
+    # --- /handler_stats ---
+
+    @app_commands.command(
+        name="handler_stats",
+        description="Show per-handler message routing timings (staff only).",
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def handler_stats(self, interaction: discord.Interaction):
+        if not is_staff(interaction.user):
+            return await interaction.response.send_message("⛔ You don't have permission to use this.", ephemeral=True)
+        stats = self.bot.router.stats
+        if not stats:
+            return await interaction.response.send_message("_No message handlers registered._", ephemeral=True)
+        lines = ["**Message handlers** (calls · avg · max · errors)"]
+        for name, s in sorted(stats.items()):
+            avg_ms = s.total / s.calls * 1000 if s.calls else 0.0
+            lines.append(
+                f"• `{name}` — {s.calls:,} · {avg_ms:.1f} ms · {s.max * 1000:.1f} ms · {s.errors}"
+            )
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+    # --- /resolver_stats ---
+
+    @app_commands.command(
+        name="resolver_stats",
+        description="Show guild/member/user/channel lookup cache hit rates (staff only).",
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def resolver_stats(self, interaction: discord.Interaction):
+        if not is_staff(interaction.user):
+            return await interaction.response.send_message("⛔ You don't have permission to use this.", ephemeral=True)
+        resolver = self.bot.resolver
+        lines = [
+            f"**Lookups** ({len(resolver):,} fetched objects cached)"
+            " — gateway · cached · shared · fetched · errors"
+        ]
+        for kind, s in resolver.stats.items():
+            lines.append(
+                f"• `{kind}` — {s.gateway:,} · {s.cached:,} · {s.shared:,} · {s.fetched:,} · {s.errors}"
+                f" ({s.hit_rate:.0%} without a REST call)"
+            )
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
 
     # --- /bind_role_react ---
 
@@ -1,14 +1,21 @@
 import asyncio
 import atexit
 import logging
-import re
 import time
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
+from activity_history import ActivityHistory
+from activity_journal import ActivityJournal
+from activity_stats import FIELDS, ActivityTable, UserStats
 from activity_store import load_activity, save_activity
+from cogs.weekly_summary import WEEKLY
+from message_router import EVENT_DM, EVENT_MENTION, ParsedMessage
+from rank_engine import BADGE_ORDER, RankEngine, Threshold
+from ranked_index import RankedIndex
+from role_queue import ROLE_QUEUE
 from util import is_staff
 from config import (
     BADGE_ROLE_IDS,
@@ -17,6 +24,9 @@ from config import (
     DIAMOND_WINS_MIN,
     GOLD_CHAT_MIN,
     GOLD_WINS_MIN,
+    HISTORY_DAYS,
+    HISTORY_WINDOWS,
+    JOURNAL_FSYNC_INTERVAL,
     MAIN_CHAT_ID,
     PLATINUM_CHAT_MIN,
     PLATINUM_GMV_MIN,
@@ -28,9 +38,26 @@ from config import (
 
 logger = logging.getLogger("thcbot")
 
-ACTIVITY: dict = load_activity()
+ACTIVITY = ActivityTable(load_activity())
+JOURNAL = ActivityJournal()
+# Replayed users are dirty: the first flush must write them before it
+# discards the journal segments their values came from.
+_dirty_users: set[int] = JOURNAL.replay(ACTIVITY)
+RANKINGS = {
+    field: RankedIndex({user_id: stats[field] for user_id, stats in ACTIVITY.items()})
+    for field in FIELDS
+}
+ENGINE = RankEngine(
+    [
+        Threshold("gold", chat_msgs=GOLD_CHAT_MIN, wins=GOLD_WINS_MIN),
+        Threshold("diamond", chat_msgs=DIAMOND_CHAT_MIN, wins=DIAMOND_WINS_MIN, gmv=DIAMOND_GMV_MIN),
+        Threshold("platinum", chat_msgs=PLATINUM_CHAT_MIN, wins=PLATINUM_WINS_MIN, gmv=PLATINUM_GMV_MIN),
+    ],
+    BADGE_ROLE_IDS,
+)
+HISTORY = ActivityHistory(HISTORY_DAYS, HISTORY_WINDOWS)
+HISTORY.load()
 _last_activity_save = time.time()
-_activity_dirty = False
 _activity_flush_task: asyncio.Task | None = None
 
 _DM_REPLY = (
@@ -42,6 +69,18 @@ _DM_REPLY = (
     "💬 If you have any questions, please reach out to <@563044854792323082>.\n"
 )
 
+LEADERBOARD_PAGE_SIZE = 10
+
+METRIC_DISPLAY = {
+    "gmv": "GMV",
+    "wins": "Wins",
+    "chat_msgs": "Chat msgs",
+}
+
+_SPARKS = "▁▂▃▄▅▆▇█"
+
+_BADGE_BY_ROLE_ID = {v: k for k, v in BADGE_ROLE_IDS.items()}
+
 BADGE_DISPLAY = {
     "bronze": "🥉 Bronze",
     "silver": "🥈 Silver",
@@ -54,15 +93,18 @@ BADGE_DISPLAY = {
 @atexit.register
 def _flush_activity_on_exit():
     try:
-        if ACTIVITY:
-            save_activity(ACTIVITY)
+        JOURNAL.close()
+        HISTORY.save(HISTORY.snapshot())
+        if _dirty_users:
+            save_activity({str(user_id): ACTIVITY[user_id].as_dict() for user_id in _dirty_users})
     except Exception:
         pass
 
 
 def maybe_flush_activity():
-    global _activity_dirty, _activity_flush_task
-    _activity_dirty = True
+    global _activity_flush_task
+    if not _dirty_users:
+        return
     if _activity_flush_task and not _activity_flush_task.done():
         return
     loop = asyncio.get_running_loop()
@@ -70,44 +112,61 @@ def maybe_flush_activity():
 
 
 async def _flush_activity_background():
-    global _activity_dirty, _last_activity_save, _activity_flush_task
+    global _dirty_users, _last_activity_save, _activity_flush_task
     try:
-        while _activity_dirty:
+        while _dirty_users:
             delay = SAVE_ACTIVITY_INTERVAL - (time.time() - _last_activity_save)
             if delay > 0:
                 await asyncio.sleep(delay)
 
-            if not _activity_dirty:
+            if not _dirty_users:
                 break
 
-            _activity_dirty = False
-            snapshot = {user_id: dict(stats) for user_id, stats in ACTIVITY.items()}
-            await asyncio.to_thread(save_activity, snapshot)
+            # Snapshot and rotate with no await in between, so every journal
+            # record in the rotated segments is covered by this snapshot.
+            started = time.perf_counter()
+            dirty, _dirty_users = _dirty_users, set()
+            snapshot = {str(user_id): ACTIVITY[user_id].as_dict() for user_id in dirty}
+            compacted = JOURNAL.rotate()
+            try:
+                await asyncio.to_thread(_compact_journal, snapshot, compacted)
+            except Exception:
+                # The rotated segments were not discarded, but the next rotation
+                # would sweep them up, so these users must be written again.
+                _dirty_users |= dirty
+                logger.exception("Activity flush of %d records failed", len(dirty))
+            else:
+                logger.info(
+                    "Flushed %d dirty activity records in %.1f ms",
+                    len(dirty),
+                    (time.perf_counter() - started) * 1000,
+                )
             _last_activity_save = time.time()
     finally:
         _activity_flush_task = None
 
 
-def _get_stats(member: discord.Member) -> dict:
-    user_key = str(member.id)
-    stats = ACTIVITY.get(user_key)
-    if stats is None:
-        stats = {"chat_msgs": 0, "wins": 0, "gmv": 0}
-        ACTIVITY[user_key] = stats
-    stats.setdefault("chat_msgs", 0)
-    stats.setdefault("wins", 0)
-    stats.setdefault("gmv", 0)
-    return stats
+def _compact_journal(snapshot: dict, segments: list[int]):
+    save_activity(snapshot)
+    JOURNAL.discard(segments)
 
 
-def _member_tier_roles(member: discord.Member):
-    tier_role_ids = set(TIER_ROLE_IDS.values())
-    return [r for r in member.roles if r.id in tier_role_ids]
+def _set_stat(member: discord.Member, stats: UserStats, field: str, value: int):
+    """Update one counter and journal the new value so it survives a crash."""
+    stats[field] = value
+    JOURNAL.append(member.id, field, value)
+    RANKINGS[field].update(member.id, value)
+    _dirty_users.add(member.id)
 
 
-def _member_badge_roles(member: discord.Member):
-    badge_role_ids = set(BADGE_ROLE_IDS.values())
-    return [r for r in member.roles if r.id in badge_role_ids]
+def _bump_stat(member: discord.Member, stats: UserStats, field: str):
+    _set_stat(member, stats, field, stats[field] + 1)
+    WEEKLY.record(field, member.id)
+    HISTORY.add(member.id, field)
+
+
+def _get_stats(member: discord.Member) -> UserStats:
+    return ACTIVITY.get_or_create(member.id)
 
 
 async def assign_tier(member: discord.Member, tier: int):
@@ -118,10 +177,10 @@ async def assign_tier(member: discord.Member, tier: int):
     role = guild.get_role(role_id)
     if role is None:
         raise RuntimeError(f"Role ID {role_id} not found in this server.")
-    old_tiers = _member_tier_roles(member)
-    if old_tiers:
-        await member.remove_roles(*old_tiers, reason=f"Tier change -> T{tier}")
-    await member.add_roles(role, reason=f"Assigned Tier {tier}")
+    # Remove every other tier role, not just the ones the member has now,
+    # so a change still queued behind this one cannot leave two tiers.
+    others = [discord.Object(id=rid) for rid in TIER_ROLE_IDS.values() if rid != role_id]
+    await ROLE_QUEUE.change(member, add=[role], remove=others, reason=f"Tier change -> T{tier}")
 
 
 async def assign_badge(member: discord.Member, badge_key: str, reason: str = ""):
@@ -132,59 +191,105 @@ async def assign_badge(member: discord.Member, badge_key: str, reason: str = "")
     role = guild.get_role(role_id)
     if role is None:
         raise RuntimeError(f"Badge role ID {role_id} not found in this server")
-    old_badges = _member_badge_roles(member)
-    if old_badges:
-        await member.remove_roles(*old_badges, reason=reason or f"Badge change -> {badge_key}")
-    await member.add_roles(role, reason=reason or f"Assigned badge {badge_key}")
+    others = [discord.Object(id=rid) for rid in BADGE_ROLE_IDS.values() if rid != role_id]
+    await ROLE_QUEUE.change(
+        member, add=[role], remove=others, reason=reason or f"Assigned badge {badge_key}"
+    )
+    ENGINE.set_rank(member.id, BADGE_ORDER.index(badge_key))
 
 
 def _current_badge_key(member: discord.Member) -> str | None:
-    badge_by_id = {v: k for k, v in BADGE_ROLE_IDS.items()}
     for r in member.roles:
-        key = badge_by_id.get(r.id)
+        key = _BADGE_BY_ROLE_ID.get(r.id)
         if key:
             return key
     return None
 
 
-def _badge_rank_index(badge_key: str | None) -> int:
-    order = ["bronze", "silver", "gold", "diamond", "platinum"]
-    if badge_key is None:
-        return -1
-    try:
-        return order.index(badge_key)
-    except ValueError:
-        return -1
+def _format_metric(metric: str, value: int) -> str:
+    return f"${value:,}" if metric == "gmv" else f"{value:,}"
+
+
+def _sparkline(values: list[int]) -> str:
+    top = max(values)
+    if not top:
+        return _SPARKS[0] * len(values)
+    return "".join(_SPARKS[v * (len(_SPARKS) - 1) // top] for v in values)
+
+
+def _trend_text(user_id: int) -> str:
+    lines = []
+    for window in HISTORY_WINDOWS:
+        msgs = HISTORY.window_sum(user_id, "chat_msgs", window)
+        wins = HISTORY.window_sum(user_id, "wins", window)
+        lines.append(f"Last {window}d: **{msgs}** msgs, **{wins}** wins")
+    spark = _sparkline(HISTORY.series(user_id, "chat_msgs", 14))
+    lines.append(f"Chat, last 14 days: `{spark}`")
+    return "\n".join(lines)
+
+
+def _leaderboard_text(guild: discord.Guild, metric: str, page: int) -> str | None:
+    rows = RANKINGS[metric].page(page * LEADERBOARD_PAGE_SIZE, LEADERBOARD_PAGE_SIZE)
+    if not rows:
+        return None
+
+    medals = ["🥇", "🥈", "🥉"]
+    lines = [f"**🏆 Top Creators (by {METRIC_DISPLAY[metric]})**\n"]
+    for i, (user_id, value) in enumerate(rows, page * LEADERBOARD_PAGE_SIZE + 1):
+        member = guild.get_member(user_id)
+        name = member.display_name if member else f"<@{user_id}>"
+        badge_key = _current_badge_key(member) if member else None
+        badge = BADGE_DISPLAY.get(badge_key, "") if badge_key else ""
+        medal = medals[i - 1] if i <= 3 else f"{i}."
+        lines.append(f"{medal} {name} — **{_format_metric(metric, value)}** {badge}")
+    return "\n".join(lines)
+
+
+class LeaderboardView(discord.ui.View):
+    def __init__(self, guild: discord.Guild, metric: str, invoker_id: int):
+        super().__init__(timeout=120)
+        self._guild = guild
+        self._metric = metric
+        self._invoker_id = invoker_id
+        self._page = 0
+        self._sync_buttons()
+
+    def _page_count(self) -> int:
+        return max(1, -(-len(RANKINGS[self._metric]) // LEADERBOARD_PAGE_SIZE))
+
+    def _sync_buttons(self):
+        self.prev_page.disabled = self._page <= 0
+        self.next_page.disabled = self._page >= self._page_count() - 1
+
+    async def _show(self, interaction: discord.Interaction):
+        if interaction.user.id != self._invoker_id:
+            return await interaction.response.send_message(
+                "Only the requester can use these buttons.", ephemeral=True
+            )
+        self._page = min(max(0, self._page), self._page_count() - 1)
+        self._sync_buttons()
+        text = _leaderboard_text(self._guild, self._metric, self._page) or "No data recorded yet."
+        await interaction.response.edit_message(content=text, view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self._page -= 1
+        await self._show(interaction)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self._page += 1
+        await self._show(interaction)
 
 
 async def _check_for_rank_upgrade(member: discord.Member):
-    stats = _get_stats(member)
-    chat_msgs = stats["chat_msgs"]
-    wins = stats["wins"]
-    gmv = stats["gmv"]
-
-    current = _current_badge_key(member)
-    current_idx = _badge_rank_index(current)
-    best = None
-    best_idx = current_idx
-
-    if chat_msgs >= GOLD_CHAT_MIN and wins >= GOLD_WINS_MIN:
-        if _badge_rank_index("gold") > best_idx:
-            best = "gold"
-            best_idx = _badge_rank_index("gold")
-
-    if gmv >= DIAMOND_GMV_MIN and chat_msgs >= DIAMOND_CHAT_MIN and wins >= DIAMOND_WINS_MIN:
-        if _badge_rank_index("diamond") > best_idx:
-            best = "diamond"
-            best_idx = _badge_rank_index("diamond")
-
-    if gmv >= PLATINUM_GMV_MIN and chat_msgs >= PLATINUM_CHAT_MIN and wins >= PLATINUM_WINS_MIN:
-        if _badge_rank_index("platinum") > best_idx:
-            best = "platinum"
-            best_idx = _badge_rank_index("platinum")
-
-    if best and best_idx > current_idx:
-        await assign_badge(member, best, reason="Auto badge upgrade from activity")
+    best = ENGINE.evaluate(member, _get_stats(member))
+    if best:
+        try:
+            await assign_badge(member, best, reason="Auto badge upgrade from activity")
+        except Exception:
+            ENGINE.invalidate(member.id)
+            raise
         maybe_flush_activity()
 
 
@@ -192,85 +297,110 @@ class BadgesCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_load(self):
+        router = self.bot.router
+        router.add_handler("badges.dm", self._on_dm, events=[EVENT_DM])
+        router.add_handler("badges.main_chat", self._on_main_chat, channel_ids=[MAIN_CHAT_ID])
+        router.add_handler("badges.wins", self._on_wins_channel, channel_ids=[WINS_CHANNEL_ID])
+        router.add_handler("badges.mention", self._on_mention, events=[EVENT_MENTION])
+        self.journal_sync.start()
+        self.save_history.start()
+
+    async def cog_unload(self):
+        for name in ("badges.dm", "badges.main_chat", "badges.wins", "badges.mention"):
+            self.bot.router.remove_handler(name)
+        self.journal_sync.cancel()
+        self.save_history.cancel()
+        await asyncio.to_thread(JOURNAL.sync)
+        await asyncio.to_thread(HISTORY.save, HISTORY.snapshot())
+
+    @tasks.loop(seconds=JOURNAL_FSYNC_INTERVAL)
+    async def journal_sync(self):
+        # Batch the fsync of every counter change since the last tick.
+        if JOURNAL.has_pending:
+            await asyncio.to_thread(JOURNAL.sync)
+
+    @tasks.loop(seconds=SAVE_ACTIVITY_INTERVAL)
+    async def save_history(self):
+        await asyncio.to_thread(HISTORY.save, HISTORY.snapshot())
+
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Badge roles may have been changed by hand; drop the cached rank.
+        if before.roles != after.roles:
+            ENGINE.invalidate(after.id)
+
+    async def _on_dm(self, parsed: ParsedMessage):
+        await parsed.message.reply(_DM_REPLY)
+
+    async def _on_main_chat(self, parsed: ParsedMessage):
+        if not parsed.is_text_channel:
             return
+        message = parsed.message
+        member = message.author
+        stats = _get_stats(member)
+        _bump_stat(member, stats, "chat_msgs")
+
+        if parsed.has_intro:
+            try:
+                await assign_badge(member, "bronze", reason="Bronze intro trigger")
+                try:
+                    await member.send(
+                        "You have unlocked the **Bronze** badge in THC "
+                        "for introducing yourself in the main chat. 🎉"
+                    )
+                except discord.Forbidden:
+                    await message.channel.send(
+                        f"{member.mention} you have unlocked the **Bronze** badge.",
+                        allowed_mentions=discord.AllowedMentions(users=[member]),
+                    )
+            except Exception:
+                logger.exception("Failed to assign Bronze badge to %s", member)
 
-        content = message.content or ""
-        lowered = content.lower()
+        await self._after_activity(member, stats)
 
-        if isinstance(message.channel, discord.DMChannel):
-            await message.reply(_DM_REPLY)
+    async def _on_wins_channel(self, parsed: ParsedMessage):
+        if not parsed.is_text_channel:
             return
+        message = parsed.message
+        member = message.author
+        stats = _get_stats(member)
+        _bump_stat(member, stats, "wins")
+
+        if parsed.has_win:
+            try:
+                await assign_badge(member, "silver", reason="Silver win trigger")
+                try:
+                    await member.send(
+                        "You have unlocked the **Silver** badge in THC "
+                        "for sharing your win in the server. 🎉"
+                    )
+                except discord.Forbidden:
+                    await message.channel.send(
+                        f"{member.mention} you have unlocked the **Silver** badge.",
+                        allowed_mentions=discord.AllowedMentions(users=[member]),
+                    )
+            except Exception:
+                logger.exception("Failed to assign Silver badge to %s", member)
 
-        if isinstance(message.channel, discord.TextChannel):
-            member = message.author
-            channel_id = message.channel.id
-            stats = _get_stats(member)
-
-            if MAIN_CHAT_ID and channel_id == MAIN_CHAT_ID:
-                stats["chat_msgs"] += 1
-
-                if self.bot.user and self.bot.user in message.mentions:
-                    if re.search(r"\bintro\b", lowered):
-                        try:
-                            await assign_badge(member, "bronze", reason="Bronze intro trigger")
-                            try:
-                                await member.send(
-                                    "You have unlocked the **Bronze** badge in THC "
-                                    "for introducing yourself in the main chat. 🎉"
-                                )
-                            except discord.Forbidden:
-                                await message.channel.send(
-                                    f"{member.mention} you have unlocked the **Bronze** badge.",
-                                    allowed_mentions=discord.AllowedMentions(users=[member]),
-                                )
-                            maybe_flush_activity()
-                        except Exception:
-                            logger.exception("Failed to assign Bronze badge to %s", member)
-
-            if WINS_CHANNEL_ID and channel_id == WINS_CHANNEL_ID:
-                if self.bot.user and self.bot.user in message.mentions:
-                    if re.search(r"\bwin\b", lowered):
-                        stats["wins"] += 1
-                        try:
-                            await assign_badge(member, "silver", reason="Silver win trigger")
-                            try:
-                                await member.send(
-                                    "You have unlocked the **Silver** badge in THC "
-                                    "for sharing your win in the server. 🎉"
-                                )
-                            except discord.Forbidden:
-                                await message.channel.send(
-                                    f"{member.mention} you have unlocked the **Silver** badge.",
-                                    allowed_mentions=discord.AllowedMentions(users=[member]),
-                                )
-                            maybe_flush_activity()
-                        except Exception:
-                            logger.exception("Failed to assign Silver badge to %s", member)
-                    else:
-                        stats["wins"] += 1
-                else:
-                    stats["wins"] += 1
-
-            maybe_flush_activity()
+        await self._after_activity(member, stats)
 
+    async def _after_activity(self, member: discord.Member, stats: UserStats):
+        maybe_flush_activity()
+
+        if ENGINE.needs_check(member.id, stats):
             try:
                 await _check_for_rank_upgrade(member)
             except Exception:
                 logger.exception("Rank upgrade check failed for %s", member)
 
-        if self.bot.user and self.bot.user in message.mentions and not re.search(
-            r"\b(intro|win)\b", lowered
-        ):
-            from cogs.help_menu import HelpMenu  # lazy to avoid circular import
-
-            view = HelpMenu()
-            await message.channel.send("Hi! 👋 Please choose an option below:", view=view)
+    async def _on_mention(self, parsed: ParsedMessage):
+        if parsed.has_intro or parsed.has_win:
             return
+        from cogs.help_menu import HelpMenu  # lazy to avoid circular import
 
-        await self.bot.process_commands(message)
+        view = HelpMenu()
+        await parsed.message.channel.send("Hi! 👋 Please choose an option below:", view=view)
 
     # -------------------------------------------------------------------------
     # Slash commands
@@ -290,13 +420,15 @@ class BadgesCog(commands.Cog):
             )
             return
 
+        # A badge upgrade waits its turn in the role queue; don't miss the 3 s deadline.
+        await interaction.response.defer(ephemeral=True)
         stats = _get_stats(user)
-        stats["gmv"] = max(0, int(amount))
+        _set_stat(user, stats, "gmv", max(0, int(amount)))
         maybe_flush_activity()
         await _check_for_rank_upgrade(user)
 
         logger.info("GMV for %s set to %d by %s", user, stats["gmv"], interaction.user)
-        await interaction.response.send_message(
+        await interaction.followup.send(
             f"Set GMV for {user.mention} to **{stats['gmv']}**. Badge has been rechecked.",
             allowed_mentions=discord.AllowedMentions(users=[user]),
             ephemeral=True,
@@ -306,10 +438,16 @@ class BadgesCog(commands.Cog):
         name="stats",
         description="Check your stats (or another member's with manage_roles).",
     )
-    @app_commands.describe(user="Member to look up (staff only when checking others)")
+    @app_commands.describe(
+        user="Member to look up (staff only when checking others)",
+        trend="Also show recent activity (rolling windows and a 14-day chart)",
+    )
     @app_commands.default_permissions(manage_messages=True)
     async def stats(
-        self, interaction: discord.Interaction, user: discord.Member | None = None
+        self,
+        interaction: discord.Interaction,
+        user: discord.Member | None = None,
+        trend: bool = False,
     ):
         invoker = interaction.user
         if not isinstance(invoker, discord.Member):
@@ -338,50 +476,55 @@ class BadgesCog(commands.Cog):
                     tier_label = f"Tier {num}"
                     break
 
+        ranks = []
+        for metric in ("gmv", "wins", "chat_msgs"):
+            rank = RANKINGS[metric].rank(user.id)
+            total = len(RANKINGS[metric])
+            ranks.append(
+                f"{METRIC_DISPLAY[metric]}: **#{rank}** of {total:,}"
+                if rank
+                else f"{METRIC_DISPLAY[metric]}: —"
+            )
+
         await interaction.response.send_message(
             f"**Stats for {user.mention}**\n"
             f"Chat msgs: **{s['chat_msgs']}**  |  Wins: **{s['wins']}**  |  "
-            f"GMV: **${s['gmv']:,}**  |  Badge: **{badge_label}**  |  Tier: **{tier_label}**",
+            f"GMV: **${s['gmv']:,}**  |  Badge: **{badge_label}**  |  Tier: **{tier_label}**\n"
+            "Rank — " + "  |  ".join(ranks)
+            + (f"\n{_trend_text(user.id)}" if trend else ""),
             allowed_mentions=discord.AllowedMentions(users=[user]),
             ephemeral=True,
         )
 
-    @app_commands.command(name="leaderboard", description="Top 10 members by GMV.")
+    @app_commands.command(name="leaderboard", description="Top members by GMV, wins or chat messages.")
+    @app_commands.describe(metric="What to rank by (default GMV)")
+    @app_commands.choices(
+        metric=[
+            app_commands.Choice(name="GMV", value="gmv"),
+            app_commands.Choice(name="Wins", value="wins"),
+            app_commands.Choice(name="Chat messages", value="chat_msgs"),
+        ]
+    )
     @app_commands.default_permissions(manage_messages=True)
-    async def leaderboard(self, interaction: discord.Interaction):
+    async def leaderboard(self, interaction: discord.Interaction, metric: str = "gmv"):
         if not interaction.guild:
             await interaction.response.send_message(
                 "This command only works in a server.", ephemeral=True
             )
             return
 
-        await interaction.response.defer(ephemeral=True)
-
-        entries = []
-        for uid_str, s in ACTIVITY.items():
-            gmv = s.get("gmv", 0)
-            if gmv <= 0:
-                continue
-            member = interaction.guild.get_member(int(uid_str))
-            name = member.display_name if member else f"<@{uid_str}>"
-            badge_key = _current_badge_key(member) if member else None
-            badge_label = BADGE_DISPLAY.get(badge_key, "") if badge_key else ""
-            entries.append((gmv, name, badge_label))
-
-        entries.sort(key=lambda x: x[0], reverse=True)
-        top = entries[:10]
-
-        if not top:
-            await interaction.followup.send("No GMV data recorded yet.", ephemeral=True)
+        text = _leaderboard_text(interaction.guild, metric, 0)
+        if text is None:
+            await interaction.response.send_message(
+                f"No {METRIC_DISPLAY[metric]} data recorded yet.", ephemeral=True
+            )
             return
 
-        medals = ["🥇", "🥈", "🥉"]
-        lines = ["**🏆 Top Creators (by GMV)**\n"]
-        for i, (gmv, name, badge) in enumerate(top, 1):
-            medal = medals[i - 1] if i <= 3 else f"{i}."
-            lines.append(f"{medal} {name} — **${gmv:,}** {badge}")
-
-        await interaction.followup.send("\n".join(lines), ephemeral=True)
+        await interaction.response.send_message(
+            text,
+            view=LeaderboardView(interaction.guild, metric, interaction.user.id),
+            ephemeral=True,
+        )
 
 
 async def setup(bot: commands.Bot):
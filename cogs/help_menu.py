@@ -37,13 +37,15 @@ class TierButtons(discord.ui.View):
                 return await interaction.response.send_message(
                     "Only the requester can use these buttons.", ephemeral=True
                 )
+            # The role edit waits its turn in the role queue; don't miss the 3 s deadline.
+            await interaction.response.defer(ephemeral=True)
             try:
                 await assign_tier(self._member, tier)
-                await interaction.response.send_message(
+                await interaction.followup.send(
                     f"✅ Assigned **Tier {tier}**. Previous tier removed.", ephemeral=True
                 )
             except Exception as e:
-                await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+                await interaction.followup.send(f"❌ {e}", ephemeral=True)
 
         btn = discord.ui.Button(label=label, style=style)
         btn.callback = _callback
@@ -238,7 +240,7 @@ class HelpMenuCog(commands.Cog):
             value=(
                 "**/help** — Show this list of commands\n"
                 "**/tierinfo** — Show tier and badge rules\n"
-                "**/stats** — View your stats (chat messages, wins, GMV, badge, tier)\n"
+                "**/stats** `[trend]` — View your stats (chat messages, wins, GMV, badge, tier, recent activity)\n"
             ),
             inline=False,
         )
@@ -249,7 +251,7 @@ class HelpMenuCog(commands.Cog):
                 "**/setgmv** `<user> <amount>` — Set a member's GMV and recheck their badge\n"
                 "**/setbadge** `<user> <badge>` — Manually assign a badge to a member\n"
                 "**/stats** `<user>` — View another member's stats\n"
-                "**/leaderboard** — Top 10 members by GMV\n"
+                "**/leaderboard** `[metric]` — Top members by GMV, wins or chat messages\n"
                 "**/bind** `<message> <brand> <form>` — Bind a message so reactions DM the form\n"
                 "**/unbind** `<message>` — Remove a message binding\n"
                 "**/list_binds** — List all active message bindings\n"
@@ -257,6 +259,11 @@ class HelpMenuCog(commands.Cog):
                 "**/post_onboard** `<channel> <brand> <form>` — Post an onboarding message and auto-bind it\n"
                 "**/bind_role_react** `<message_id> <role> <channel>` — Assign a role when a message is reacted to\n"
                 "**/post_payment_panel** `<channel>` — Post the payment request panel\n"
+                "**/handler_stats** — Per-handler message routing timings\n"
+                "**/resolver_stats** — Member/user lookup cache hit rates\n"
+                "**/wins_ai_stats** — #wins classifier latency, token usage and cost\n"
+                "**/dm_queue_stats** — Reaction form DM queue depth and delivery latency\n"
+                "**/backfill_wins** `<start|status|cancel> [forward]` — Re-classify #wins history\n"
             ),
             inline=False,
         )
@@ -1,105 +1,162 @@
+import asyncio
 import logging
-import time
 
 import discord
-from discord.ext import commands
-
-from config import COOLDOWN_SECONDS
-from store import find_binding
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from config import (
+    COOLDOWN_SECONDS,
+    DM_NOTICE_MAX_MENTIONS,
+    DM_NOTICE_WINDOW,
+    DM_QUEUE_MAX_SIZE,
+    DM_QUEUE_MIN_INTERVAL,
+    DM_QUEUE_RETRY_ATTEMPTS,
+    DM_QUEUE_WORKERS,
+)
+from cooldowns import COOLDOWNS
+from dm_queue import DMJob, DMQueue
+from role_queue import ROLE_QUEUE
+from store import binding_table, remove_binding, remove_bindings
+from util import is_staff
 
 logger = logging.getLogger("thcbot")
 
-_SENT_CACHE: dict[tuple[int, int], float] = {}
+COOLDOWN_SCOPE = "reaction_form"
 
 
 class ReactionsCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._dm_queue = DMQueue(
+            bot,
+            workers=DM_QUEUE_WORKERS,
+            maxsize=DM_QUEUE_MAX_SIZE,
+            min_interval=DM_QUEUE_MIN_INTERVAL,
+            attempts=DM_QUEUE_RETRY_ATTEMPTS,
+            notice_window=DM_NOTICE_WINDOW,
+            notice_max_mentions=DM_NOTICE_MAX_MENTIONS,
+        )
+        self._role_tasks: set[asyncio.Task] = set()
+
+    async def cog_load(self):
+        self._dm_queue.start()
+        self.save_cooldowns.start()
+
+    async def cog_unload(self):
+        await self._dm_queue.stop()
+        if self._role_tasks:
+            await asyncio.gather(*self._role_tasks, return_exceptions=True)
+        self.save_cooldowns.cancel()
+        COOLDOWNS.save()
+
+    @tasks.loop(minutes=1)
+    async def save_cooldowns(self):
+        if COOLDOWNS.dirty:
+            COOLDOWNS.save()
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         try:
+            # Nearly every reaction is on an unbound message: one set lookup.
+            table = binding_table()
+            if payload.message_id not in table.message_ids:
+                return
             if payload.user_id == self.bot.user.id:
                 return
 
-            binding = find_binding(payload.message_id)
-            if not binding:
+            binding = table.get(payload.message_id)
+            if binding.guild_id and payload.guild_id != binding.guild_id:
                 return
-
-            if binding.get("guild_id") and str(payload.guild_id) != str(binding.get("guild_id")):
+            if binding.channel_id and payload.channel_id != binding.channel_id:
                 return
-            if binding.get("channel_id") and str(payload.channel_id) != str(
-                binding.get("channel_id")
-            ):
+            if not binding.accepts_emoji(payload.emoji):
                 return
 
-            target_emoji = binding.get("emoji", "ANY")
-            if target_emoji != "ANY":
-                if (
-                    str(payload.emoji) != target_emoji
-                    and getattr(payload.emoji, "name", None) != target_emoji
-                ):
-                    return
-            else:
-                if str(payload.emoji) != "✅" and getattr(payload.emoji, "name", None) != "✅":
-                    return
-
             key = (payload.message_id, payload.user_id)
-            now = time.time()
-            if now - _SENT_CACHE.get(key, 0) < COOLDOWN_SECONDS:
+            if COOLDOWNS.active(COOLDOWN_SCOPE, key):
                 return
 
-            role_id_raw = binding.get("role_id")
-            if role_id_raw:
-                try:
-                    role_id = int(role_id_raw)
-                    guild = self.bot.get_guild(payload.guild_id) or await self.bot.fetch_guild(
-                        payload.guild_id
-                    )
-                    member = guild.get_member(payload.user_id) or await guild.fetch_member(
-                        payload.user_id
-                    )
-                    role = guild.get_role(role_id)
-                    if role:
-                        await member.add_roles(
-                            role,
-                            reason=f"Reaction role for {binding.get('brand', 'deal')}",
-                        )
-                except Exception:
-                    logger.exception(
-                        "Reaction role assign error for message %d", payload.message_id
+            queued = True
+            if binding.form:
+                queued = self._dm_queue.submit(
+                    DMJob(
+                        payload.user_id,
+                        f"Here is your **{binding.brand}** onboarding form:\n{binding.form}",
+                        channel_id=payload.channel_id,
+                        notice=f"Please enable **Allow DMs from server members** "
+                        f"or contact an admin for the **{binding.brand}** form.",
                     )
+                )
 
-            form = (binding.get("form") or "").strip()
-            if form:
-                user = self.bot.get_user(payload.user_id) or await self.bot.fetch_user(
-                    payload.user_id
+            if binding.role_id:
+                # Don't hold the handler on the role queue's pacing.
+                task = asyncio.get_running_loop().create_task(self._add_role(payload, binding))
+                self._role_tasks.add(task)
+                task.add_done_callback(self._role_tasks.discard)
+
+            if not queued:
+                # No cooldown: reacting again once the queue drains still works.
+                logger.warning(
+                    "DM queue full; dropped form DM for user %d on message %d",
+                    payload.user_id, payload.message_id,
                 )
-                try:
-                    await user.send(
-                        f"Here is your **{binding.get('brand', '')}** onboarding form:\n{form}"
-                    )
-                except Exception:
-                    try:
-                        channel = self.bot.get_channel(
-                            payload.channel_id
-                        ) or await self.bot.fetch_channel(payload.channel_id)
-                        await channel.send(
-                            f"<@{payload.user_id}>, I could not DM you. "
-                            f"Please enable **Allow DMs from server members** "
-                            f"or contact an admin for the **{binding.get('brand', '')}** form."
-                        )
-                    except Exception:
-                        logger.exception(
-                            "Failed to notify channel after failed DM for user %d",
-                            payload.user_id,
-                        )
-
-            _SENT_CACHE[key] = now
+                return
+
+            COOLDOWNS.start(COOLDOWN_SCOPE, key, COOLDOWN_SECONDS)
 
         except Exception:
             logger.exception("Reaction handler error for message %d", payload.message_id)
 
+    async def _add_role(self, payload: discord.RawReactionActionEvent, binding):
+        try:
+            guild = await self.bot.resolver.guild(payload.guild_id)
+            member = await self.bot.resolver.member(guild, payload.user_id)
+            role = guild.get_role(binding.role_id)
+            if role:
+                await ROLE_QUEUE.change(
+                    member,
+                    add=[role],
+                    reason=f"Reaction role for {binding.brand or 'deal'}",
+                )
+        except Exception:
+            logger.exception("Reaction role assign error for message %d", payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if remove_binding(payload.message_id):
+            logger.info("Removed binding for deleted message %d", payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        removed = remove_bindings(payload.message_ids)
+        if removed:
+            logger.info("Removed %d binding(s) for bulk-deleted messages", removed)
+
+    # --- /dm_queue_stats ---
+
+    @app_commands.command(
+        name="dm_queue_stats",
+        description="Show reaction form DM queue depth and delivery latency (staff only).",
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def dm_queue_stats(self, interaction: discord.Interaction):
+        if not is_staff(interaction.user):
+            return await interaction.response.send_message("⛔ You don't have permission to use this.", ephemeral=True)
+        q = self._dm_queue
+        h = q.latency
+        lines = [
+            "**Form DM queue**",
+            f"**Queue:** depth {q.depth} · {q.queue.rejected:,} refused (full) ·"
+            f" wait avg {q.queue.wait_avg:.2f}s / max {q.queue.wait_max:.2f}s",
+            f"**Delivered:** {q.delivered:,} · avg {h.avg:.2f}s · p95 ≤{h.percentile(95):.2f}s"
+            f" · max {h.max:.2f}s (reaction to DM)",
+            f"**Rate limits:** {q.retries:,} retried · {q.paused:.1f}s paused",
+            f"**DMs closed:** {q.dm_closed:,} · {q.failed:,} other failures ·"
+            f" {q.users_noticed:,} users told in {q.notices_sent:,} channel notices",
+        ]
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(ReactionsCog(bot))
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime, time as dt_time, timezone
 
@@ -5,23 +6,37 @@ import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 
-from activity_store import load_activity, load_weekly_snapshot, save_weekly_snapshot
+from activity_store import load_weekly_snapshot, save_weekly_snapshot
 from config import EMBED_COLOR_GOLD, WEEKLY_SUMMARY_CHANNEL_ID, WEEKLY_SUMMARY_DAY, WEEKLY_SUMMARY_HOUR
 from util import is_staff
+from weekly_counters import WeeklyCounters
 
 logger = logging.getLogger("thcbot")
 
+# Fed by BadgesCog.on_message and on_member_join below; read when posting.
+WEEKLY = WeeklyCounters(load_weekly_snapshot())
+
 
 class WeeklySummaryCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self._snapshot = load_weekly_snapshot()
 
     async def cog_load(self):
         self.weekly_post.start()
+        self.save_counters.start()
 
     async def cog_unload(self):
         self.weekly_post.cancel()
+        self.save_counters.cancel()
+        if WEEKLY.dirty:
+            save_weekly_snapshot(WEEKLY.to_dict())
+
+    @tasks.loop(minutes=1)
+    async def save_counters(self):
+        if not WEEKLY.dirty:
+            return
+        WEEKLY.dirty = False
+        await asyncio.to_thread(save_weekly_snapshot, WEEKLY.to_dict())
 
     # ------------------------------------------------------------------ #
     #  Track new member joins                                             #
@@ -31,12 +46,7 @@ class WeeklySummaryCog(commands.Cog):
     async def on_member_join(self, member: discord.Member):
         if member.bot:
             return
-        self._snapshot["members_joined"].append({
-            "id": member.id,
-            "name": member.display_name,
-            "joined_at": datetime.now(timezone.utc).isoformat(),
-        })
-        save_weekly_snapshot(self._snapshot)
+        WEEKLY.record_join(member.id, member.display_name)
 
     # ------------------------------------------------------------------ #
     #  Scheduled weekly task                                              #
@@ -66,19 +76,12 @@ class WeeklySummaryCog(commands.Cog):
             logger.error("Weekly summary channel %d not found", WEEKLY_SUMMARY_CHANNEL_ID)
             return
 
-        activity = load_activity()
-        old_wins: dict = self._snapshot.get("wins_snapshot", {})
-
-        # Calculate per-user win delta
-        wins_this_week: list[tuple[str, int]] = []
-        for uid, stats in activity.items():
-            delta = stats.get("wins", 0) - old_wins.get(uid, 0)
-            if delta > 0:
-                wins_this_week.append((uid, delta))
-        wins_this_week.sort(key=lambda x: x[1], reverse=True)
-        total_wins = sum(d for _, d in wins_this_week)
-
-        new_members: list[dict] = self._snapshot.get("members_joined", [])
+        # Everything since the last summary: the 7 days ending now on schedule.
+        week = WEEKLY.take()
+        wins_this_week = sorted(week["wins"].items(), key=lambda x: x[1], reverse=True)
+        total_wins = sum(week["wins"].values())
+        total_msgs = sum(week["chat_msgs"].values())
+        new_members: list[dict] = week["members_joined"]
 
         embed = discord.Embed(
             title="Weekly Server Summary",
@@ -88,12 +91,13 @@ class WeeklySummaryCog(commands.Cog):
 
         embed.add_field(name="New Members", value=str(len(new_members)), inline=True)
         embed.add_field(name="Wins Posted", value=str(total_wins), inline=True)
+        embed.add_field(name="Chat Messages", value=str(total_msgs), inline=True)
 
         if wins_this_week:
             top = wins_this_week[:5]
             lines = []
             for uid, delta in top:
-                member = channel.guild.get_member(int(uid))
+                member = channel.guild.get_member(uid)
                 name = member.display_name if member else f"<@{uid}>"
                 lines.append(f"• {name} — {delta} win{'s' if delta != 1 else ''}")
             embed.add_field(name="Top Winners This Week", value="\n".join(lines), inline=False)
@@ -103,17 +107,15 @@ class WeeklySummaryCog(commands.Cog):
             suffix = f" (+{len(new_members) - 10} more)" if len(new_members) > 10 else ""
             embed.add_field(name="Who Joined", value=", ".join(names) + suffix, inline=False)
 
-        await channel.send(embed=embed)
+        try:
+            await channel.send(embed=embed)
+        except Exception:
+            WEEKLY.restore(week)  # counted again in the next summary
+            raise
         logger.info("Posted weekly summary to channel %d", WEEKLY_SUMMARY_CHANNEL_ID)
 
-        # Reset snapshot — capture current wins as new baseline
-        new_snapshot = {
-            "wins_snapshot": {uid: s.get("wins", 0) for uid, s in activity.items()},
-            "members_joined": [],
-            "snapshot_at": datetime.now(timezone.utc).isoformat(),
-        }
-        self._snapshot = new_snapshot
-        save_weekly_snapshot(new_snapshot)
+        WEEKLY.dirty = False
+        await asyncio.to_thread(save_weekly_snapshot, WEEKLY.to_dict())
 
     # ------------------------------------------------------------------ #
     #  Staff command — manual trigger                                     #
@@ -68,7 +68,7 @@ class WelcomeCog(commands.Cog):
         if member.bot:
             return
 
-        channel = member.guild.get_channel(WELCOME_CHANNEL_ID) or await self.bot.fetch_channel(WELCOME_CHANNEL_ID)
+        channel = await self.bot.resolver.channel(WELCOME_CHANNEL_ID)
 
         embed = self._build_embed(member)
         gif_path = _random_gif_path()
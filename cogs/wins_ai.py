@@ -1,25 +1,90 @@
+import asyncio
+from collections import deque
 import json
 import logging
 import os
 import time
+from pathlib import Path
 
+import aiohttp
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
+import openai
 from openai import AsyncOpenAI
 
-from config import BIG_WINS_CHANNEL_ID, WINS_CHANNEL_ID
+from config import (
+    BIG_WINS_CHANNEL_ID,
+    IMAGE_MAX_DOWNLOAD_BYTES,
+    OPENAI_PRICES_PER_1M,
+    VERDICT_CACHE_MAX_DISTANCE,
+    VERDICT_CACHE_MAX_ENTRIES,
+    VERDICT_CACHE_TTL_SECONDS,
+    WINS_AI_BREAKER_FAILURES,
+    WINS_AI_BATCH_ENABLED,
+    WINS_AI_BATCH_MAX_IMAGES,
+    WINS_AI_BATCH_WINDOW_SECONDS,
+    WINS_AI_BREAKER_RESET_SECONDS,
+    WINS_AI_CASCADE_ENABLED,
+    WINS_AI_CASCADE_ESCALATE_POSITIVES,
+    WINS_AI_CASCADE_FAST_MAX_TOKENS,
+    WINS_AI_CASCADE_FAST_MODEL,
+    WINS_AI_CASCADE_MIN_CONFIDENCE,
+    WINS_AI_COST_LEDGER_DAYS,
+    WINS_AI_DEFERRED_MAX,
+    WINS_AI_GLOBAL_CALLS_PER_MINUTE,
+    WINS_AI_GLOBAL_TOKENS_PER_HOUR,
+    WINS_AI_IMAGE_DETAIL,
+    WINS_AI_IMAGE_FORMAT,
+    WINS_AI_IMAGE_MAX_EDGE,
+    WINS_AI_IMAGE_QUALITY,
+    WINS_AI_MAX_OUTPUT_TOKENS,
+    WINS_AI_MODEL,
+    WINS_AI_OVERFLOW_POLICY,
+    WINS_AI_PREFILTER_ACCENT_HUES,
+    WINS_AI_PREFILTER_AUDIT_RATE,
+    WINS_AI_PREFILTER_ENABLED,
+    WINS_AI_PREFILTER_MAX_ASPECT,
+    WINS_AI_PREFILTER_MAX_OFF_PALETTE,
+    WINS_AI_PREFILTER_MIN_NEUTRAL,
+    WINS_AI_PREFILTER_REPORT_EVERY,
+    WINS_AI_QUEUE_SIZE,
+    WINS_AI_REQUEST_TIMEOUT,
+    WINS_AI_RETRY_ATTEMPTS,
+    WINS_AI_RETRY_BASE_DELAY,
+    WINS_AI_RETRY_MAX_DELAY,
+    WINS_AI_USER_CALLS_PER_MINUTE,
+    WINS_AI_USER_TOKENS_PER_HOUR,
+    WINS_AI_WORKERS,
+    WINS_BACKFILL_CALLS_PER_MINUTE,
+    WINS_BACKFILL_CONCURRENCY,
+    WINS_BACKFILL_PAGE_SIZE,
+    WINS_BACKFILL_POLL_SECONDS,
+    WINS_CHANNEL_ID,
+)
+from circuit_breaker import CLOSED, CircuitBreaker, CircuitOpen, retry_async
+from classifier_metrics import ClassifierMetrics
+from image_pipeline import FetchedImage, estimate_image_tokens, fetch_image
+from message_router import ParsedMessage
+from micro_batcher import MicroBatcher
+from rate_limiter import Budget, RateLimiter
+from util import is_staff
+from verdict_cache import VerdictCache
+from win_prefilter import PreFilter
+from win_verdicts import VerdictStore
+from work_queue import WorkQueue
 
 logger = logging.getLogger("thcbot")
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. scripts/stub_openai_server.py
 
-IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
-
-COOLDOWN_SECONDS = 60  # seconds between AI classification calls per user
+BATCH_TOKENS_PER_IMAGE = 60  # output budget per image in a micro-batch
 
-_LAST_CALL_CACHE: dict[tuple[int], float] = {}
+LIMITS_PATH = Path("data/wins_ai_limits.json")
+BACKFILL_PATH = Path("data/wins_backfill.json")
 
-_SYSTEM_PROMPT = (
+_RULES = (
     "You are a classifier for a Discord community's #wins channel. Members post "
     "screenshots or photos showing earnings, payouts, sales, or other wins.\n\n"
     "Apply this single rule:\n\n"
@@ -28,71 +93,285 @@ _SYSTEM_PROMPT = (
     "The dollar amount does NOT matter. $1, $100, $400, any amount — it is a big "
     "win. Everything else is NOT a big win.\n\n"
     "If the image is irrelevant or unclear, classify it as not a big win. "
+)
+
+_SYSTEM_PROMPT = _RULES + (
     "Respond with strict JSON only, no markdown formatting, no code fences, in "
     "exactly this shape: {\"is_big_win\": true or false, \"reasoning\": \"short "
     "explanation of what you saw\"}"
 )
 
+# First cascade stage: a bare verdict and how sure the model is, nothing else.
+_FAST_SYSTEM_PROMPT = _RULES + (
+    "Respond with strict JSON only, no markdown formatting, no code fences, in "
+    "exactly this shape: {\"is_big_win\": true or false, \"confidence\": a "
+    "number from 0 to 1}"
+)
+
+_BATCH_SYSTEM_PROMPT = _RULES + (
+    "You will get several images, each labelled 'Image N' with its own caption. "
+    "They come from different posts: classify each image on its own. Respond "
+    "with strict JSON only, no markdown formatting, no code fences, in exactly "
+    "this shape, with one entry per image: {\"verdicts\": [{\"image\": N, "
+    "\"is_big_win\": true or false, \"confidence\": 0 to 1, \"reasoning\": "
+    "\"a few words\"}]}"
+)
+
+# Errors worth retrying and counting against the circuit breaker. Anything else
+# (bad request, auth) fails the one message without tripping the breaker.
+_TRANSIENT_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+# Rough text-token count of the prompt (system prompt + caption + framing).
+_PROMPT_TOKENS = len(_SYSTEM_PROMPT) // 4 + 50
+
+
+def _estimate_tokens(sizes: list[tuple[int, int]]) -> int:
+    """Upper-bound token cost of one classification of images with these sizes
+    (both cascade stages when the cascade is on)."""
+    stages = [(WINS_AI_MODEL, WINS_AI_MAX_OUTPUT_TOKENS)]
+    if WINS_AI_CASCADE_ENABLED:
+        stages.append((WINS_AI_CASCADE_FAST_MODEL, WINS_AI_CASCADE_FAST_MAX_TOKENS))
+    return sum(
+        _PROMPT_TOKENS + max_tokens + sum(
+            estimate_image_tokens(w, h, WINS_AI_IMAGE_DETAIL, model) for w, h in sizes
+        )
+        for model, max_tokens in stages
+    )
+
 
 class WinsAICog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self._client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-
-    def _get_image_attachments(self, message: discord.Message) -> list[discord.Attachment]:
-        images = []
-        for attachment in message.attachments:
-            filename = (attachment.filename or "").lower()
-            content_type = (attachment.content_type or "").lower()
-            if filename.endswith(IMAGE_EXTENSIONS) or content_type in (
-                "image/png",
-                "image/jpeg",
-                "image/webp",
-            ):
-                images.append(attachment)
-        return images
-
-    def _on_cooldown(self, user_id: int) -> bool:
-        key = (user_id,)
-        now = time.time()
-        if now - _LAST_CALL_CACHE.get(key, 0) < COOLDOWN_SECONDS:
-            return True
-        _LAST_CALL_CACHE[key] = now
-        return False
+        # Retries are ours (retry_async), so the client's own are turned off.
+        self._client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL or None, max_retries=0
+        ) if OPENAI_API_KEY else None
+        self._breaker = CircuitBreaker(
+            "openai", WINS_AI_BREAKER_FAILURES, WINS_AI_BREAKER_RESET_SECONDS
+        )
+        self._metrics = ClassifierMetrics(OPENAI_PRICES_PER_1M, WINS_AI_COST_LEDGER_DAYS)
+        # Messages skipped while OpenAI was unavailable, retried once it recovers.
+        self._deferred: deque = deque(maxlen=WINS_AI_DEFERRED_MAX)
+        self._session: aiohttp.ClientSession | None = None
+        self._cache = VerdictCache(
+            max_entries=VERDICT_CACHE_MAX_ENTRIES,
+            ttl=VERDICT_CACHE_TTL_SECONDS,
+            max_distance=VERDICT_CACHE_MAX_DISTANCE,
+        )
+        self._batcher = MicroBatcher(
+            self._classify_batch,
+            max_items=WINS_AI_BATCH_MAX_IMAGES,
+            window=WINS_AI_BATCH_WINDOW_SECONDS,
+        ) if WINS_AI_BATCH_ENABLED else None
+        self._queue = WorkQueue(
+            "wins_ai",
+            self._process,
+            # Workers mostly wait on the batch; enough of them to fill one.
+            workers=max(WINS_AI_WORKERS, WINS_AI_BATCH_MAX_IMAGES) if self._batcher else WINS_AI_WORKERS,
+            maxsize=WINS_AI_QUEUE_SIZE,
+            overflow=WINS_AI_OVERFLOW_POLICY,
+        )
+        self._prefilter = PreFilter(
+            max_aspect=WINS_AI_PREFILTER_MAX_ASPECT,
+            min_neutral=WINS_AI_PREFILTER_MIN_NEUTRAL,
+            max_off_palette=WINS_AI_PREFILTER_MAX_OFF_PALETTE,
+            audit_rate=WINS_AI_PREFILTER_AUDIT_RATE,
+            report_every=WINS_AI_PREFILTER_REPORT_EVERY,
+        ) if WINS_AI_PREFILTER_ENABLED else None
+        self._limiter = RateLimiter(
+            per_key=[
+                Budget("user_calls", "calls", WINS_AI_USER_CALLS_PER_MINUTE, 60),
+                Budget("user_tokens", "tokens", WINS_AI_USER_TOKENS_PER_HOUR, 3600),
+            ],
+            shared=[
+                Budget("global_calls", "calls", WINS_AI_GLOBAL_CALLS_PER_MINUTE, 60),
+                Budget("global_tokens", "tokens", WINS_AI_GLOBAL_TOKENS_PER_HOUR, 3600),
+                Budget("backfill_calls", "backfill_calls", WINS_BACKFILL_CALLS_PER_MINUTE, 60),
+            ],
+            path=LIMITS_PATH,
+        )
+        self._verdicts = VerdictStore()
+        self._backfill_state: dict | None = None
+        self._backfill_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20))
+        self._queue.start()
+        self.save_limits.start()
+        self.retry_deferred.start()
+        self.bot.router.add_handler("wins_ai", self._on_wins_message, channel_ids=[WINS_CHANNEL_ID])
+        state = self._load_backfill()
+        if state is not None:
+            logger.info("Resuming #wins backfill from checkpoint %d.", state["after"])
+            self._start_backfill(state)
+
+    async def cog_unload(self):
+        self.bot.router.remove_handler("wins_ai")
+        await self._queue.stop()
+        if self._batcher:
+            await self._batcher.close()
+        self.save_limits.cancel()
+        self.retry_deferred.cancel()
+        if self._backfill_running:
+            self._backfill_task.cancel()
+        self._limiter.save()
+        if self._session:
+            await self._session.close()
+        self._cache.close()
+        self._verdicts.close()
+
+    @tasks.loop(minutes=1)
+    async def save_limits(self):
+        if self._limiter.dirty:
+            self._limiter.save()
+
+    @tasks.loop(seconds=5)
+    async def retry_deferred(self):
+        if not self._deferred:
+            return
+        if self._breaker.state == CLOSED:
+            self._requeue_deferred()
+        elif self._breaker.probe_due:
+            # One message goes through as the half-open probe.
+            self._queue.submit(self._deferred.popleft())
+
+    def _requeue_deferred(self):
+        room = WINS_AI_QUEUE_SIZE - self._queue.depth
+        count = min(room, len(self._deferred))
+        for _ in range(count):
+            self._queue.submit(self._deferred.popleft())
+        if count:
+            logger.info(
+                "Requeued %d deferred win classification(s); %d still waiting.",
+                count, len(self._deferred),
+            )
 
-    async def _classify_images(
-        self, image_urls: list[str], caption: str
-    ) -> dict | None:
+    async def _fetch_images(self, attachments: list[discord.Attachment]) -> list[FetchedImage] | None:
+        try:
+            return list(await asyncio.gather(
+                *(
+                    fetch_image(
+                        self._session,
+                        a.url,
+                        IMAGE_MAX_DOWNLOAD_BYTES,
+                        WINS_AI_IMAGE_MAX_EDGE,
+                        WINS_AI_IMAGE_FORMAT,
+                        WINS_AI_IMAGE_QUALITY,
+                        WINS_AI_PREFILTER_ACCENT_HUES if self._prefilter else None,
+                    )
+                    for a in attachments
+                )
+            ))
+        except Exception:
+            logger.warning("Could not download/hash win attachments; skipping verdict cache.", exc_info=True)
+            return None
+
+    def _cached_verdict(self, fetched: list[FetchedImage]) -> tuple[dict | None, list[FetchedImage]]:
+        """Resolve what the cache can. Returns ``(verdict, uncached_images)``; verdict is
+        set when one cached image is a big win or every image is a cached non-win."""
+        uncached = []
+        for image in fetched:
+            hit = self._cache.get(image.sha256, image.phash)
+            if hit is None:
+                uncached.append(image)
+            elif hit["is_big_win"]:
+                return hit, []
+        if not uncached:
+            return {"is_big_win": False, "reasoning": "cached: no big win in any image"}, []
+        return None, uncached
+
+    def _prefiltered(self, message_id: int, images: list[FetchedImage]) -> tuple[list[FetchedImage], bool]:
+        """Drop images the pre-filter rejects. Returns ``(candidates, plausible)``;
+        when nothing is plausible an audited message keeps all its images."""
+        candidates = []
+        for image in images:
+            reason = self._prefilter.reject_reason(image.signature)
+            self._prefilter.count(reason is None)
+            if reason is None:
+                candidates.append(image)
+            else:
+                logger.debug("Pre-filter rejected an image in message %d: %s", message_id, reason)
+        if candidates:
+            return candidates, True
+        if self._prefilter.should_audit():
+            return images, False
+        return [], False
+
+    def _remember(self, classified: list[FetchedImage], result: dict):
+        # A negative verdict covers every image sent; a positive one can only be
+        # pinned on an image when it was the only one in the request.
+        if result["is_big_win"] and len(classified) != 1:
+            return
+        for image in classified:
+            self._cache.put(image.sha256, image.phash, result["is_big_win"], result["reasoning"])
+
+    async def _chat(
+        self,
+        model: str,
+        system: str,
+        content: list[dict],
+        max_tokens: int,
+        stage: str,
+        message_id: int | None = None,
+    ):
+        """One chat completion through the circuit breaker and retries.
+
+        Returns the reply parsed as JSON, or None if the call or the parse
+        failed. Raises ``CircuitOpen`` when OpenAI is unavailable (breaker
+        open, or transient errors outlasted the retries) so the caller can
+        defer.
+        """
         if not self._client:
             logger.error("OPENAI_API_KEY not configured; skipping win classification.")
             return None
 
-        content = [
-            {
-                "type": "text",
-                "text": f"Caption text: {caption!r}" if caption else "Caption text: (none)",
-            }
-        ]
-        for url in image_urls:
-            content.append({"type": "image_url", "image_url": {"url": url}})
+        if not self._breaker.allow():
+            raise CircuitOpen(self._breaker.name)
 
+        started = time.monotonic()
         try:
-            response = await self._client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": _SYSTEM_PROMPT},
-                    {"role": "user", "content": content},
-                ],
-                max_tokens=300,
-                timeout=30,
+            response = await retry_async(
+                lambda: self._client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": content},
+                    ],
+                    max_tokens=max_tokens,
+                    timeout=WINS_AI_REQUEST_TIMEOUT,
+                ),
+                attempts=WINS_AI_RETRY_ATTEMPTS,
+                base_delay=WINS_AI_RETRY_BASE_DELAY,
+                max_delay=WINS_AI_RETRY_MAX_DELAY,
+                retry_on=_TRANSIENT_ERRORS,
+                name="OpenAI win classification",
             )
+        except _TRANSIENT_ERRORS as e:
+            self._breaker.record_failure()
+            self._metrics.incr("api_errors")
+            logger.error("OpenAI unavailable during win classification: %s", e)
+            raise CircuitOpen(self._breaker.name) from e
         except Exception:
+            self._breaker.record_success()  # reachable; the request itself was bad
+            self._metrics.incr("api_errors")
             logger.exception("OpenAI API call failed during win classification.")
             return None
 
+        if self._breaker.record_success():
+            self._requeue_deferred()
+        self._metrics.record_call(
+            stage, model, time.monotonic() - started, response.usage, message_id
+        )
+
         try:
             raw_text = response.choices[0].message.content.strip()
         except Exception:
+            self._metrics.incr("parse_failures")
             logger.exception("Malformed OpenAI response during win classification.")
             return None
 
@@ -102,60 +381,279 @@ class WinsAICog(commands.Cog):
                 raw_text = raw_text[4:].strip()
 
         try:
-            parsed = json.loads(raw_text)
-            is_big_win = bool(parsed["is_big_win"])
-            reasoning = str(parsed.get("reasoning", ""))
+            return json.loads(raw_text)
         except Exception:
+            self._metrics.incr("parse_failures")
             logger.error(
                 "Failed to parse OpenAI classification JSON. Raw response: %r", raw_text
             )
             return None
 
-        return {"is_big_win": is_big_win, "reasoning": reasoning}
+    def _parse_verdict(self, parsed) -> dict | None:
+        try:
+            return {
+                "is_big_win": bool(parsed["is_big_win"]),
+                "confidence": float(parsed.get("confidence", 1.0)),
+                "reasoning": str(parsed.get("reasoning", "")),
+            }
+        except Exception:
+            self._metrics.incr("parse_failures")
+            logger.error("Malformed win classification verdict: %r", parsed)
+            return None
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
+    async def _classify_images(
+        self,
+        image_urls: list[str],
+        caption: str,
+        message_id: int | None = None,
+        fast: bool = False,
+    ) -> dict | None:
+        """Classify images given as http(s) or ``data:`` URLs. See ``_chat``.
 
-        if not isinstance(message.channel, discord.TextChannel):
-            return
+        ``fast`` runs the first cascade stage: the cheap model, verdict and
+        confidence only.
+        """
+        content = [
+            {
+                "type": "text",
+                "text": f"Caption text: {caption!r}" if caption else "Caption text: (none)",
+            }
+        ]
+        for url in image_urls:
+            content.append(
+                {"type": "image_url", "image_url": {"url": url, "detail": WINS_AI_IMAGE_DETAIL}}
+            )
+
+        if fast:
+            parsed = await self._chat(
+                WINS_AI_CASCADE_FAST_MODEL, _FAST_SYSTEM_PROMPT, content,
+                WINS_AI_CASCADE_FAST_MAX_TOKENS, "fast", message_id,
+            )
+        else:
+            parsed = await self._chat(
+                WINS_AI_MODEL, _SYSTEM_PROMPT, content,
+                WINS_AI_MAX_OUTPUT_TOKENS, "full", message_id,
+            )
+        if parsed is None:
+            return None
+        verdict = self._parse_verdict(parsed)
+        if verdict is not None and fast:
+            verdict["reasoning"] = f"fast pass, confidence {verdict['confidence']:.2f}"
+        return verdict
+
+    async def _classify_batch(self, items: list[tuple[str, str]]) -> list[dict | None]:
+        """Classify ``(image_url, caption)`` pairs from several messages in one
+        request; returns one verdict (or None) per item, in order. With the
+        cascade on, this is the first stage and uses the cheap model."""
+        content = []
+        for n, (url, caption) in enumerate(items, 1):
+            content.append({
+                "type": "text",
+                "text": f"Image {n} — caption text: {caption!r}" if caption else f"Image {n} — caption text: (none)",
+            })
+            content.append(
+                {"type": "image_url", "image_url": {"url": url, "detail": WINS_AI_IMAGE_DETAIL}}
+            )
+
+        max_tokens = BATCH_TOKENS_PER_IMAGE * len(items) + 50
+        model = WINS_AI_CASCADE_FAST_MODEL if WINS_AI_CASCADE_ENABLED else WINS_AI_MODEL
+        parsed = await self._chat(model, _BATCH_SYSTEM_PROMPT, content, max_tokens, "batch")
+        self._metrics.incr("batched_images", len(items))
+        if parsed is None:
+            return [None] * len(items)
+
+        by_image = {}
+        try:
+            for entry in parsed["verdicts"]:
+                by_image[int(entry["image"])] = entry
+        except Exception:
+            self._metrics.incr("parse_failures")
+            logger.error("Malformed batched win classification: %r", parsed)
+            return [None] * len(items)
+        return [
+            self._parse_verdict(by_image[n]) if n in by_image else None
+            for n in range(1, len(items) + 1)
+        ]
 
-        if not WINS_CHANNEL_ID or message.channel.id != WINS_CHANNEL_ID:
+    async def _batched_verdict(self, image_urls: list[str], caption: str) -> dict | None:
+        verdicts = await asyncio.gather(
+            *(self._batcher.submit((url, caption)) for url in image_urls),
+            return_exceptions=True,
+        )
+        for v in verdicts:
+            if isinstance(v, BaseException):
+                raise v
+        big = [v for v in verdicts if v and v["is_big_win"]]
+        if big:
+            return max(big, key=lambda v: v["confidence"])
+        if any(v is None for v in verdicts):
+            return None
+        return {
+            "is_big_win": False,
+            "confidence": min(v["confidence"] for v in verdicts),
+            "reasoning": "; ".join(v["reasoning"] for v in verdicts),
+        }
+
+    def _should_escalate(self, verdict: dict) -> bool:
+        if WINS_AI_CASCADE_ESCALATE_POSITIVES and verdict["is_big_win"]:
+            return True
+        return verdict["confidence"] < WINS_AI_CASCADE_MIN_CONFIDENCE
+
+    async def _classify_message(
+        self, image_urls: list[str], caption: str, message_id: int
+    ) -> dict | None:
+        """Classify one message's images: batched with other messages' when
+        micro-batching is on (big win if any image is one), then escalated to
+        the full classification when the cascade policy asks for it or the
+        first pass gave no verdict."""
+        if self._batcher is not None:
+            first = await self._batched_verdict(image_urls, caption)
+        elif WINS_AI_CASCADE_ENABLED:
+            first = await self._classify_images(image_urls, caption, message_id, fast=True)
+        else:
+            return await self._classify_images(image_urls, caption, message_id)
+
+        if not WINS_AI_CASCADE_ENABLED:
+            return first
+        if first is not None and not self._should_escalate(first):
+            return first
+        self._metrics.incr("escalations")
+        second = await self._classify_images(image_urls, caption, message_id)
+        return second if second is not None else first
+
+    async def _on_wins_message(self, parsed: ParsedMessage):
+        if not parsed.is_text_channel:
             return
 
-        images = self._get_image_attachments(message)
+        images = parsed.images
         if not images:
             return
 
-        if self._on_cooldown(message.author.id):
+        # Classification can take many seconds; hand it to the worker pool.
+        self._queue.submit((parsed.message, images, time.monotonic()))
+
+    async def _verdict(
+        self,
+        message: discord.Message,
+        images: list[discord.Attachment],
+        backfill: bool = False,
+    ) -> tuple[dict | None, str]:
+        """Resolve a verdict via the cache, the pre-filter, then OpenAI.
+
+        Returns ``(result, source)``; ``result`` is None when the message was
+        skipped (rate limited, or the call failed). Raises ``CircuitOpen`` when
+        OpenAI is unavailable. A backfill ignores cached verdicts (the point is
+        to re-run the classifier) and waits for rate-limit budget instead of
+        skipping.
+        """
+        fetched = await self._fetch_images(images)
+
+        result, uncached = None, []
+        if fetched is not None:
+            if backfill:
+                uncached = fetched
+            else:
+                result, uncached = self._cached_verdict(fetched)
+        source = "cache"
+
+        plausible = True
+        if result is None and self._prefilter and uncached:
+            uncached, plausible = self._prefiltered(message.id, uncached)
+            if not uncached:
+                return {"is_big_win": False, "reasoning": "pre-filter: not a payout screenshot"}, "prefilter"
+
+        if result is None:
+            if fetched is not None:
+                image_urls = [i.data_url for i in uncached]
+                scale = [min(1.0, WINS_AI_IMAGE_MAX_EDGE / max(i.size)) for i in uncached]
+                sizes = [(i.size[0] * k, i.size[1] * k) for i, k in zip(uncached, scale)]
+            else:
+                image_urls = [a.url for a in images]
+                sizes = [(a.width or 1024, a.height or 1024) for a in images]
+
+            costs = {"calls": 1, "tokens": _estimate_tokens(sizes)}
+            if backfill:
+                # Shared budgets only, plus the backfill's own cap, so live
+                # messages always keep part of the global budget.
+                costs["backfill_calls"] = 1
+                while (reservation := self._limiter.acquire(None, costs)) is None:
+                    await asyncio.sleep(WINS_BACKFILL_POLL_SECONDS)
+            else:
+                reservation = self._limiter.acquire(message.author.id, costs)
+                if reservation is None:
+                    self._metrics.incr("cooldown_skips")
+                    logger.debug(
+                        "Skipping win classification for user %d: rate limited.",
+                        message.author.id,
+                    )
+                    return None, "rate_limited"
+
+            try:
+                result = await self._classify_message(image_urls, message.content or "", message.id)
+            except CircuitOpen:
+                self._limiter.refund(reservation)
+                raise
+            if result is None:
+                self._limiter.refund(reservation)
+                return None, "failed"
+            if fetched is not None:
+                self._remember(uncached, result)
+                if self._prefilter:
+                    self._prefilter.record(plausible, result["is_big_win"])
+            source = "model" if plausible else "model (audit)"
+
+        return result, source
+
+    def _store_verdict(self, message: discord.Message, result: dict, source: str):
+        self._verdicts.put(
+            message.id,
+            message.channel.id,
+            message.author.id,
+            result["is_big_win"],
+            result["reasoning"],
+            source,
+        )
+
+    async def _process(self, job: tuple[discord.Message, list[discord.Attachment], float]):
+        message, images, received_at = job
+        try:
+            result, source = await self._verdict(message, images)
+        except CircuitOpen:
+            self._deferred.append(job)
+            self._metrics.incr("deferred")
             logger.debug(
-                "Skipping win classification for user %d due to cooldown.",
-                message.author.id,
+                "Deferred win classification for message %d (%d waiting).",
+                message.id, len(self._deferred),
             )
             return
-
-        caption = message.content or ""
-        image_urls = [a.url for a in images]
-
-        result = await self._classify_images(image_urls, caption)
         if result is None:
             return
+        self._store_verdict(message, result, source)
 
         is_big_win = result["is_big_win"]
         reasoning = result["reasoning"]
+        self._metrics.end_to_end.observe(time.monotonic() - received_at)
+        self._metrics.incr(f"{source.split()[0]}_verdicts")
+        if is_big_win:
+            self._metrics.incr("big_wins")
 
         logger.info(
-            "Win classification for message %d by %s: verdict=%s reasoning=%s",
+            "Win classification for message %d by %s: verdict=%s source=%s "
+            "cache_hit_rate=%.0f%% queue_depth=%d latency=%.1fs reasoning=%s",
             message.id,
             message.author,
             "big" if is_big_win else "small",
+            source,
+            self._cache.hit_rate * 100,
+            self._queue.depth,
+            time.monotonic() - received_at,
             reasoning,
         )
 
-        if not is_big_win:
-            return
+        if is_big_win:
+            await self._announce_big_win(message)
 
+    async def _announce_big_win(self, message: discord.Message):
         try:
             await message.add_reaction("🔥")
         except Exception:
@@ -182,6 +680,233 @@ class WinsAICog(commands.Cog):
                 message.id,
             )
 
+    # ------------------------------------------------------------------ #
+    #  History backfill                                                    #
+    # ------------------------------------------------------------------ #
+
+    def _load_backfill(self) -> dict | None:
+        if not BACKFILL_PATH.exists():
+            return None
+        try:
+            return json.loads(BACKFILL_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            logger.warning("Unreadable backfill checkpoint %s; ignoring it.", BACKFILL_PATH)
+            return None
+
+    def _save_backfill(self, state: dict):
+        BACKFILL_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = BACKFILL_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, BACKFILL_PATH)
+
+    def _start_backfill(self, state: dict):
+        self._backfill_state = state
+        self._backfill_task = asyncio.get_running_loop().create_task(
+            self._run_backfill(state), name="wins_ai-backfill"
+        )
+
+    @property
+    def _backfill_running(self) -> bool:
+        return self._backfill_task is not None and not self._backfill_task.done()
+
+    async def _run_backfill(self, state: dict):
+        """Classify #wins history oldest-first from ``state["after"]`` up to
+        ``state["until"]``, checkpointing after every page."""
+        await self.bot.wait_until_ready()
+        channel = self.bot.get_channel(WINS_CHANNEL_ID)
+        if not isinstance(channel, discord.TextChannel):
+            logger.error("Backfill: WINS_CHANNEL_ID=%d not found or not a text channel.", WINS_CHANNEL_ID)
+            return
+
+        sem = asyncio.Semaphore(WINS_BACKFILL_CONCURRENCY)
+        logger.info("Backfill of #wins started after message %s.", state["after"])
+        try:
+            while True:
+                page = [
+                    m async for m in channel.history(
+                        limit=WINS_BACKFILL_PAGE_SIZE,
+                        after=discord.Object(id=state["after"]),
+                        before=discord.Object(id=state["until"] + 1),
+                        oldest_first=True,
+                    )
+                ]
+                if not page:
+                    break
+
+                async def one(m: discord.Message):
+                    async with sem:
+                        await self._backfill_message(m, state)
+
+                await asyncio.gather(*(one(m) for m in page))
+                state["after"] = page[-1].id
+                self._save_backfill(state)
+        except asyncio.CancelledError:
+            if state.get("cancelled"):
+                BACKFILL_PATH.unlink(missing_ok=True)
+                logger.info("Backfill of #wins cancelled at message %d.", state["after"])
+            else:
+                logger.info("Backfill of #wins paused at message %d.", state["after"])
+            raise
+        except Exception:
+            logger.exception("Backfill of #wins failed at message %d; resume with /backfill_wins.", state["after"])
+            return
+
+        BACKFILL_PATH.unlink(missing_ok=True)
+        logger.info(
+            "Backfill of #wins finished: %d message(s) classified, %d big win(s) (%d new).",
+            state["classified"], state["big_wins"], state["new_big_wins"],
+        )
+
+    async def _backfill_message(self, message: discord.Message, state: dict):
+        if message.author.bot:
+            return
+        images = ParsedMessage(message, self.bot.user).images
+        if not images:
+            return
+
+        while True:
+            try:
+                result, source = await self._verdict(message, images, backfill=True)
+                break
+            except CircuitOpen:
+                await asyncio.sleep(WINS_AI_BREAKER_RESET_SECONDS)
+        if result is None:
+            return
+
+        previous = self._verdicts.get(message.id)
+        self._store_verdict(message, result, f"backfill:{source}")
+        state["classified"] += 1
+        if not result["is_big_win"]:
+            return
+        state["big_wins"] += 1
+        if previous is None or not previous["is_big_win"]:
+            state["new_big_wins"] += 1
+            if state["forward"]:
+                await self._announce_big_win(message)
+
+    # --- /backfill_wins ---
+
+    @app_commands.command(
+        name="backfill_wins",
+        description="Re-run the win classifier over #wins history (staff only).",
+    )
+    @app_commands.describe(
+        action="Start (or resume) a backfill, cancel it, or show progress",
+        forward="Forward newly detected big wins to the big wins channel",
+    )
+    @app_commands.choices(action=[
+        app_commands.Choice(name="start", value="start"),
+        app_commands.Choice(name="status", value="status"),
+        app_commands.Choice(name="cancel", value="cancel"),
+    ])
+    @app_commands.default_permissions(manage_messages=True)
+    async def backfill_wins(
+        self,
+        interaction: discord.Interaction,
+        action: app_commands.Choice[str],
+        forward: bool = False,
+    ):
+        if not is_staff(interaction.user):
+            return await interaction.response.send_message("⛔ You don't have permission to use this.", ephemeral=True)
+
+        state = self._backfill_state
+        if action.value == "status":
+            if state is None:
+                return await interaction.response.send_message("_No backfill has run since startup._", ephemeral=True)
+            status = "running" if self._backfill_running else "stopped"
+            return await interaction.response.send_message(
+                f"**Backfill {status}** — {state['classified']:,} classified · {state['big_wins']:,} big wins"
+                f" ({state['new_big_wins']:,} new) · checkpoint `{state['after']}` of `{state['until']}`",
+                ephemeral=True,
+            )
+
+        if action.value == "cancel":
+            if not self._backfill_running:
+                return await interaction.response.send_message("_No backfill is running._", ephemeral=True)
+            state["cancelled"] = True
+            self._backfill_task.cancel()
+            return await interaction.response.send_message("🛑 Backfill cancelled.", ephemeral=True)
+
+        if self._backfill_running:
+            return await interaction.response.send_message("⏳ A backfill is already running.", ephemeral=True)
+        channel = self.bot.get_channel(WINS_CHANNEL_ID)
+        if not isinstance(channel, discord.TextChannel):
+            return await interaction.response.send_message("❌ #wins channel not found.", ephemeral=True)
+
+        state = self._load_backfill()
+        if state is None:
+            state = {
+                "after": 0,
+                "until": channel.last_message_id or interaction.id,
+                "forward": forward,
+                "classified": 0,
+                "big_wins": 0,
+                "new_big_wins": 0,
+            }
+            self._save_backfill(state)
+            note = "Started"
+        else:
+            state["forward"] = forward
+            note = "Resumed"
+        self._start_backfill(state)
+        await interaction.response.send_message(
+            f"✅ {note} backfill of {channel.mention} (forwarding {'on' if forward else 'off'}). "
+            "Use `/backfill_wins status` to follow progress.",
+            ephemeral=True,
+        )
+
+    # --- /wins_ai_stats ---
+
+    @app_commands.command(
+        name="wins_ai_stats",
+        description="Show #wins classifier latency, token usage and cost (staff only).",
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def wins_ai_stats(self, interaction: discord.Interaction):
+        if not is_staff(interaction.user):
+            return await interaction.response.send_message("⛔ You don't have permission to use this.", ephemeral=True)
+        m = self._metrics
+        c = m.counters
+        lines = [
+            f"**Wins AI** since <t:{int(m.since.timestamp())}:R>",
+            f"**OpenAI calls:** {m.calls:,} · {m.prompt_tokens:,} in / {m.completion_tokens:,} out tokens"
+            f" · est. ${m.cost_usd:.4f}",
+        ]
+        for stage, h in sorted(m.latency.items()):
+            lines.append(
+                f"**`{stage}`:** {h.count:,} calls · ${m.cost_by_stage.get(stage, 0.0):.4f}"
+                f" · avg {h.avg:.2f}s · p50 ≤{h.percentile(50):.2f}s"
+                f" · p95 ≤{h.percentile(95):.2f}s · max {h.max:.2f}s"
+            )
+        h = m.end_to_end
+        lines += [
+            f"**End to end:** {h.count:,} verdicts · avg {h.avg:.2f}s · p95 ≤{h.percentile(95):.2f}s"
+            f" · max {h.max:.2f}s",
+            f"**Verdicts:** {c.get('model_verdicts', 0):,} model · {c.get('cache_verdicts', 0):,} cache"
+            f" · {c.get('prefilter_verdicts', 0):,} pre-filter · {c.get('big_wins', 0):,} big wins"
+            f" · {c.get('escalations', 0):,} escalated",
+            f"**Cache:** hit rate {self._cache.hit_rate:.0%} ({self._cache.exact_hits:,} hits ·"
+            f" {self._cache.misses:,} misses, {self._cache.near_matches:,} of them near-duplicates)",
+            f"**Skipped:** {c.get('cooldown_skips', 0):,} rate limited · {c.get('parse_failures', 0):,}"
+            f" parse failures · {c.get('api_errors', 0):,} API errors · {c.get('deferred', 0):,} deferred"
+            f" ({len(self._deferred)} waiting)",
+            f"**Queue:** depth {self._queue.depth} · {self._queue.dropped:,} dropped ·"
+            f" wait avg {self._queue.wait_avg:.2f}s / max {self._queue.wait_max:.2f}s",
+            f"**Circuit breaker:** {self._breaker.state} · {self._breaker.trips} trips",
+        ]
+        if self._batcher:
+            lines.append(
+                f"**Micro-batching:** {self._batcher.batches:,} batches · {self._batcher.items:,} images"
+                f" · avg {self._batcher.avg_batch_size:.1f} per request"
+            )
+        if self._prefilter:
+            p = self._prefilter
+            lines.append(
+                f"**Pre-filter:** {p.passed:,} passed · {p.rejected:,} rejected · {p.audited:,} audited"
+                f" · precision {p.precision:.2f} · recall {p.recall:.2f}"
+            )
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(WinsAICog(bot))
@@ -31,10 +31,25 @@ COOLDOWN_SECONDS = 24 * 60 * 60  # 24 hours
 
 # -----------------------------------------------------------------------------
 # ACTIVITY AUTO-SAVE INTERVAL
-# How often (in seconds) the bot saves activity data to disk.
-# Data is always saved on bot shutdown regardless of this setting.
+# SAVE_ACTIVITY_INTERVAL — How often (in seconds) the activity journal is
+#                          compacted into a fresh snapshot on disk.
+# JOURNAL_FSYNC_INTERVAL — How often (in seconds) new counter changes in the
+#                          journal are fsynced. Changes newer than this can be
+#                          lost on a crash; everything older survives.
+# Data is always saved on bot shutdown regardless of these settings.
 # -----------------------------------------------------------------------------
 SAVE_ACTIVITY_INTERVAL = 10 * 60  # 10 minutes
+JOURNAL_FSYNC_INTERVAL = 0.25     # 250 ms
+
+# -----------------------------------------------------------------------------
+# ACTIVITY HISTORY
+# HISTORY_DAYS    — How many days of per-user daily chat/win counts to keep.
+#                   Memory per active user is fixed by this value.
+# HISTORY_WINDOWS — Rolling windows (in days) shown by /stats trend:True.
+#                   Each must be <= HISTORY_DAYS.
+# -----------------------------------------------------------------------------
+HISTORY_DAYS = 30
+HISTORY_WINDOWS = (7, 30)
 
 # -----------------------------------------------------------------------------
 # GROWI TICKET CONFIG
@@ -88,6 +103,55 @@ TIER_ROLE_IDS = {
     4: 1425403620139991061,  # Tier 4 role
 }
 
+# -----------------------------------------------------------------------------
+# ROLE EDIT QUEUE
+# Badge, tier and reaction-role changes go through one queue per server.
+# ROLE_EDIT_COALESCE_SECONDS — How long a member's change waits for more
+#                              changes to merge into the same edit.
+# ROLE_EDIT_MIN_INTERVAL     — Fixed gap (seconds) between two role edits
+#                              in the same server. A deliberate stand-in for
+#                              Discord's member-edit bucket, whose state
+#                              discord.py keeps to itself.
+# -----------------------------------------------------------------------------
+ROLE_EDIT_COALESCE_SECONDS = 0.25
+ROLE_EDIT_MIN_INTERVAL = 0.5
+
+# -----------------------------------------------------------------------------
+# DM DELIVERY QUEUE
+# Reaction-triggered form DMs are sent by a small worker pool instead of
+# inline in the reaction handler.
+# DM_QUEUE_WORKERS         — Number of concurrent DM senders.
+# DM_QUEUE_MAX_SIZE        — Max DMs waiting; new ones are refused beyond it.
+# DM_QUEUE_MIN_INTERVAL    — Minimum gap (seconds) between two DMs, across
+#                            all workers. This is what paces a burst of DMs;
+#                            discord.py also waits out Discord's rate limits
+#                            on its own.
+# DM_QUEUE_RETRY_ATTEMPTS  — Tries per DM when a rate limit still gets
+#                            through discord.py; all sending pauses for the
+#                            delay Discord gave.
+# DM_NOTICE_WINDOW         — Users whose DMs are closed within this many
+#                            seconds of each other share one channel notice.
+# DM_NOTICE_MAX_MENTIONS   — Max users mentioned in one such notice.
+# -----------------------------------------------------------------------------
+DM_QUEUE_WORKERS = 2
+DM_QUEUE_MAX_SIZE = 5000
+DM_QUEUE_MIN_INTERVAL = 0.25
+DM_QUEUE_RETRY_ATTEMPTS = 3
+DM_NOTICE_WINDOW = 5.0
+DM_NOTICE_MAX_MENTIONS = 20
+
+# -----------------------------------------------------------------------------
+# MEMBER / USER RESOLVER
+# Guilds, members, users and channels missing from Discord's gateway cache are
+# fetched over REST once and kept here, shared by every feature.
+# RESOLVER_MAX_ENTRIES — Max fetched objects kept (least recently used go
+#                        first).
+# RESOLVER_TTL_SECONDS — How long a fetched object is reused. Fetched members
+#                        carry their roles as of the fetch, so keep this short.
+# -----------------------------------------------------------------------------
+RESOLVER_MAX_ENTRIES = 5000
+RESOLVER_TTL_SECONDS = 60
+
 # -----------------------------------------------------------------------------
 # BADGE ROLES
 # Role IDs for each activity/achievement badge. Assigned automatically when
@@ -117,6 +181,179 @@ WINS_CHANNEL_ID = 1292975300740644936
 BIG_WINS_CHANNEL_ID = 1514653953193676840
 BIG_WIN_THRESHOLD_USD = 1000
 
+# -----------------------------------------------------------------------------
+# WINS AI — MODELS & CASCADE
+# WINS_AI_MODEL             — Model for the full classification (verdict plus
+#                             reasoning). With the cascade on, only escalated
+#                             images get this call.
+# WINS_AI_MAX_OUTPUT_TOKENS — Output token cap for the full classification.
+# WINS_AI_CASCADE_ENABLED   — Run a cheap first pass (verdict + confidence
+#                             only) and escalate to the full classification
+#                             only when the policy below says so.
+# WINS_AI_CASCADE_FAST_MODEL      — Model for the first pass.
+# WINS_AI_CASCADE_FAST_MAX_TOKENS — Output token cap for the first pass.
+# WINS_AI_CASCADE_MIN_CONFIDENCE  — Escalate when the first pass is less sure
+#                                   than this (0–1).
+# WINS_AI_CASCADE_ESCALATE_POSITIVES — Also escalate every first-pass big win,
+#                                      so nothing is forwarded on the cheap
+#                                      pass alone.
+# -----------------------------------------------------------------------------
+WINS_AI_MODEL = "gpt-4o-mini"
+WINS_AI_MAX_OUTPUT_TOKENS = 300
+WINS_AI_CASCADE_ENABLED = True
+WINS_AI_CASCADE_FAST_MODEL = "gpt-4o-mini"
+WINS_AI_CASCADE_FAST_MAX_TOKENS = 20
+WINS_AI_CASCADE_MIN_CONFIDENCE = 0.85
+WINS_AI_CASCADE_ESCALATE_POSITIVES = True
+
+# -----------------------------------------------------------------------------
+# WINS AI — IMAGE DOWNLOADS, PREPROCESSING & VERDICT CACHE
+# IMAGE_MAX_DOWNLOAD_BYTES    — Attachments larger than this are not downloaded
+#                               (the classifier falls back to the CDN URL).
+# WINS_AI_IMAGE_MAX_EDGE      — Downloaded images are downsampled so their
+#                               longest edge is at most this many pixels.
+# WINS_AI_IMAGE_FORMAT        — Re-encode format: "JPEG" or "WEBP".
+# WINS_AI_IMAGE_QUALITY       — Re-encode quality (1–95).
+# WINS_AI_IMAGE_DETAIL        — OpenAI image detail: "low", "high" or "auto".
+#                               "low" is a flat, small token cost per image.
+# VERDICT_CACHE_MAX_ENTRIES   — How many image verdicts to keep on disk (LRU).
+# VERDICT_CACHE_TTL_SECONDS   — How long a cached verdict stays valid.
+# VERDICT_CACHE_MAX_DISTANCE  — Max perceptual-hash distance (bits out of 64)
+#                               for an image to be logged as a near-duplicate
+#                               of a cached one. Verdicts are only reused for
+#                               identical files; near-duplicates are still
+#                               classified.
+# -----------------------------------------------------------------------------
+IMAGE_MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024  # 10 MB
+WINS_AI_IMAGE_MAX_EDGE = 768
+WINS_AI_IMAGE_FORMAT = "JPEG"
+WINS_AI_IMAGE_QUALITY = 80
+WINS_AI_IMAGE_DETAIL = "low"
+VERDICT_CACHE_MAX_ENTRIES = 5000
+VERDICT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60  # 30 days
+VERDICT_CACHE_MAX_DISTANCE = 6
+
+# -----------------------------------------------------------------------------
+# WINS AI — LOCAL PRE-FILTER
+# Images that clearly aren't PayPal payout screenshots are rejected on the CPU
+# without an OpenAI call. Tune with scripts/eval_prefilter.py.
+# WINS_AI_PREFILTER_ENABLED         — Set False to send every image to the model.
+# WINS_AI_PREFILTER_MAX_ASPECT      — Reject images whose long/short edge ratio
+#                                     is above this (banners, stitched scrolls).
+# WINS_AI_PREFILTER_MIN_NEUTRAL     — Reject images with less than this share of
+#                                     white/grey/black pixels (photos, memes).
+# WINS_AI_PREFILTER_ACCENT_HUES     — Hue range in degrees (0–360) of the PayPal
+#                                     blues; saturated pixels in it are allowed.
+# WINS_AI_PREFILTER_MAX_OFF_PALETTE — Reject images with more than this share of
+#                                     saturated pixels outside the accent hues.
+# WINS_AI_PREFILTER_AUDIT_RATE      — Share of rejected messages still sent to
+#                                     the model to measure precision/recall.
+# WINS_AI_PREFILTER_REPORT_EVERY    — Log precision/recall every N scored verdicts.
+# -----------------------------------------------------------------------------
+WINS_AI_PREFILTER_ENABLED = True
+WINS_AI_PREFILTER_MAX_ASPECT = 3.5
+WINS_AI_PREFILTER_MIN_NEUTRAL = 0.55
+WINS_AI_PREFILTER_ACCENT_HUES = (185, 240)
+WINS_AI_PREFILTER_MAX_OFF_PALETTE = 0.15
+WINS_AI_PREFILTER_AUDIT_RATE = 0.05
+WINS_AI_PREFILTER_REPORT_EVERY = 50
+
+# -----------------------------------------------------------------------------
+# WINS AI — RATE LIMITS
+# Token buckets that refill continuously over their period: a user who spent
+# their budget gets it back gradually. A classification is only charged if the
+# OpenAI call succeeds.
+# WINS_AI_USER_CALLS_PER_MINUTE   — Classifications per user per minute.
+# WINS_AI_USER_TOKENS_PER_HOUR    — Estimated OpenAI tokens per user per hour.
+# WINS_AI_GLOBAL_CALLS_PER_MINUTE — Classifications per minute across all users.
+# WINS_AI_GLOBAL_TOKENS_PER_HOUR  — Estimated OpenAI tokens per hour, all users.
+# -----------------------------------------------------------------------------
+WINS_AI_USER_CALLS_PER_MINUTE = 1
+WINS_AI_USER_TOKENS_PER_HOUR = 50_000
+WINS_AI_GLOBAL_CALLS_PER_MINUTE = 30
+WINS_AI_GLOBAL_TOKENS_PER_HOUR = 1_000_000
+
+# -----------------------------------------------------------------------------
+# WINS AI — OPENAI RETRIES & CIRCUIT BREAKER
+# WINS_AI_REQUEST_TIMEOUT       — Seconds before one OpenAI request is abandoned.
+# WINS_AI_RETRY_ATTEMPTS        — Tries per classification on timeouts, 429s
+#                                 and 5xx errors (1 = no retry).
+# WINS_AI_RETRY_BASE_DELAY      — Backoff before the first retry; doubles each
+#                                 retry, randomised ("jitter").
+# WINS_AI_RETRY_MAX_DELAY       — Longest wait between two retries.
+# WINS_AI_BREAKER_FAILURES      — Failed classifications in a row before OpenAI
+#                                 is considered down and calls stop.
+# WINS_AI_BREAKER_RESET_SECONDS — How long to stop calling before trying again.
+# WINS_AI_DEFERRED_MAX          — Messages kept to reclassify once OpenAI is
+#                                 back; the oldest are dropped beyond this.
+# Set the OPENAI_BASE_URL environment variable to point the classifier at
+# another endpoint, e.g. scripts/stub_openai_server.py for local testing.
+# -----------------------------------------------------------------------------
+WINS_AI_REQUEST_TIMEOUT = 15
+WINS_AI_RETRY_ATTEMPTS = 3
+WINS_AI_RETRY_BASE_DELAY = 0.5
+WINS_AI_RETRY_MAX_DELAY = 8.0
+WINS_AI_BREAKER_FAILURES = 3
+WINS_AI_BREAKER_RESET_SECONDS = 30
+WINS_AI_DEFERRED_MAX = 200
+
+# -----------------------------------------------------------------------------
+# WINS AI — COST TRACKING
+# OPENAI_PRICES_PER_1M     — USD per 1M (input, output) tokens by model, used
+#                            for the estimated cost in /wins_ai_stats and the
+#                            daily cost ledger in data/wins_ai_costs/.
+# WINS_AI_COST_LEDGER_DAYS — How many days of cost ledger files to keep.
+# -----------------------------------------------------------------------------
+OPENAI_PRICES_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+WINS_AI_COST_LEDGER_DAYS = 30
+
+# -----------------------------------------------------------------------------
+# WINS AI — CLASSIFICATION QUEUE
+# #wins images are classified by a pool of background workers, not inside the
+# message handler.
+# WINS_AI_WORKERS         — How many classifications may run at once.
+# WINS_AI_QUEUE_SIZE      — How many messages may wait for a worker.
+# WINS_AI_OVERFLOW_POLICY — What to do when the queue is full:
+#                           "drop_oldest"   — discard the longest-waiting message
+#                           "reject_newest" — ignore the new message
+# -----------------------------------------------------------------------------
+WINS_AI_WORKERS = 2
+WINS_AI_QUEUE_SIZE = 50
+WINS_AI_OVERFLOW_POLICY = "drop_oldest"
+
+# -----------------------------------------------------------------------------
+# WINS AI — MICRO-BATCHING
+# When enabled, images from several #wins posts that arrive close together are
+# classified in one OpenAI request (one verdict per image), so the system
+# prompt and request overhead are paid once per batch instead of per post.
+# WINS_AI_BATCH_ENABLED        — Turn micro-batching on or off.
+# WINS_AI_BATCH_WINDOW_SECONDS — How long the first image waits for others.
+# WINS_AI_BATCH_MAX_IMAGES     — Send the batch as soon as it has this many
+#                                images.
+# -----------------------------------------------------------------------------
+WINS_AI_BATCH_ENABLED = False
+WINS_AI_BATCH_WINDOW_SECONDS = 2.0
+WINS_AI_BATCH_MAX_IMAGES = 8
+
+# -----------------------------------------------------------------------------
+# WINS AI — HISTORY BACKFILL (/backfill_wins)
+# WINS_BACKFILL_CONCURRENCY      — Messages classified at once by a backfill.
+# WINS_BACKFILL_PAGE_SIZE        — Messages fetched per history page; progress
+#                                  is checkpointed after each page.
+# WINS_BACKFILL_CALLS_PER_MINUTE — OpenAI calls per minute a backfill may use.
+#                                  Keep it below WINS_AI_GLOBAL_CALLS_PER_MINUTE
+#                                  so live #wins posts are never starved.
+# WINS_BACKFILL_POLL_SECONDS     — How often a rate-limited backfill checks for
+#                                  budget again.
+# -----------------------------------------------------------------------------
+WINS_BACKFILL_CONCURRENCY = 2
+WINS_BACKFILL_PAGE_SIZE = 50
+WINS_BACKFILL_CALLS_PER_MINUTE = 10
+WINS_BACKFILL_POLL_SECONDS = 2.0
+
 # -----------------------------------------------------------------------------
 # RANK THRESHOLDS
 # Minimum stats required to be upgraded to each badge tier automatically.
@@ -0,0 +1,117 @@
+"""Expiring per-user cooldowns, shared by every feature that needs one.
+
+A cooldown is identified by a ``scope`` (the feature, e.g. ``"reaction_form"``)
+and a key within it (a user ID, or a tuple such as ``(message_id, user_id)``).
+Each one is scheduled on a ``TimingWheel`` for its deadline and dropped when
+it passes, so memory is bounded by cooldowns that are still running rather
+than by everything that ever started one. Lookups only read the deadline;
+the wheel is advanced when a cooldown starts or the store is saved.
+
+Deadlines are wall-clock timestamps. ``save`` snapshots the running
+cooldowns to disk (temp file + ``os.replace``) and the store reloads them on
+startup, so a restart doesn't let anyone skip the rest of their cooldown.
+``COOLDOWNS`` is the shared instance; ReactionsCog saves it periodically.
+"""
+
+from pathlib import Path
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Hashable
+
+from timing_wheel import TimingWheel
+
+logger = logging.getLogger("thcbot")
+
+PATH = Path("data/cooldowns.json")
+
+
+def _freeze(key):
+    """JSON has no tuples: turn a loaded list key back into one."""
+    return tuple(key) if isinstance(key, list) else key
+
+
+class CooldownStore:
+    # One revolution is ~68h: cooldowns up to that long never share a slot
+    # with "now", which advance() re-scans on every call within a tick.
+    def __init__(self, path: Path | None = None, resolution: float = 60.0, slots: int = 4096):
+        self._path = path
+        self._wheel = TimingWheel(resolution=resolution, slots=slots)
+        self.dirty = False
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._wheel)
+
+    def remaining(self, scope: str, key: Hashable, now: float | None = None) -> float:
+        """Seconds left on the cooldown, or 0.0 if there is none."""
+        # Read-only: an expired deadline reads as 0.0 whether or not the wheel
+        # has dropped it yet, so lookups leave expiry to start() and save().
+        now = time.time() if now is None else now
+        deadline = self._wheel.deadline((scope, key))
+        return max(0.0, deadline - now) if deadline is not None else 0.0
+
+    def active(self, scope: str, key: Hashable, now: float | None = None) -> bool:
+        return self.remaining(scope, key, now) > 0
+
+    def start(self, scope: str, key: Hashable, seconds: float, now: float | None = None):
+        """Start (or restart) a cooldown of ``seconds`` on ``key``."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        self._wheel.schedule((scope, key), now + seconds)
+        self.dirty = True
+
+    def clear(self, scope: str, key: Hashable):
+        if (scope, key) in self._wheel:
+            self._wheel.cancel((scope, key))
+            self.dirty = True
+
+    def _expire(self, now: float):
+        if self._wheel.advance(now):
+            self.dirty = True
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                         #
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> dict:
+        self._expire(time.time())
+        return {
+            "cooldowns": [
+                [scope, list(key) if isinstance(key, tuple) else key, deadline]
+                for (scope, key), deadline in self._wheel.items()
+            ]
+        }
+
+    def save(self):
+        if self._path is None:
+            return
+        data = self.snapshot()
+        self.dirty = False
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=str(self._path.parent), delete=False, suffix=".tmp", encoding="utf-8"
+        ) as f:
+            json.dump(data, f, separators=(",", ":"))
+            tmp = f.name
+        os.replace(tmp, str(self._path))
+
+    def _load(self):
+        if not self._path.exists():
+            return
+        try:
+            rows = json.loads(self._path.read_text(encoding="utf-8")).get("cooldowns", [])
+        except Exception:
+            logger.warning("Could not read cooldowns from %s; starting fresh.", self._path)
+            return
+        now = time.time()
+        for scope, key, deadline in rows:
+            if deadline > now:
+                self._wheel.schedule((scope, _freeze(key)), deadline)
+        self.dirty = False
+
+
+COOLDOWNS = CooldownStore(PATH)
@@ -0,0 +1,228 @@
+"""Outbound DM delivery, paced and retried off the event handlers.
+
+Event handlers ``submit`` a ``DMJob`` and return immediately; a small
+``WorkQueue`` worker pool delivers them. All workers share one pacer that
+spaces sends by ``min_interval``; that spacing is what normally paces a
+burst of DMs.
+
+discord.py reads the rate-limit headers itself: it waits out exhausted
+buckets and retries 429s internally, and never shows us the headers of a
+successful response. Only what it gives up on reaches this module — a
+``RateLimited`` error, or a 429 ``HTTPException`` after its own retries. For
+those, every worker pauses for the ``Retry-After`` /
+``X-RateLimit-Reset-After`` on the error response and the DM is retried, up
+to ``attempts`` tries in total.
+
+Users whose DMs are closed are not told one message at a time: their
+mentions are collected per (channel, notice) by a ``MicroBatcher`` for
+``notice_window`` seconds and posted as one channel message of up to
+``notice_max_mentions`` mentions.
+
+Queue depth and enqueue-to-delivery latency are exposed for /dm_queue_stats.
+"""
+
+import asyncio
+import logging
+import time
+
+import discord
+
+from classifier_metrics import LatencyHistogram
+from micro_batcher import MicroBatcher
+from work_queue import REJECT_NEWEST, WorkQueue
+
+logger = logging.getLogger("thcbot")
+
+_DM_CLOSED = 50007  # "Cannot send messages to this user"
+
+
+class DMJob:
+    __slots__ = ("user_id", "content", "channel_id", "notice", "enqueued_at", "attempt")
+
+    def __init__(self, user_id: int, content: str, channel_id: int | None = None, notice: str = ""):
+        """``notice`` is posted in ``channel_id`` after the mentions if the DM
+        can't be delivered; with no channel the failure is only logged."""
+        self.user_id = user_id
+        self.content = content
+        self.channel_id = channel_id
+        self.notice = notice
+        self.enqueued_at = time.monotonic()
+        self.attempt = 0
+
+
+def _retry_after(e: Exception) -> float | None:
+    """Seconds Discord asked us to wait, read from an error discord.py raised.
+    Successful responses' headers are handled inside discord.py."""
+    if isinstance(e, discord.RateLimited):
+        return e.retry_after
+    if not isinstance(e, discord.HTTPException):
+        return None
+    headers = getattr(e.response, "headers", None) or {}
+    if e.status == 429:
+        for name in ("Retry-After", "X-RateLimit-Reset-After"):
+            try:
+                return float(headers[name])
+            except (KeyError, TypeError, ValueError):
+                continue
+        return 1.0
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return float(headers.get("X-RateLimit-Reset-After", 0))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class DMQueue:
+    def __init__(
+        self,
+        bot: discord.Client,
+        *,
+        workers: int,
+        maxsize: int,
+        min_interval: float,
+        attempts: int,
+        notice_window: float,
+        notice_max_mentions: int,
+    ):
+        self._bot = bot
+        self._min_interval = min_interval
+        self._attempts = attempts
+        self._notice_window = notice_window
+        self._notice_max_mentions = notice_max_mentions
+        self._queue = WorkQueue(
+            "dm_queue", self._deliver, workers=workers, maxsize=maxsize, overflow=REJECT_NEWEST
+        )
+        self._pace_lock = asyncio.Lock()
+        self._next_send = 0.0  # monotonic time the next send may start
+        self._notices: dict[tuple[int, str], MicroBatcher] = {}
+        self._notice_tasks: set[asyncio.Task] = set()
+
+        self.latency = LatencyHistogram()
+        self.delivered = 0
+        self.dm_closed = 0
+        self.failed = 0
+        self.retries = 0
+        self.paused = 0.0  # total seconds spent waiting out rate limits
+
+    @property
+    def depth(self) -> int:
+        return self._queue.depth
+
+    @property
+    def queue(self) -> WorkQueue:
+        return self._queue
+
+    @property
+    def notices_sent(self) -> int:
+        return sum(b.batches for b in self._notices.values())
+
+    @property
+    def users_noticed(self) -> int:
+        return sum(b.items for b in self._notices.values())
+
+    def start(self):
+        self._queue.start()
+
+    async def stop(self):
+        await self._queue.stop()
+        for batcher in self._notices.values():
+            await batcher.close()
+        if self._notice_tasks:
+            await asyncio.gather(*self._notice_tasks, return_exceptions=True)
+
+    def submit(self, job: DMJob) -> bool:
+        """Queue ``job`` without waiting. Returns False if the queue is full."""
+        return self._queue.submit(job)
+
+    # ------------------------------------------------------------------ #
+    #  Pacing                                                              #
+    # ------------------------------------------------------------------ #
+
+    async def _wait_turn(self):
+        async with self._pace_lock:
+            delay = self._next_send - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_send = time.monotonic() + self._min_interval
+
+    def _pause(self, seconds: float):
+        """Hold every worker for ``seconds`` (longer if already paused longer)."""
+        now = time.monotonic()
+        if now + seconds > self._next_send:
+            self.paused += now + seconds - max(self._next_send, now)
+            self._next_send = now + seconds
+
+    # ------------------------------------------------------------------ #
+    #  Delivery                                                            #
+    # ------------------------------------------------------------------ #
+
+    async def _deliver(self, job: DMJob):
+        while True:
+            job.attempt += 1
+            await self._wait_turn()
+            try:
+                user = await self._bot.resolver.user(job.user_id)
+                await user.send(job.content)
+            except (discord.HTTPException, discord.RateLimited) as e:
+                wait = _retry_after(e)
+                if wait is not None:
+                    self._pause(wait)
+                rate_limited = isinstance(e, discord.RateLimited) or e.status == 429
+                if rate_limited and job.attempt < self._attempts:
+                    self.retries += 1
+                    logger.info(
+                        "DM to %d rate limited; retrying in %.1fs (attempt %d/%d)",
+                        job.user_id, wait or 0.0, job.attempt, self._attempts,
+                    )
+                    continue
+                if isinstance(e, discord.Forbidden) and e.code == _DM_CLOSED:
+                    self.dm_closed += 1
+                else:
+                    self.failed += 1
+                    logger.warning("DM to %d failed: %s", job.user_id, e)
+                self._notify_channel(job)
+                return
+            except Exception:
+                self.failed += 1
+                logger.exception("DM to %d failed", job.user_id)
+                self._notify_channel(job)
+                return
+            self.delivered += 1
+            self.latency.observe(time.monotonic() - job.enqueued_at)
+            return
+
+    # ------------------------------------------------------------------ #
+    #  Batched channel notices for closed DMs                              #
+    # ------------------------------------------------------------------ #
+
+    def _notify_channel(self, job: DMJob):
+        if job.channel_id is None:
+            return
+        key = (job.channel_id, job.notice)
+        batcher = self._notices.get(key)
+        if batcher is None:
+            batcher = self._notices[key] = MicroBatcher(
+                lambda user_ids, key=key: self._send_notice(key, user_ids),
+                max_items=self._notice_max_mentions,
+                window=self._notice_window,
+            )
+        # Don't hold a worker for the batching window.
+        task = asyncio.get_running_loop().create_task(batcher.submit(job.user_id))
+        self._notice_tasks.add(task)
+        task.add_done_callback(self._notice_done)
+
+    def _notice_done(self, task: asyncio.Task):
+        self._notice_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to post closed-DM notice", exc_info=task.exception())
+
+    async def _send_notice(self, key: tuple[int, str], user_ids: list[int]) -> list:
+        channel_id, notice = key
+        mentions = " ".join(f"<@{uid}>" for uid in dict.fromkeys(user_ids))
+        channel = await self._bot.resolver.channel(channel_id)
+        await channel.send(
+            f"{mentions}, I could not DM you. {notice}".rstrip(),
+            allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False),
+        )
+        return [None] * len(user_ids)
@@ -0,0 +1,146 @@
+"""Attachment download, hashing and preprocessing for the wins classifier.
+
+Attachments are streamed from the CDN in chunks; the exact SHA-256 is
+computed as the bytes arrive and the download is aborted once it exceeds the
+size cap. The image is then decoded once, off the event loop, to compute the
+perceptual hash (a 64-bit dHash) and to produce the copy sent to the model:
+orientation applied, downsampled to a maximum edge, metadata stripped and
+re-encoded compactly. The model gets it inline as a data URL, so an expired
+signed CDN URL no longer matters. The same decoded image also yields the
+colour signature used by the local pre-filter (``win_prefilter``).
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import math
+
+import aiohttp
+from PIL import Image, ImageOps
+
+from win_prefilter import Signature, signature
+
+# (base tokens, tokens per 512px tile) by model, from OpenAI's vision pricing.
+_IMAGE_TOKEN_COSTS = {
+    "gpt-4o": (85, 170),
+    "gpt-4o-mini": (2833, 5667),
+}
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class FetchedImage:
+    __slots__ = ("url", "sha256", "phash", "prepared", "mime", "size", "signature")
+
+    def __init__(
+        self,
+        url: str,
+        sha256: str,
+        phash: int,
+        prepared: bytes,
+        mime: str,
+        size: tuple[int, int],
+        signature: Signature | None = None,
+    ):
+        self.url = url
+        self.sha256 = sha256
+        self.phash = phash
+        self.prepared = prepared
+        self.mime = mime
+        self.size = size
+        self.signature = signature
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{base64.b64encode(self.prepared).decode('ascii')}"
+
+
+def estimate_image_tokens(width: int, height: int, detail: str, model: str = "gpt-4o-mini") -> int:
+    """Input tokens the model charges for one image, per OpenAI's tiling rules."""
+    base, per_tile = _IMAGE_TOKEN_COSTS.get(model, _IMAGE_TOKEN_COSTS["gpt-4o"])
+    if detail == "low":
+        return base
+    scale = min(1.0, 2048 / max(width, height))
+    w, h = width * scale, height * scale
+    scale = min(1.0, 768 / min(w, h))
+    w, h = w * scale, h * scale
+    return base + per_tile * math.ceil(w / 512) * math.ceil(h / 512)
+
+
+async def download(session: aiohttp.ClientSession, url: str, max_bytes: int) -> tuple[bytes, str]:
+    """Stream ``url`` into memory, hashing as it goes. Returns ``(data, sha256_hex)``."""
+    digest = hashlib.sha256()
+    buf = bytearray()
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        if resp.content_length and resp.content_length > max_bytes:
+            raise ImageTooLarge(f"{resp.content_length} bytes > cap of {max_bytes}")
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            buf += chunk
+            if len(buf) > max_bytes:
+                raise ImageTooLarge(f"more than {max_bytes} bytes")
+            digest.update(chunk)
+    return bytes(buf), digest.hexdigest()
+
+
+def dhash(img: Image.Image) -> int:
+    """64-bit difference hash: robust to re-encoding, resizing and small crops."""
+    small = img.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    px = small.tobytes()
+    bits = 0
+    for row in range(8):
+        offset = row * 9
+        for col in range(8):
+            bits = (bits << 1) | (px[offset + col] > px[offset + col + 1])
+    return bits
+
+
+def prepare(
+    data: bytes,
+    max_edge: int,
+    fmt: str = "JPEG",
+    quality: int = 80,
+    accent_hues: tuple[int, int] | None = None,
+) -> tuple[int, bytes, str, tuple[int, int], Signature | None]:
+    """Decode once; return ``(phash, encoded_bytes, mime, original_size, signature)``.
+
+    The re-encoded copy carries no EXIF/ICC/text metadata because none is
+    passed to ``save``. ``signature`` is only computed when ``accent_hues``
+    is given.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        original_size = img.size
+        img.draft("RGB", (max_edge, max_edge))  # JPEG: decode at reduced scale
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            flat = Image.new("RGB", img.size, (255, 255, 255))
+            flat.paste(img, mask=img.getchannel("A"))
+            img = flat
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        phash = dhash(img)
+        sig = signature(img, original_size, accent_hues) if accent_hues else None
+        out = io.BytesIO()
+        img.save(out, format=fmt, quality=quality, optimize=True)
+    return phash, out.getvalue(), Image.MIME[fmt.upper()], original_size, sig
+
+
+async def fetch_image(
+    session: aiohttp.ClientSession,
+    url: str,
+    max_bytes: int,
+    max_edge: int,
+    fmt: str = "JPEG",
+    quality: int = 80,
+    accent_hues: tuple[int, int] | None = None,
+) -> FetchedImage:
+    data, sha = await download(session, url, max_bytes)
+    phash, prepared, mime, size, sig = await asyncio.to_thread(
+        prepare, data, max_edge, fmt, quality, accent_hues
+    )
+    return FetchedImage(url, sha, phash, prepared, mime, size, sig)
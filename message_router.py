@@ -0,0 +1,139 @@
+"""Single entry point for guild and DM messages.
+
+``SonOfAndOn.on_message`` hands every message to ``MessageRouter.dispatch``,
+which parses it once (bot check, channel type, bot mention, trigger words,
+image attachments) and then runs only the handlers registered for that
+channel ID or event type. Cogs register in ``cog_load`` and unregister in
+``cog_unload``. Each handler's call count and wall time are tracked.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Awaitable, Callable
+
+import discord
+
+logger = logging.getLogger("thcbot")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+IMAGE_CONTENT_TYPES = ("image/png", "image/jpeg", "image/webp")
+
+INTRO_RX = re.compile(r"\bintro\b", re.IGNORECASE)
+WIN_RX = re.compile(r"\bwin\b", re.IGNORECASE)
+
+# Event types a handler can subscribe to besides channel IDs.
+EVENT_DM = "dm"
+EVENT_MENTION = "mention"  # bot mentioned in a guild channel
+
+
+class ParsedMessage:
+    __slots__ = (
+        "message",
+        "content",
+        "is_dm",
+        "is_text_channel",
+        "mentions_bot",
+        "has_intro",
+        "has_win",
+        "_images",
+    )
+
+    def __init__(self, message: discord.Message, bot_user):
+        self.message = message
+        self.content = message.content or ""
+        self.is_dm = isinstance(message.channel, discord.DMChannel)
+        self.is_text_channel = isinstance(message.channel, discord.TextChannel)
+        self.mentions_bot = bot_user is not None and bot_user in message.mentions
+        self.has_intro = bool(INTRO_RX.search(self.content)) if self.mentions_bot else False
+        self.has_win = bool(WIN_RX.search(self.content)) if self.mentions_bot else False
+        self._images = None
+
+    @property
+    def images(self) -> list[discord.Attachment]:
+        """Image attachments, classified on first access."""
+        if self._images is None:
+            self._images = [
+                a for a in self.message.attachments
+                if (a.filename or "").lower().endswith(IMAGE_EXTENSIONS)
+                or (a.content_type or "").lower() in IMAGE_CONTENT_TYPES
+            ]
+        return self._images
+
+
+Handler = Callable[[ParsedMessage], Awaitable[None]]
+
+
+class HandlerStats:
+    __slots__ = ("calls", "errors", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class MessageRouter:
+    def __init__(self, bot):
+        self._bot = bot
+        self._handlers: dict[str, Handler] = {}
+        self._by_channel: dict[int, list[str]] = {}
+        self._by_event: dict[str, list[str]] = {}
+        self.stats: dict[str, HandlerStats] = {}
+
+    def add_handler(self, name: str, handler: Handler, *, channel_ids=(), events=()):
+        self.remove_handler(name)
+        self._handlers[name] = handler
+        self.stats.setdefault(name, HandlerStats())
+        for cid in channel_ids:
+            if cid:
+                self._by_channel.setdefault(cid, []).append(name)
+        for event in events:
+            self._by_event.setdefault(event, []).append(name)
+
+    def remove_handler(self, name: str):
+        if self._handlers.pop(name, None) is None:
+            return
+        for index in (self._by_channel, self._by_event):
+            for key in list(index):
+                names = [n for n in index[key] if n != name]
+                if names:
+                    index[key] = names
+                else:
+                    del index[key]
+
+    async def dispatch(self, message: discord.Message):
+        if message.author.bot:
+            return
+
+        parsed = ParsedMessage(message, self._bot.user)
+
+        names = list(self._by_channel.get(message.channel.id, ()))
+        if parsed.is_dm:
+            names += self._by_event.get(EVENT_DM, ())
+        elif parsed.mentions_bot:
+            names += self._by_event.get(EVENT_MENTION, ())
+        if not names:
+            return
+
+        if len(names) == 1:
+            await self._run(names[0], parsed)
+        else:
+            await asyncio.gather(*(self._run(n, parsed) for n in dict.fromkeys(names)))
+
+    async def _run(self, name: str, parsed: ParsedMessage):
+        stats = self.stats[name]
+        started = time.perf_counter()
+        try:
+            await self._handlers[name](parsed)
+        except Exception:
+            stats.errors += 1
+            logger.exception("Message handler %s failed for message %d", name, parsed.message.id)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.calls += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
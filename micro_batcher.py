@@ -0,0 +1,76 @@
+"""Collect concurrent requests into small batches.
+
+Callers ``await submit(item)`` and get back their own result. Items are held
+until ``max_items`` have arrived or ``window`` seconds have passed since the
+first one, then the whole batch goes to ``flush(items) -> results`` (one
+result per item, same order). If ``flush`` raises, every caller in the batch
+gets the exception.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("thcbot")
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        flush: Callable[[list], Awaitable[list]],
+        *,
+        max_items: int,
+        window: float,
+    ):
+        self._flush = flush
+        self._max_items = max_items
+        self._window = window
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        if len(self._pending) >= self._max_items:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush_now)
+        return await fut
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._flush([item for item, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def close(self):
+        self._flush_now()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,97 @@
+"""Precomputed badge thresholds with a per-user "next gate" cache.
+
+The threshold table is built once from config. For every user the engine
+caches their current badge rank and, per metric, the smallest value that
+could complete a higher badge. A badge can only become reachable when some
+metric crosses one of those gates, so the per-message check is three int
+comparisons; the full evaluation runs only when a gate is actually crossed
+or the cache was invalidated.
+"""
+
+import sys
+
+BADGE_ORDER = ("bronze", "silver", "gold", "diamond", "platinum")
+
+_NEVER = sys.maxsize
+
+
+class Threshold:
+    __slots__ = ("key", "rank", "chat_msgs", "wins", "gmv")
+
+    def __init__(self, key: str, chat_msgs: int = 0, wins: int = 0, gmv: int = 0):
+        self.key = key
+        self.rank = BADGE_ORDER.index(key)
+        self.chat_msgs = chat_msgs
+        self.wins = wins
+        self.gmv = gmv
+
+    def met_by(self, chat_msgs: int, wins: int, gmv: int) -> bool:
+        return chat_msgs >= self.chat_msgs and wins >= self.wins and gmv >= self.gmv
+
+
+class RankEngine:
+    def __init__(self, thresholds: list[Threshold], badge_role_ids: dict[str, int]):
+        self._thresholds = sorted(thresholds, key=lambda t: t.rank)
+        self._rank_by_role = {
+            role_id: BADGE_ORDER.index(key)
+            for key, role_id in badge_role_ids.items()
+            if key in BADGE_ORDER
+        }
+        self._ranks: dict[int, int] = {}
+        self._gates: dict[int, tuple[int, int, int]] = {}
+
+    def rank_from_roles(self, roles) -> int:
+        """Highest badge rank among ``roles`` (-1 when none)."""
+        best = -1
+        for r in roles:
+            rank = self._rank_by_role.get(r.id, -1)
+            if rank > best:
+                best = rank
+        return best
+
+    def current_rank(self, member) -> int:
+        rank = self._ranks.get(member.id)
+        if rank is None:
+            rank = self._ranks[member.id] = self.rank_from_roles(member.roles)
+        return rank
+
+    def set_rank(self, user_id: int, rank: int):
+        self._ranks[user_id] = rank
+        self._gates.pop(user_id, None)
+
+    def invalidate(self, user_id: int):
+        self._ranks.pop(user_id, None)
+        self._gates.pop(user_id, None)
+
+    def needs_check(self, user_id: int, stats) -> bool:
+        """Hot path: True only if a counter may have crossed a badge threshold."""
+        gate = self._gates.get(user_id)
+        if gate is None:
+            return True
+        return stats.chat_msgs >= gate[0] or stats.wins >= gate[1] or stats.gmv >= gate[2]
+
+    def evaluate(self, member, stats) -> str | None:
+        """Full evaluation. Returns the badge to upgrade to, if any, and re-arms the gates."""
+        chat_msgs, wins, gmv = stats.chat_msgs, stats.wins, stats.gmv
+        current = self.current_rank(member)
+
+        best = None
+        for t in self._thresholds:
+            if t.rank > current and t.met_by(chat_msgs, wins, gmv):
+                best = t
+        if best is not None:
+            current = self._ranks[member.id] = best.rank
+
+        chat_gate = wins_gate = gmv_gate = _NEVER
+        for t in self._thresholds:
+            if t.rank <= current:
+                continue
+            if t.chat_msgs > chat_msgs:
+                chat_gate = min(chat_gate, t.chat_msgs)
+            if t.wins > wins:
+                wins_gate = min(wins_gate, t.wins)
+            if t.gmv > gmv:
+                gmv_gate = min(gmv_gate, t.gmv)
+        self._gates[member.id] = (chat_gate, wins_gate, gmv_gate)
+
+        return best.key if best is not None else None
@@ -0,0 +1,143 @@
+"""Incrementally maintained ranking of users by one counter.
+
+Entries are kept as ``(-value, user_id)`` keys in a list of small sorted
+buckets (the layout popularised by ``sortedcontainers``). Locating a key is
+a binary search over bucket maxima plus one inside the bucket. Bucket sizes
+are summed by a Fenwick tree, so a rank (entries in earlier buckets plus the
+position in this one) and the bucket a page starts in are found in
+logarithmic time too; the tree is rebuilt only when buckets split or empty.
+Updates, rank lookups and page reads never touch the whole member base.
+Users with a value of 0 are not ranked.
+"""
+
+from bisect import bisect_left, insort
+
+_LOAD = 256  # target bucket size; buckets split at twice this
+
+
+class RankedIndex:
+    def __init__(self, values: dict[int, int] | None = None):
+        self._values: dict[int, int] = {}
+        self._buckets: list[list[tuple[int, int]]] = []
+        self._maxes: list[tuple[int, int]] = []
+        self._tree: list[int] = [0]  # 1-based Fenwick tree over bucket sizes
+        if values:
+            keys = sorted((-v, uid) for uid, v in values.items() if v > 0)
+            self._values = {uid: -neg for neg, uid in keys}
+            self._buckets = [keys[i:i + _LOAD] for i in range(0, len(keys), _LOAD)]
+            self._maxes = [b[-1] for b in self._buckets]
+        self._build_tree()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    # ------------------------------------------------------------------ #
+    #  Fenwick tree over bucket sizes                                      #
+    # ------------------------------------------------------------------ #
+
+    def _build_tree(self):
+        tree = [0] + [len(b) for b in self._buckets]
+        for i in range(1, len(tree)):
+            j = i + (i & -i)
+            if j < len(tree):
+                tree[j] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, b: int, delta: int):
+        i = b + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, b: int) -> int:
+        """Entries in buckets ``[0, b)``."""
+        total = 0
+        while b:
+            total += self._tree[b]
+            b -= b & -b
+        return total
+
+    def _find(self, pos: int) -> tuple[int, int]:
+        """``(bucket, offset)`` of 0-based position ``pos``."""
+        b = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = b + step
+            if nxt < len(self._tree) and self._tree[nxt] <= pos:
+                b = nxt
+                pos -= self._tree[nxt]
+            step >>= 1
+        return b, pos
+
+    def _locate(self, key: tuple[int, int]) -> tuple[int, int]:
+        b = bisect_left(self._maxes, key)
+        if b == len(self._maxes):
+            b -= 1
+        return b, bisect_left(self._buckets[b], key)
+
+    def _insert(self, key: tuple[int, int]):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._build_tree()
+            return
+        b = bisect_left(self._maxes, key)
+        if b == len(self._maxes):
+            b -= 1
+            self._buckets[b].append(key)
+            self._maxes[b] = key
+        else:
+            insort(self._buckets[b], key)
+        bucket = self._buckets[b]
+        if len(bucket) > 2 * _LOAD:
+            self._buckets[b:b + 1] = [bucket[:_LOAD], bucket[_LOAD:]]
+            self._maxes[b:b + 1] = [bucket[_LOAD - 1], bucket[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(b, 1)
+
+    def _remove(self, key: tuple[int, int]):
+        b, i = self._locate(key)
+        bucket = self._buckets[b]
+        del bucket[i]
+        if not bucket:
+            del self._buckets[b]
+            del self._maxes[b]
+            self._build_tree()
+            return
+        if i == len(bucket):
+            self._maxes[b] = bucket[-1]
+        self._tree_add(b, -1)
+
+    def update(self, user_id: int, value: int):
+        old = self._values.get(user_id)
+        if old == value:
+            return
+        if old is not None:
+            self._remove((-old, user_id))
+            del self._values[user_id]
+        if value > 0:
+            self._insert((-value, user_id))
+            self._values[user_id] = value
+
+    def rank(self, user_id: int) -> int | None:
+        """1-based rank of ``user_id``, or None if unranked."""
+        value = self._values.get(user_id)
+        if value is None:
+            return None
+        b, i = self._locate((-value, user_id))
+        return self._count_before(b) + i + 1
+
+    def page(self, start: int, count: int) -> list[tuple[int, int]]:
+        """Return ``count`` ``(user_id, value)`` pairs starting at 0-based position ``start``."""
+        out: list[tuple[int, int]] = []
+        if start >= len(self._values):
+            return out
+        b, start = self._find(start)
+        for bucket in self._buckets[b:]:
+            for neg, uid in bucket[start:start + count - len(out)]:
+                out.append((uid, -neg))
+            start = 0
+            if len(out) >= count:
+                break
+        return out
@@ -0,0 +1,181 @@
+"""Token-bucket rate limiting with per-key and shared budgets.
+
+A ``Budget`` is a bucket of ``capacity`` units (calls, estimated tokens, ...)
+that refills continuously over ``period`` seconds. ``RateLimiter.acquire``
+charges every per-key budget for the caller's key and every shared budget at
+once, or nothing if any of them is short. Callers ``refund`` the reservation
+when the work it paid for failed, so only successful calls use up budget.
+
+A bucket that has refilled to capacity is indistinguishable from one that
+never existed, so each bucket is scheduled on a ``TimingWheel`` for the
+moment it will be full and dropped then: memory is bounded by recently
+active keys. Bucket levels are snapshotted to disk with wall-clock
+timestamps, so a restart resumes budgets (refilled for the downtime)
+instead of resetting them.
+"""
+
+from pathlib import Path
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Hashable
+
+from timing_wheel import TimingWheel
+
+logger = logging.getLogger("thcbot")
+
+
+class Budget:
+    __slots__ = ("name", "unit", "capacity", "period", "rate")
+
+    def __init__(self, name: str, unit: str, capacity: float, period: float):
+        self.name = name
+        self.unit = unit
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+
+
+class _Bucket:
+    __slots__ = ("level", "updated")
+
+    def __init__(self, level: float, updated: float):
+        self.level = level
+        self.updated = updated
+
+
+class Reservation:
+    __slots__ = ("key", "charges")
+
+    def __init__(self, key: Hashable, charges: list[tuple[Budget, Hashable, float]]):
+        self.key = key
+        self.charges = charges
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        per_key: list[Budget],
+        shared: list[Budget] = (),
+        path: Path | None = None,
+    ):
+        self._per_key = list(per_key)
+        self._shared = list(shared)
+        self._budgets = {b.name: b for b in self._per_key + self._shared}
+        self._path = path
+        # (budget name, key) -> bucket; shared budgets use key None.
+        self._buckets: dict[tuple[str, Hashable], _Bucket] = {}
+        self._wheel = TimingWheel(resolution=1.0, slots=4096)
+        self.granted = 0
+        self.denied: dict[str, int] = {b.name: 0 for b in self._budgets.values()}
+        self.dirty = False
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _level(self, budget: Budget, key: Hashable, now: float) -> float:
+        bucket = self._buckets.get((budget.name, key))
+        if bucket is None:
+            return budget.capacity
+        level = min(budget.capacity, bucket.level + (now - bucket.updated) * budget.rate)
+        bucket.level, bucket.updated = level, now
+        return level
+
+    def _set(self, budget: Budget, key: Hashable, level: float, now: float):
+        ident = (budget.name, key)
+        if level >= budget.capacity:
+            self._buckets.pop(ident, None)
+            self._wheel.cancel(ident)
+            return
+        bucket = self._buckets.get(ident)
+        if bucket is None:
+            self._buckets[ident] = _Bucket(level, now)
+        else:
+            bucket.level, bucket.updated = level, now
+        self._wheel.schedule(ident, now + (budget.capacity - level) / budget.rate)
+        self.dirty = True
+
+    def _expire(self, now: float):
+        for ident in self._wheel.advance(now):
+            self._buckets.pop(ident, None)
+
+    def acquire(self, key: Hashable, costs: dict[str, float], now: float | None = None) -> Reservation | None:
+        """Charge ``costs`` (unit -> amount) to ``key``'s budgets and the shared
+        ones. Returns None, charging nothing, if any budget can't cover it.
+        With ``key=None`` only the shared budgets are charged.
+
+        A cost larger than a budget's capacity is capped at the capacity, so an
+        oversized request waits for a full bucket instead of never running.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+
+        charges = []
+        owners = [(b, key) for b in self._per_key] if key is not None else []
+        for budget, owner in owners + [(b, None) for b in self._shared]:
+            amount = min(costs.get(budget.unit, 0), budget.capacity)
+            if not amount:
+                continue
+            level = self._level(budget, owner, now)
+            if level < amount:
+                self.denied[budget.name] += 1
+                return None
+            charges.append((budget, owner, amount))
+
+        for budget, owner, amount in charges:
+            self._set(budget, owner, self._level(budget, owner, now) - amount, now)
+        self.granted += 1
+        return Reservation(key, charges)
+
+    def refund(self, reservation: Reservation, now: float | None = None):
+        """Give back what ``reservation`` charged (the work it paid for failed)."""
+        now = time.time() if now is None else now
+        for budget, owner, amount in reservation.charges:
+            self._set(budget, owner, self._level(budget, owner, now) + amount, now)
+        reservation.charges = []
+
+    # ------------------------------------------------------------------ #
+    #  Persistence                                                         #
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": [
+                [name, key, round(b.level, 3), b.updated]
+                for (name, key), b in self._buckets.items()
+            ]
+        }
+
+    def save(self):
+        if self._path is None:
+            return
+        data = self.snapshot()
+        self.dirty = False
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=str(self._path.parent), delete=False, suffix=".tmp", encoding="utf-8"
+        ) as f:
+            json.dump(data, f, separators=(",", ":"))
+            tmp = f.name
+        os.replace(tmp, str(self._path))
+
+    def _load(self):
+        if not self._path.exists():
+            return
+        try:
+            rows = json.loads(self._path.read_text(encoding="utf-8")).get("buckets", [])
+        except Exception:
+            logger.warning("Could not read rate limiter state from %s; starting fresh.", self._path)
+            return
+        now = time.time()
+        for name, key, level, updated in rows:
+            budget = self._budgets.get(name)
+            if budget is None:
+                continue
+            level = min(budget.capacity, level + max(0.0, now - updated) * budget.rate)
+            self._set(budget, key, level, now)
+        self.dirty = False
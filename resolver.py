@@ -0,0 +1,121 @@
+"""Shared lookup of guilds, members, users and channels by ID.
+
+Each lookup tries the gateway cache first (``get_*``), then an in-memory
+LRU cache of objects fetched over REST, and only then calls ``fetch_*``.
+Fetched objects are kept for ``ttl`` seconds, at most ``max_entries`` of
+them. Concurrent misses for the same ID share one in-flight request instead
+of each making their own. Failed fetches are not cached.
+
+Objects from the LRU cache are REST snapshots (a member's roles as of the
+fetch), so ``ttl`` should stay short. Per-kind counters of where each lookup
+was answered are kept for /resolver_stats. The bot exposes one instance as
+``bot.resolver``.
+"""
+
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+import discord
+
+KINDS = ("guild", "member", "user", "channel")
+
+
+class ResolverStats:
+    __slots__ = ("gateway", "cached", "shared", "fetched", "errors")
+
+    def __init__(self):
+        self.gateway = 0  # found in discord.py's own cache
+        self.cached = 0   # found in the resolver's LRU cache
+        self.shared = 0   # joined a fetch already in flight
+        self.fetched = 0  # REST requests made
+        self.errors = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.gateway + self.cached + self.shared + self.fetched
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered without a REST request of their own."""
+        return 1 - self.fetched / self.lookups if self.lookups else 0.0
+
+
+class Resolver:
+    def __init__(self, bot: discord.Client, max_entries: int, ttl: float):
+        self._bot = bot
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._cache: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()  # key -> (expires, obj)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.stats: dict[str, ResolverStats] = {kind: ResolverStats() for kind in KINDS}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def guild(self, guild_id: int) -> discord.Guild:
+        return await self._resolve(
+            "guild", guild_id, self._bot.get_guild(guild_id), lambda: self._bot.fetch_guild(guild_id)
+        )
+
+    async def member(self, guild: discord.Guild, user_id: int) -> discord.Member:
+        return await self._resolve(
+            "member", (guild.id, user_id), guild.get_member(user_id), lambda: guild.fetch_member(user_id)
+        )
+
+    async def user(self, user_id: int) -> discord.User:
+        return await self._resolve(
+            "user", user_id, self._bot.get_user(user_id), lambda: self._bot.fetch_user(user_id)
+        )
+
+    async def channel(self, channel_id: int):
+        return await self._resolve(
+            "channel", channel_id, self._bot.get_channel(channel_id),
+            lambda: self._bot.fetch_channel(channel_id),
+        )
+
+    def forget(self, kind: str, ident: Hashable):
+        """Drop a cached object, e.g. after it was changed or deleted."""
+        self._cache.pop((kind, ident), None)
+
+    async def _resolve(self, kind: str, ident: Hashable, found, fetch: Callable[[], Awaitable[Any]]):
+        stats = self.stats[kind]
+        if found is not None:
+            stats.gateway += 1
+            return found
+
+        key = (kind, ident)
+        entry = self._cache.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                stats.cached += 1
+                return entry[1]
+            del self._cache[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            stats.shared += 1
+            return await asyncio.shield(pending)
+
+        fut = self._inflight[key] = asyncio.get_running_loop().create_future()
+        stats.fetched += 1
+        try:
+            obj = await fetch()
+        except Exception as e:
+            stats.errors += 1
+            fut.set_exception(e)
+            fut.exception()  # the caller re-raises it; don't warn if nobody else waited
+            raise
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        else:
+            fut.set_result(obj)
+            self._cache[key] = (time.monotonic() + self._ttl, obj)
+            if len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        finally:
+            del self._inflight[key]
+        return obj
@@ -0,0 +1,153 @@
+"""Coalescing queue for member role changes.
+
+Callers describe a change (roles to add / remove) and await it. Changes for
+the same member that arrive before the member's turn are merged: a later
+add cancels an earlier remove of the same role and vice versa. When the
+member's turn comes, the final role list is computed once and applied with a
+single ``member.edit(roles=...)`` — or skipped entirely if nothing changed.
+The role list starts from the gateway's copy of the member (kept current by
+the members intent), so roles changed by anyone else since the change was
+queued are kept. Only if the edit fails is the member fetched over REST and
+the edit retried once.
+
+Each guild has its own worker that applies edits one at a time, spaced by
+``min_interval``. This is a deliberate fixed-interval approximation of
+Discord's per-route bucket for member edits: discord.py keeps the bucket
+state (``X-RateLimit-*`` headers) private and already waits on it, so the
+interval only keeps bursts from running into that wait.
+"""
+
+import asyncio
+import logging
+import time
+
+import discord
+
+from config import ROLE_EDIT_COALESCE_SECONDS, ROLE_EDIT_MIN_INTERVAL
+
+logger = logging.getLogger("thcbot")
+
+
+class _Pending:
+    __slots__ = ("member", "add", "remove", "reasons", "futures", "ready_at")
+
+    def __init__(self, member: discord.Member, ready_at: float):
+        self.member = member
+        self.add: set[int] = set()
+        self.remove: set[int] = set()
+        self.reasons: list[str] = []
+        self.futures: list[asyncio.Future] = []
+        self.ready_at = ready_at
+
+
+class RoleQueue:
+    def __init__(
+        self,
+        coalesce_delay: float = ROLE_EDIT_COALESCE_SECONDS,
+        min_interval: float = ROLE_EDIT_MIN_INTERVAL,
+    ):
+        self._coalesce_delay = coalesce_delay
+        self._min_interval = min_interval
+        self._pending: dict[tuple[int, int], _Pending] = {}
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+
+    async def change(
+        self,
+        member: discord.Member,
+        add=(),
+        remove=(),
+        reason: str = "",
+    ):
+        """Queue a role change for ``member`` and wait until it has been applied."""
+        key = (member.guild.id, member.id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(
+                member, time.monotonic() + self._coalesce_delay
+            )
+            self._queue_for(member.guild.id).put_nowait(key)
+        pending.member = member
+
+        for role in remove:
+            pending.add.discard(role.id)
+            pending.remove.add(role.id)
+        for role in add:
+            pending.remove.discard(role.id)
+            pending.add.add(role.id)
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+
+        fut = asyncio.get_running_loop().create_future()
+        pending.futures.append(fut)
+        await fut
+
+    def _queue_for(self, guild_id: int) -> asyncio.Queue:
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = asyncio.Queue()
+        worker = self._workers.get(guild_id)
+        if worker is None or worker.done():
+            self._workers[guild_id] = asyncio.get_running_loop().create_task(
+                self._worker(queue)
+            )
+        return queue
+
+    async def _worker(self, queue: asyncio.Queue):
+        while True:
+            key = await queue.get()
+            pending = self._pending[key]
+            delay = pending.ready_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Anything merged after this point goes into a fresh edit.
+            del self._pending[key]
+            try:
+                edited = await self._apply(pending)
+            except Exception as e:
+                for fut in pending.futures:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                for fut in pending.futures:
+                    if not fut.done():
+                        fut.set_result(None)
+                if edited:
+                    await asyncio.sleep(self._min_interval)
+
+    async def _apply(self, pending: _Pending) -> bool:
+        guild = pending.member.guild
+        member = guild.get_member(pending.member.id) or pending.member
+        try:
+            return await self._edit(member, pending)
+        except (discord.NotFound, discord.Forbidden):
+            raise
+        except discord.HTTPException:
+            logger.warning("Role edit for %s failed; retrying with a fresh member", member)
+        try:
+            member = await guild.fetch_member(pending.member.id)
+        except discord.NotFound:
+            logger.info("Skipping role edit for %s: no longer in the server", pending.member)
+            return False
+        return await self._edit(member, pending)
+
+    async def _edit(self, member: discord.Member, pending: _Pending) -> bool:
+        guild = member.guild
+        current = [r.id for r in member.roles if r.id != guild.id]  # skip @everyone
+        final = [rid for rid in current if rid not in pending.remove]
+        final += [rid for rid in pending.add if rid not in final]
+        if set(final) == set(current):
+            return False
+
+        await member.edit(
+            roles=[guild.get_role(rid) or discord.Object(id=rid) for rid in final],
+            reason="; ".join(pending.reasons) or None,
+        )
+        logger.debug(
+            "Applied coalesced role edit for %s (+%s -%s)",
+            member, sorted(pending.add), sorted(pending.remove),
+        )
+        return True
+
+
+ROLE_QUEUE = RoleQueue()
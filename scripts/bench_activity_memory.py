@@ -0,0 +1,69 @@
+"""Memory benchmark: legacy dict-of-dicts ACTIVITY vs ActivityTable.
+
+Run from the repo root:
+
+    python scripts/bench_activity_memory.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity_stats import ActivityTable  # noqa: E402
+
+_BASE_ID = 1_100_000_000_000_000_000  # realistic snowflake magnitude
+
+
+def _rows(n: int):
+    rng = random.Random(n)
+    for i in range(n):
+        yield _BASE_ID + i * 7919, rng.randint(0, 5000), rng.randint(0, 60), rng.randint(0, 300_000)
+
+
+def _build_legacy(n: int) -> dict:
+    return {
+        str(uid): {"chat_msgs": chat, "wins": wins, "gmv": gmv}
+        for uid, chat, wins, gmv in _rows(n)
+    }
+
+
+def _build_table(n: int) -> ActivityTable:
+    table = ActivityTable()
+    for uid, chat, wins, gmv in _rows(n):
+        stats = table.get_or_create(uid)
+        stats.chat_msgs, stats.wins, stats.gmv = chat, wins, gmv
+    return table
+
+
+def _measure(builder, n: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    obj = builder(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'users':>10} {'dict-of-dicts':>15} {'ActivityTable':>15} {'saving':>8}")
+    for n in args.sizes:
+        legacy = _measure(_build_legacy, n)
+        table = _measure(_build_table, n)
+        print(
+            f"{n:>10,} {legacy / 2**20:>12.1f} MB {table / 2**20:>12.1f} MB "
+            f"{100 * (1 - table / legacy):>7.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: bytes and image tokens per #wins screenshot before/after preprocessing.
+
+"Before" is the raw attachment sent by URL at the API's default detail
+(charged like "high"); "after" is the downsampled, re-encoded inline copy at
+the configured detail. Pass real screenshots as arguments, or run without
+arguments to use synthetic phone-sized screenshots.
+
+    python scripts/bench_image_preprocess.py [--model gpt-4o-mini] [images...]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from config import (  # noqa: E402
+    WINS_AI_IMAGE_DETAIL,
+    WINS_AI_IMAGE_FORMAT,
+    WINS_AI_IMAGE_MAX_EDGE,
+    WINS_AI_IMAGE_QUALITY,
+)
+from image_pipeline import estimate_image_tokens, prepare  # noqa: E402
+
+
+def _synthetic(width: int, height: int, fmt: str, seed: int) -> bytes:
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, width, height // 10), fill=(0, 48, 135))
+    for y in range(height // 8, height, 48):
+        shade = rng.randint(0, 90)
+        draw.text((40, y), "THC Circle LLC sent you $%d.00 USD" % rng.randint(1, 999), fill=(shade,) * 3)
+    for _ in range(width * height // 200):  # sensor/compression noise
+        img.putpixel((rng.randrange(width), rng.randrange(height)), (rng.randint(200, 255),) * 3)
+    out = io.BytesIO()
+    img.save(out, format=fmt)
+    return out.getvalue()
+
+
+def _samples(paths: list[str]):
+    if paths:
+        for p in paths:
+            with open(p, "rb") as f:
+                yield os.path.basename(p), f.read()
+        return
+    yield "iphone-png 1170x2532", _synthetic(1170, 2532, "PNG", 1)
+    yield "android-png 1080x2400", _synthetic(1080, 2400, "PNG", 2)
+    yield "photo-jpeg 3024x4032", _synthetic(3024, 4032, "JPEG", 3)
+    yield "desktop-png 1920x1080", _synthetic(1920, 1080, "PNG", 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    args = parser.parse_args()
+
+    print(
+        f"{'image':<24} {'bytes before':>13} {'bytes after':>12} "
+        f"{'tokens before':>14} {'tokens after':>13} {'prep ms':>8}"
+    )
+    totals = [0, 0, 0, 0]
+    for name, data in _samples(args.images):
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+        started = time.perf_counter()
+        _, prepared, *_ = prepare(data, WINS_AI_IMAGE_MAX_EDGE, WINS_AI_IMAGE_FORMAT, WINS_AI_IMAGE_QUALITY)
+        prep_ms = (time.perf_counter() - started) * 1000
+        with Image.open(io.BytesIO(prepared)) as img:
+            new_w, new_h = img.size
+        before = estimate_image_tokens(width, height, "high", args.model)
+        after = estimate_image_tokens(new_w, new_h, WINS_AI_IMAGE_DETAIL, args.model)
+        # Inline data URLs are base64: 4 bytes on the wire per 3 bytes of image.
+        inline = (len(prepared) + 2) // 3 * 4
+        print(f"{name:<24} {len(data):>13,} {inline:>12,} {before:>14,} {after:>13,} {prep_ms:>8.1f}")
+        for i, v in enumerate((len(data), inline, before, after)):
+            totals[i] += v
+    print(
+        f"{'total':<24} {totals[0]:>13,} {totals[1]:>12,} {totals[2]:>14,} {totals[3]:>13,}"
+        f"   ({100 * (1 - totals[3] / totals[2]):.0f}% fewer image tokens)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Micro-benchmark: messages/sec through the badges message handlers.
+
+Compares the legacy per-message badge evaluation (rebuild the role map, walk
+the member's roles and evaluate every threshold on every message) with the
+RankEngine gate check, both through the whole message dispatch and for the
+badge check alone. The end-to-end gain is bounded by everything else a
+message does (routing, counters, journal); the check-only numbers show what
+the gates themselves save. Each measurement keeps the best of ``--repeat``
+runs. Runs against a throwaway data directory.
+
+    python scripts/bench_on_message.py [--messages 200000] [--members 2000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="thcbot-bench-"))
+
+import discord  # noqa: E402
+
+import cogs.badges as badges  # noqa: E402
+from message_router import MessageRouter  # noqa: E402
+from config import (  # noqa: E402
+    BADGE_ROLE_IDS,
+    DIAMOND_CHAT_MIN,
+    DIAMOND_GMV_MIN,
+    DIAMOND_WINS_MIN,
+    GOLD_CHAT_MIN,
+    GOLD_WINS_MIN,
+    MAIN_CHAT_ID,
+    PLATINUM_CHAT_MIN,
+    PLATINUM_GMV_MIN,
+    PLATINUM_WINS_MIN,
+)
+
+
+# --- legacy evaluation, as it ran on every message before RankEngine -------
+
+def _legacy_current_badge_key(member):
+    badge_by_id = {v: k for k, v in BADGE_ROLE_IDS.items()}
+    for r in member.roles:
+        key = badge_by_id.get(r.id)
+        if key:
+            return key
+    return None
+
+
+def _legacy_rank_index(badge_key):
+    order = ["bronze", "silver", "gold", "diamond", "platinum"]
+    if badge_key is None:
+        return -1
+    try:
+        return order.index(badge_key)
+    except ValueError:
+        return -1
+
+
+async def _legacy_check(member):
+    stats = badges._get_stats(member)
+    chat_msgs, wins, gmv = stats["chat_msgs"], stats["wins"], stats["gmv"]
+    current_idx = _legacy_rank_index(_legacy_current_badge_key(member))
+    best, best_idx = None, current_idx
+    if chat_msgs >= GOLD_CHAT_MIN and wins >= GOLD_WINS_MIN:
+        if _legacy_rank_index("gold") > best_idx:
+            best, best_idx = "gold", _legacy_rank_index("gold")
+    if gmv >= DIAMOND_GMV_MIN and chat_msgs >= DIAMOND_CHAT_MIN and wins >= DIAMOND_WINS_MIN:
+        if _legacy_rank_index("diamond") > best_idx:
+            best, best_idx = "diamond", _legacy_rank_index("diamond")
+    if gmv >= PLATINUM_GMV_MIN and chat_msgs >= PLATINUM_CHAT_MIN and wins >= PLATINUM_WINS_MIN:
+        if _legacy_rank_index("platinum") > best_idx:
+            best, best_idx = "platinum", _legacy_rank_index("platinum")
+    return best
+
+
+# --- fakes ------------------------------------------------------------------
+
+def _make_messages(n_members: int):
+    channel = discord.TextChannel.__new__(discord.TextChannel)
+    channel.id = MAIN_CHAT_ID
+    roles = [SimpleNamespace(id=1_000 + i) for i in range(15)]
+    roles.append(SimpleNamespace(id=BADGE_ROLE_IDS["silver"]))
+    messages = []
+    for i in range(n_members):
+        member = SimpleNamespace(id=10_000 + i, bot=False, roles=roles, mention=f"<@{i}>")
+        messages.append(
+            SimpleNamespace(
+                id=i, author=member, content="gm everyone", channel=channel, mentions=[]
+            )
+        )
+    return messages
+
+
+async def _run(router, messages, total: int) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    for i in range(total):
+        await router.dispatch(messages[i % len(messages)])
+    return total / (time.perf_counter() - started)
+
+
+async def _run_checks(check, members, total: int) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    for i in range(total):
+        await check(members[i % len(members)])
+    return total / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--members", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the best is kept")
+    args = parser.parse_args()
+
+    badges.maybe_flush_activity = lambda: None  # keep disk I/O out of the measurement
+    bot = SimpleNamespace(user=SimpleNamespace(id=1))
+    bot.router = MessageRouter(bot)
+    cog = badges.BadgesCog(bot)
+    await cog.cog_load()
+    messages = _make_messages(args.members)
+    members = [m.author for m in messages]
+
+    engine_check = badges._check_for_rank_upgrade
+    engine_needs_check = badges.ENGINE.needs_check
+
+    async def gated_check(member):
+        stats = badges._get_stats(member)
+        if engine_needs_check(member.id, stats):
+            await engine_check(member)
+
+    legacy = engine = legacy_only = engine_only = 0.0
+    for _ in range(args.repeat):
+        badges._check_for_rank_upgrade = _legacy_check
+        badges.ENGINE.needs_check = lambda user_id, stats: True
+        legacy = max(legacy, await _run(bot.router, messages, args.messages))
+        legacy_only = max(legacy_only, await _run_checks(_legacy_check, members, args.messages))
+
+        badges._check_for_rank_upgrade = engine_check
+        badges.ENGINE.needs_check = engine_needs_check
+        engine = max(engine, await _run(bot.router, messages, args.messages))
+        engine_only = max(engine_only, await _run_checks(gated_check, members, args.messages))
+
+    print(f"messages: {args.messages:,}  members: {args.members:,}  best of {args.repeat}")
+    print(f"whole dispatch  legacy evaluation : {legacy:>12,.0f} msgs/sec")
+    print(f"whole dispatch  RankEngine gates  : {engine:>12,.0f} msgs/sec  ({engine / legacy:.2f}x)")
+    print(f"badge check     legacy evaluation : {legacy_only:>12,.0f} checks/sec")
+    print(
+        f"badge check     RankEngine gates  : {engine_only:>12,.0f} checks/sec  "
+        f"({engine_only / legacy_only:.2f}x)"
+    )
+    cog.journal_sync.cancel()
+    cog.save_history.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
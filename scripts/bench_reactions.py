@@ -0,0 +1,153 @@
+"""Micro-benchmark: reaction events/sec through ReactionsCog.on_raw_reaction_add.
+
+Replays synthetic reaction events (mostly on unbound messages, as in a real
+guild) through a copy of the original handler (the JSON store's
+``find_binding``, string-compared IDs and repeated ``str(payload.emoji)``)
+and through the compiled binding table. Both use the same in-memory
+``CooldownStore``, so the difference is the filter alone; each handler runs
+``--repeat`` times and its best rate is reported. Runs against a throwaway
+data directory.
+
+    python scripts/bench_reactions.py [--events 500000] [--bindings 500] [--hit-rate 0.02] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="thcbot-bench-"))
+
+import discord  # noqa: E402
+
+import cogs.reactions as reactions  # noqa: E402
+from config import COOLDOWN_SECONDS  # noqa: E402
+from cooldowns import CooldownStore  # noqa: E402
+from store import load_bindings, upsert_binding  # noqa: E402
+
+GUILD_ID = 900_000_000_000_000_001
+CHANNEL_ID = 900_000_000_000_000_002
+BOT_ID = 1
+SCOPE = reactions.COOLDOWN_SCOPE
+
+
+# --- original filter, as it ran on every reaction before the compiled table ---
+
+_BINDINGS_CACHE: list[dict] | None = None
+_BINDINGS_BY_MESSAGE: dict[str, dict] = {}
+
+
+def _get_bindings_cache():
+    global _BINDINGS_CACHE, _BINDINGS_BY_MESSAGE
+    if _BINDINGS_CACHE is None:
+        _BINDINGS_CACHE = load_bindings()
+        _BINDINGS_BY_MESSAGE = {b["message_id"]: b for b in _BINDINGS_CACHE}
+    return _BINDINGS_CACHE
+
+
+def _legacy_find_binding(message_id: int | str):
+    ms = str(message_id)
+    _get_bindings_cache()
+    return _BINDINGS_BY_MESSAGE.get(ms)
+
+
+async def _legacy_handler(payload, cooldowns: CooldownStore):
+    if payload.user_id == BOT_ID:
+        return
+    binding = _legacy_find_binding(payload.message_id)
+    if not binding:
+        return
+    if binding.get("guild_id") and str(payload.guild_id) != str(binding.get("guild_id")):
+        return
+    if binding.get("channel_id") and str(payload.channel_id) != str(binding.get("channel_id")):
+        return
+    target_emoji = binding.get("emoji", "ANY")
+    if target_emoji != "ANY":
+        if str(payload.emoji) != target_emoji and getattr(payload.emoji, "name", None) != target_emoji:
+            return
+    else:
+        if str(payload.emoji) != "✅" and getattr(payload.emoji, "name", None) != "✅":
+            return
+    key = (payload.message_id, payload.user_id)
+    if cooldowns.active(SCOPE, key):
+        return
+    cooldowns.start(SCOPE, key, COOLDOWN_SECONDS)
+
+
+# --- fakes ------------------------------------------------------------------
+
+def _make_events(n: int, bound: list[int], hit_rate: float):
+    emojis = [
+        discord.PartialEmoji(name="✅"),
+        discord.PartialEmoji(name="🔥"),
+        discord.PartialEmoji(name="deal", id=123_456_789),
+    ]
+    rng = random.Random(42)
+    events = []
+    for i in range(n):
+        if rng.random() < hit_rate:
+            message_id = rng.choice(bound)
+        else:
+            message_id = 800_000_000_000_000_000 + rng.randrange(10**9)
+        events.append(
+            SimpleNamespace(
+                message_id=message_id,
+                user_id=10_000 + rng.randrange(5_000),
+                guild_id=GUILD_ID,
+                channel_id=CHANNEL_ID,
+                emoji=rng.choice(emojis),
+            )
+        )
+    return events
+
+
+async def _run(handler, events) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    for payload in events:
+        await handler(payload)
+    return len(events) / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=500_000)
+    parser.add_argument("--bindings", type=int, default=500)
+    parser.add_argument("--hit-rate", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per handler; the best is kept")
+    args = parser.parse_args()
+
+    # Bindings without a form or role, so a hit costs only the filter and the
+    # cooldown bookkeeping: the benchmark measures dispatch, not Discord I/O.
+    bound = [700_000_000_000_000_000 + i for i in range(args.bindings)]
+    for i, message_id in enumerate(bound):
+        emoji = "ANY" if i % 2 else "<:deal:123456789>"
+        upsert_binding(message_id, f"brand{i}", "", GUILD_ID, CHANNEL_ID, emoji)
+    events = _make_events(args.events, bound, args.hit_rate)
+
+    cog = reactions.ReactionsCog(SimpleNamespace(user=SimpleNamespace(id=BOT_ID)))
+    legacy = compiled = 0.0
+    for _ in range(args.repeat):
+        # Fresh in-memory cooldowns per run, so every run sees the same hits.
+        legacy_cooldowns = CooldownStore()
+        legacy = max(legacy, await _run(lambda p: _legacy_handler(p, legacy_cooldowns), events))
+        reactions.COOLDOWNS = CooldownStore()
+        compiled = max(compiled, await _run(cog.on_raw_reaction_add, events))
+
+    print(f"events: {args.events:,}  bindings: {args.bindings:,}  hit rate: {args.hit_rate:.0%}")
+    print(f"original filter : {legacy:>12,.0f} events/sec  ({len(legacy_cooldowns):,} accepted)")
+    print(
+        f"compiled table  : {compiled:>12,.0f} events/sec  ({len(reactions.COOLDOWNS):,} accepted, "
+        f"{compiled / legacy:.2f}x)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Evaluate the #wins pre-filter on labelled screenshots.
+
+Point it at a folder of known payout screenshots and a folder of everything
+else (memes, dashboards, photos) to see what the current thresholds in
+config.py would reject, with precision/recall and the per-image cost.
+Without folders it runs on a handful of synthetic images.
+
+    python scripts/eval_prefilter.py [--wins DIR] [--other DIR]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from config import (  # noqa: E402
+    WINS_AI_IMAGE_FORMAT,
+    WINS_AI_IMAGE_MAX_EDGE,
+    WINS_AI_IMAGE_QUALITY,
+    WINS_AI_PREFILTER_ACCENT_HUES,
+    WINS_AI_PREFILTER_MAX_ASPECT,
+    WINS_AI_PREFILTER_MAX_OFF_PALETTE,
+    WINS_AI_PREFILTER_MIN_NEUTRAL,
+)
+from image_pipeline import prepare  # noqa: E402
+from win_prefilter import PreFilter  # noqa: E402
+
+
+def _encode(img: Image.Image, fmt: str = "PNG") -> bytes:
+    out = io.BytesIO()
+    img.save(out, format=fmt)
+    return out.getvalue()
+
+
+def _payout(dark: bool, seed: int) -> bytes:
+    rng = random.Random(seed)
+    bg, fg = ((0, 0, 0), (235, 235, 235)) if dark else ((255, 255, 255), (20, 20, 20))
+    img = Image.new("RGB", (1170, 2532), bg)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 1170, 260), fill=(0, 48, 135))
+    draw.ellipse((485, 400, 685, 600), fill=(0, 112, 224))
+    for y in range(700, 2400, 60):
+        draw.text((80, y), "THC Circle LLC sent you $%d.00 USD" % rng.randint(1, 999), fill=fg)
+    draw.rounded_rectangle((80, 2300, 1090, 2420), 40, fill=(0, 112, 224))
+    return _encode(img)
+
+
+def _photo(seed: int) -> bytes:
+    rng = random.Random(seed)
+    img = Image.new("RGB", (1080, 1080))
+    draw = ImageDraw.Draw(img)
+    for _ in range(400):
+        x, y = rng.randrange(1080), rng.randrange(1080)
+        r = rng.randint(20, 160)
+        color = tuple(rng.randint(30, 255) for _ in range(3))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
+    return _encode(img, "JPEG")
+
+
+def _dashboard(seed: int) -> bytes:
+    rng = random.Random(seed)
+    img = Image.new("RGB", (1080, 2340), (18, 18, 18))
+    draw = ImageDraw.Draw(img)
+    for x in range(60, 1020, 40):
+        h = rng.randint(100, 900)
+        draw.rectangle((x, 1900 - h, x + 30, 1900), fill=rng.choice([(254, 44, 85), (37, 244, 238)]))
+    draw.text((60, 200), "GMV $12,345", fill=(255, 255, 255))
+    return _encode(img)
+
+
+def _synthetic():
+    return (
+        [("payout-light", _payout(False, 1)), ("payout-dark", _payout(True, 2))],
+        [("photo", _photo(3)), ("meme", _photo(4)), ("tiktok-dashboard", _dashboard(5))],
+    )
+
+
+def _folder(path: str | None):
+    if not path:
+        return []
+    return [(p.name, p.read_bytes()) for p in sorted(Path(path).iterdir()) if p.is_file()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wins", help="folder of payout screenshots the model should accept")
+    parser.add_argument("--other", help="folder of images the model should reject")
+    args = parser.parse_args()
+
+    wins, other = _folder(args.wins), _folder(args.other)
+    if not wins and not other:
+        wins, other = _synthetic()
+
+    prefilter = PreFilter(
+        max_aspect=WINS_AI_PREFILTER_MAX_ASPECT,
+        min_neutral=WINS_AI_PREFILTER_MIN_NEUTRAL,
+        max_off_palette=WINS_AI_PREFILTER_MAX_OFF_PALETTE,
+        audit_rate=1.0,  # every reject is "audited": the labels are known
+        report_every=0,
+    )
+    elapsed = 0.0
+    for label, samples in ((True, wins), (False, other)):
+        for name, data in samples:
+            started = time.perf_counter()
+            *_, sig = prepare(
+                data,
+                WINS_AI_IMAGE_MAX_EDGE,
+                WINS_AI_IMAGE_FORMAT,
+                WINS_AI_IMAGE_QUALITY,
+                WINS_AI_PREFILTER_ACCENT_HUES,
+            )
+            reason = prefilter.reject_reason(sig)
+            elapsed += time.perf_counter() - started
+            prefilter.count(reason is None)
+            prefilter.record(reason is None, label)
+            print(f"{'win' if label else 'other':<6} {name:<28} {sig!r:<60} {reason or 'pass'}")
+
+    n = len(wins) + len(other)
+    print(
+        f"\npassed={prefilter.passed} rejected={prefilter.rejected} "
+        f"precision={prefilter.precision:.2f} recall={prefilter.recall:.2f} "
+        f"model calls saved={prefilter.true_neg}/{len(other)} "
+        f"prepare+filter={elapsed / max(1, n) * 1000:.1f} ms/image"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Local stand-in for OpenAI's chat-completions endpoint.
+
+Run it, then start the bot (or any script using WinsAICog) with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub python bot.py
+
+Every request gets a canned verdict (one per image for micro-batched
+requests). Flags make it misbehave so retries and
+the circuit breaker can be exercised:
+
+    python scripts/stub_openai_server.py --latency 0.5 --fail-rate 0.3
+    python scripts/stub_openai_server.py --down-for 60 --status 503
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from aiohttp import web
+
+
+def make_app(args) -> web.Application:
+    started = time.monotonic()
+    counts = {"requests": 0, "failed": 0}
+
+    async def completions(request: web.Request) -> web.Response:
+        counts["requests"] += 1
+        body = await request.json()
+        if args.latency:
+            await asyncio.sleep(args.latency)
+
+        down = time.monotonic() - started < args.down_for
+        if down or random.random() < args.fail_rate:
+            counts["failed"] += 1
+            headers = {"retry-after": str(args.retry_after)} if args.status == 429 else {}
+            return web.json_response(
+                {"error": {"message": "stub failure", "type": "server_error"}},
+                status=args.status,
+                headers=headers,
+            )
+
+        images = sum(
+            1
+            for m in body.get("messages", [])
+            if isinstance(m.get("content"), list)
+            for part in m["content"]
+            if part.get("type") == "image_url"
+        )
+        system = next((m["content"] for m in body.get("messages", []) if m.get("role") == "system"), "")
+        if '"verdicts"' in system:  # micro-batched request: one verdict per image
+            verdict = {"verdicts": [
+                {"image": n, "is_big_win": args.verdict, "confidence": args.confidence, "reasoning": "stub"}
+                for n in range(1, images + 1)
+            ]}
+        else:
+            verdict = {
+                "is_big_win": args.verdict,
+                "confidence": args.confidence,
+                "reasoning": f"stub verdict for {images} image(s)",
+            }
+        return web.json_response({
+            "id": f"chatcmpl-stub-{counts['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(verdict)},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": 250 + 2833 * images,
+                "completion_tokens": 24,
+                "total_tokens": 274 + 2833 * images,
+            },
+        })
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(counts)
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--down-for", type=float, default=0.0, help="fail everything for this many seconds after start")
+    parser.add_argument("--status", type=int, default=500, help="HTTP status of failures (500, 503, 429...)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--verdict", action="store_true", help="answer is_big_win=true")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence sent with each verdict")
+    args = parser.parse_args()
+    web.run_app(make_app(args), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,241 @@
+"""Message → form/role bindings.
+
+Bindings live in SQLite (``data/bindings.db``, WAL mode) with one row per
+bound message, so an upsert or removal writes only that row. In memory they
+are indexed by message ID, guild ID and channel ID; the indexes are updated
+incrementally on every change instead of being rebuilt.
+
+Records keep the shape of the original JSON store: a dict with string IDs
+(``message_id``, ``guild_id``, ``channel_id``, ``role_id``) plus ``brand``,
+``form``, ``emoji`` and ``kind``. Callers must not mutate them.
+
+The reaction hot path uses ``binding_table()`` instead: a table of compiled
+bindings with int IDs and pre-normalised emoji, whose ``message_ids`` answers
+"is this message bound?" in one lookup. Like the indexes, it is updated one
+entry at a time as bindings change.
+"""
+
 from pathlib import Path
 import json
-import tempfile
-import os
+import logging
+import re
+import sqlite3
+
+logger = logging.getLogger("thcbot")
+
+PATH = Path("data/bindings.json")  # legacy store, imported once
+DB_PATH = Path("data/bindings.db")
+
+_conn: sqlite3.Connection | None = None
+_BY_MESSAGE: dict[str, dict] = {}
+_BY_GUILD: dict[str | None, dict[str, dict]] = {}
+_BY_CHANNEL: dict[str | None, dict[str, dict]] = {}
+
+DEFAULT_REACTION = "✅"  # what an "ANY" binding actually accepts
+_VARIATION_SELECTOR = "\ufe0f"
+
+
+def normalize_emoji(text: str) -> str:
+    return text.replace(_VARIATION_SELECTOR, "")
+
+
+_CUSTOM_EMOJI = re.compile(r"<a?:\w+:(\d+)>")
+
+
+class CompiledBinding:
+    __slots__ = (
+        "guild_id", "channel_id", "role_id", "brand", "form", "accepts", "accepts_id", "record"
+    )
+
+    def __init__(self, b: dict):
+        self.guild_id = int(b["guild_id"]) if b.get("guild_id") else None
+        self.channel_id = int(b["channel_id"]) if b.get("channel_id") else None
+        self.role_id = int(b["role_id"]) if b.get("role_id") else None
+        self.brand = b.get("brand", "")
+        self.form = (b.get("form") or "").strip()
+        emoji = b.get("emoji") or "ANY"
+        self.accepts = normalize_emoji(DEFAULT_REACTION if emoji == "ANY" else emoji)
+        custom = _CUSTOM_EMOJI.fullmatch(self.accepts)
+        self.accepts_id = int(custom.group(1)) if custom else None
+        self.record = b
+
+    def accepts_emoji(self, emoji) -> bool:
+        """Same rule as before: the reaction's name or full form matches. The
+        full form (``<:name:id>``) only differs from the name for custom emoji,
+        and is only built when the emoji ID already matches."""
+        if emoji.id is not None and emoji.id == self.accepts_id:
+            return str(emoji) == self.accepts
+        return normalize_emoji(emoji.name or "") == self.accepts
+
+
+class BindingTable:
+    __slots__ = ("message_ids", "_by_message")
+
+    def __init__(self, records=()):
+        self._by_message = {int(b["message_id"]): CompiledBinding(b) for b in records}
+        self.message_ids = self._by_message.keys()
+
+    def __len__(self) -> int:
+        return len(self._by_message)
+
+    def get(self, message_id: int) -> CompiledBinding | None:
+        return self._by_message.get(message_id)
+
+    def put(self, b: dict):
+        self._by_message[int(b["message_id"])] = CompiledBinding(b)
 
-PATH = Path("data/bindings.json")
-_BINDINGS_CACHE: list[dict] | None = None
-_BINDINGS_BY_MESSAGE: dict[str, dict] = {}
+    def discard(self, message_id: int):
+        self._by_message.pop(message_id, None)
 
 
-def _safe_write(path: Path, data):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(
-        "w", dir=str(path.parent), delete=False, suffix=".tmp", encoding="utf-8"
-    ) as f:
-        json.dump(data, f, indent=2)
-        tmp = f.name
-    os.replace(tmp, str(path))
+_TABLE = BindingTable()
 
 
-def _read():
+def _get_conn() -> sqlite3.Connection:
+    """Open the bindings database once, run the JSON migration and load the indexes."""
+    global _conn
+    if _conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(DB_PATH), isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bindings ("
+            " message_id INTEGER PRIMARY KEY,"
+            " brand TEXT NOT NULL,"
+            " form TEXT NOT NULL,"
+            " guild_id INTEGER,"
+            " channel_id INTEGER,"
+            " emoji TEXT NOT NULL DEFAULT 'ANY',"
+            " kind TEXT NOT NULL DEFAULT 'form',"
+            " role_id INTEGER"
+            ")"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS bindings_guild ON bindings (guild_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS bindings_channel ON bindings (channel_id)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        _conn = conn
+        _migrate_json(conn)
+        for row in conn.execute(
+            "SELECT message_id, brand, form, guild_id, channel_id, emoji, kind, role_id FROM bindings"
+        ):
+            _index(_record(*row))
+    return _conn
+
+
+def _migrate_json(conn: sqlite3.Connection):
+    """One-shot import of the legacy data/bindings.json.
+
+    The JSON file is left in place (it is no longer written); a flag in the
+    ``meta`` table stops the import from running twice.
+    """
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return
+    legacy = []
     if PATH.exists():
         try:
-            return json.loads(PATH.read_text(encoding="utf-8"))
+            legacy = json.loads(PATH.read_text(encoding="utf-8")).get("bindings", [])
         except Exception:
-            pass
-    return {"bindings": []}
+            logger.exception("Could not read %s; skipping bindings migration", PATH)
+            return
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO bindings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [_row(b) for b in legacy],
+        )
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if legacy:
+        logger.info("Migrated %d bindings from %s to %s", len(legacy), PATH, DB_PATH)
+
+
+def _id(value) -> str | None:
+    return str(value) if value else None
+
+
+def _record(message_id, brand, form, guild_id, channel_id, emoji, kind, role_id) -> dict:
+    return {
+        "message_id": str(message_id),
+        "brand": brand,
+        "form": form,
+        "guild_id": _id(guild_id),
+        "channel_id": _id(channel_id),
+        "emoji": emoji or "ANY",
+        "kind": kind or "form",
+        "role_id": _id(role_id),
+    }
 
 
-def _write(data):
-    _safe_write(PATH, data)
+def _row(b: dict) -> tuple:
+    def as_int(value):
+        return int(value) if value else None
 
+    return (
+        int(b["message_id"]),
+        b.get("brand", ""),
+        b.get("form", ""),
+        as_int(b.get("guild_id")),
+        as_int(b.get("channel_id")),
+        b.get("emoji") or "ANY",
+        b.get("kind") or "form",
+        as_int(b.get("role_id")),
+    )
 
-def _set_bindings_cache(bindings):
-    global _BINDINGS_CACHE, _BINDINGS_BY_MESSAGE
-    _BINDINGS_CACHE = list(bindings)
-    _BINDINGS_BY_MESSAGE = {b["message_id"]: b for b in _BINDINGS_CACHE}
 
+def _index(b: dict):
+    ms = b["message_id"]
+    _BY_MESSAGE[ms] = b
+    _BY_GUILD.setdefault(b["guild_id"], {})[ms] = b
+    _BY_CHANNEL.setdefault(b["channel_id"], {})[ms] = b
+    _TABLE.put(b)
 
-def _get_bindings_cache():
-    global _BINDINGS_CACHE
-    if _BINDINGS_CACHE is None:
-        _set_bindings_cache(_read().get("bindings", []))
-    return _BINDINGS_CACHE
+
+def _unindex(ms: str) -> dict | None:
+    b = _BY_MESSAGE.pop(ms, None)
+    if b is None:
+        return None
+    _TABLE.discard(int(ms))
+    for index, key in ((_BY_GUILD, b["guild_id"]), (_BY_CHANNEL, b["channel_id"])):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(ms, None)
+            if not bucket:
+                del index[key]
+    return b
 
 
 def load_bindings():
-    return list(_get_bindings_cache())
+    _get_conn()
+    return list(_BY_MESSAGE.values())
 
 
 def save_bindings(bindings):
-    _set_bindings_cache(bindings)
-    _write({"bindings": bindings})
+    """Replace every binding with ``bindings``."""
+    global _TABLE
+    conn = _get_conn()
+    records = [_record(*_row(b)) for b in bindings]
+    conn.execute("BEGIN")
+    try:
+        conn.execute("DELETE FROM bindings")
+        conn.executemany(
+            "INSERT OR REPLACE INTO bindings VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [_row(b) for b in records],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    _BY_MESSAGE.clear()
+    _BY_GUILD.clear()
+    _BY_CHANNEL.clear()
+    _TABLE = BindingTable()
+    for b in records:
+        _index(b)
+
 
 def upsert_binding(
     message_id: int,
@@ -62,48 +247,48 @@ def upsert_binding(
     kind: str = "form",
     role_id: int | None = None,
 ):
-    bindings = load_bindings()
-    for i, b in enumerate(bindings):
-        if b["message_id"] == str(message_id):
-            bindings[i] = {
-                "message_id": str(message_id),
-                "brand": brand,
-                "form": form,
-                "guild_id": str(guild_id) if guild_id else None,
-                "channel_id": str(channel_id) if channel_id else None,
-                "emoji": emoji,
-                "kind": kind,
-                "role_id": str(role_id) if role_id else None,
-            }
-            save_bindings(bindings)
-            return
+    conn = _get_conn()
+    b = _record(message_id, brand, form, guild_id, channel_id, emoji, kind, role_id)
+    conn.execute("INSERT OR REPLACE INTO bindings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _row(b))
+    _unindex(b["message_id"])
+    _index(b)
+
+
+def remove_binding(message_id: int | str) -> bool:
+    """Remove the binding on ``message_id``. Returns False if there was none."""
+    return remove_bindings([message_id]) > 0
 
-    bindings.append({
-        "message_id": str(message_id),
-        "brand": brand,
-        "form": form,
-        "guild_id": str(guild_id) if guild_id else None,
-        "channel_id": str(channel_id) if channel_id else None,
-        "emoji": emoji,
-        "kind": kind,
-        "role_id": str(role_id) if role_id else None,
-    })
-    save_bindings(bindings)
 
+def remove_bindings(message_ids) -> int:
+    """Remove the bindings on any of ``message_ids``; returns how many existed."""
+    conn = _get_conn()
+    removed = [int(ms) for ms in map(str, message_ids) if _unindex(ms) is not None]
+    if removed:
+        conn.executemany("DELETE FROM bindings WHERE message_id = ?", [(m,) for m in removed])
+    return len(removed)
 
 
-def remove_binding(message_id: int | str):
-    ms = str(message_id)
-    bindings = [b for b in load_bindings() if b["message_id"] != ms]
-    save_bindings(bindings)
+def binding_table() -> BindingTable:
+    """The compiled table. Changes are applied to it in place, except that
+    ``save_bindings`` replaces it."""
+    _get_conn()
+    return _TABLE
 
 
 def find_binding(message_id: int | str):
-    ms = str(message_id)
-    _get_bindings_cache()
-    return _BINDINGS_BY_MESSAGE.get(ms)
+    _get_conn()
+    return _BY_MESSAGE.get(str(message_id))
 
 
 def list_bindings_for_guild(guild_id: int | str):
-    gid = str(guild_id)
-    return [b for b in load_bindings() if (b.get("guild_id") == gid or b.get("guild_id") is None)]
+    """Bindings in ``guild_id`` plus those not tied to any guild."""
+    _get_conn()
+    found = {**_BY_GUILD.get(None, {}), **_BY_GUILD.get(str(guild_id), {})}
+    return sorted(found.values(), key=lambda b: int(b["message_id"]))
+
+
+def list_bindings_for_channel(channel_id: int | str):
+    _get_conn()
+    return sorted(
+        _BY_CHANNEL.get(str(channel_id), {}).values(), key=lambda b: int(b["message_id"])
+    )
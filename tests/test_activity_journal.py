@@ -0,0 +1,78 @@
+import asyncio
+import atexit
+import importlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import activity_store
+from activity_journal import ActivityJournal
+from activity_stats import ActivityTable
+
+
+@pytest.fixture
+def fresh_badges():
+    """Import cogs.badges as the bot would at startup, against the current directory."""
+    def load():
+        if activity_store._conn is not None:
+            activity_store._conn.close()
+            activity_store._conn = None
+        sys.modules.pop("cogs.badges", None)
+        module = importlib.import_module("cogs.badges")
+        loaded.append(module)
+        return module
+
+    loaded = []
+    yield load
+    for module in loaded:
+        atexit.unregister(module._flush_activity_on_exit)
+        module.JOURNAL.close()
+    if activity_store._conn is not None:
+        activity_store._conn.close()
+        activity_store._conn = None
+
+
+def _restart() -> ActivityTable:
+    if activity_store._conn is not None:
+        activity_store._conn.close()
+        activity_store._conn = None
+    activity = ActivityTable(activity_store.load_activity())
+    journal = ActivityJournal()
+    journal.replay(activity)
+    journal.close()
+    return activity
+
+
+def test_replayed_changes_survive_the_first_flush(fresh_badges):
+    # Crash: user 1's change reached the journal but never the database.
+    journal = ActivityJournal()
+    journal.append(1, "wins", 5)
+    journal.sync()
+    journal.close()
+
+    badges = fresh_badges()
+    assert badges.ACTIVITY[1].wins == 5
+
+    # Only user 2 changes after startup; the flush rotates every old segment.
+    stats = badges.ACTIVITY.get_or_create(2)
+    badges._set_stat(SimpleNamespace(id=2), stats, "wins", 1)
+    badges._last_activity_save = 0
+    asyncio.run(badges._flush_activity_background())
+    badges.JOURNAL.close()
+
+    activity = _restart()
+    assert activity[1].wins == 5
+    assert activity[2].wins == 1
+
+
+def test_replay_returns_touched_users():
+    journal = ActivityJournal()
+    journal.append(1, "wins", 5)
+    journal.append(3, "gmv", 100)
+    journal.append(1, "chat_msgs", 7)
+    journal.close()
+
+    activity = ActivityTable()
+    assert ActivityJournal().replay(activity) == {1, 3}
+    assert activity[1].chat_msgs == 7
@@ -0,0 +1,130 @@
+import asyncio
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, retry_async
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_probes_once_and_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 1
+    assert not breaker.allow() and not breaker.probe_due
+
+    clock.now += 30
+    assert breaker.probe_due
+    assert breaker.allow()  # the probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    assert breaker.rejected == 2
+
+    assert breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens_for_another_timeout(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 2
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+class Transient(Exception):
+    def __init__(self, retry_after=None):
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+def _flaky(errors):
+    calls = []
+
+    async def call():
+        calls.append(None)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return call, calls
+
+
+def test_retry_waits_for_retry_after_capped_at_max_delay(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(circuit_breaker.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(circuit_breaker.random, "uniform", lambda a, b: b / 2)
+    call, calls = _flaky([Transient(), Transient(retry_after=7), Transient(retry_after=60)])
+
+    result = asyncio.run(
+        retry_async(call, attempts=4, base_delay=1.0, max_delay=10.0, retry_on=(Transient,))
+    )
+    assert result == "ok" and len(calls) == 4
+    # jittered backoff, then the server's longer Retry-After, capped at max_delay
+    assert sleeps == [0.5, 7.0, 10.0]
+
+
+def test_retry_gives_up_after_the_last_attempt(monkeypatch):
+    async def fake_sleep(delay):
+        pass
+
+    monkeypatch.setattr(circuit_breaker.asyncio, "sleep", fake_sleep)
+    call, calls = _flaky([Transient(), Transient()])
+    with pytest.raises(Transient):
+        asyncio.run(retry_async(call, attempts=2, base_delay=1.0, max_delay=10.0, retry_on=(Transient,)))
+    assert len(calls) == 2
+
+
+def test_deferred_wins_wait_for_the_probe_then_requeue(clock):
+    import cogs.wins_ai as wins_ai
+
+    cog = wins_ai.WinsAICog(SimpleNamespace(user=SimpleNamespace(id=99)))
+    cog._breaker = CircuitBreaker("openai", failure_threshold=1, reset_timeout=30)
+    cog._deferred = deque(["a", "b", "c"])
+    submitted = []
+    cog._queue.submit = submitted.append
+
+    def tick():
+        asyncio.run(cog.retry_deferred.coro(cog))
+
+    cog._breaker.record_failure()
+    tick()
+    assert submitted == []  # open: nothing goes out
+
+    clock.now += 30
+    tick()
+    assert submitted == ["a"]  # one message as the half-open probe
+    assert cog._breaker.allow()  # the probe's own call
+    tick()
+    assert submitted == ["a"]  # no more while the probe is in flight
+
+    cog._breaker.record_success()
+    tick()
+    assert submitted == ["a", "b", "c"] and not cog._deferred
@@ -0,0 +1,52 @@
+import random
+from types import SimpleNamespace
+
+from rank_engine import BADGE_ORDER, RankEngine, Threshold
+
+ROLE_IDS = {key: 100 + i for i, key in enumerate(BADGE_ORDER)}
+GOLD = dict(chat_msgs=100, wins=5)
+DIAMOND = dict(chat_msgs=500, wins=20, gmv=10_000)
+PLATINUM = dict(chat_msgs=1_000, wins=50, gmv=50_000)
+
+
+def _legacy_check(roles, chat_msgs, wins, gmv):
+    """The per-message evaluation RankEngine replaced."""
+    badge_by_id = {v: k for k, v in ROLE_IDS.items()}
+    current = next((badge_by_id[r.id] for r in roles if r.id in badge_by_id), None)
+    best, best_idx = None, BADGE_ORDER.index(current) if current else -1
+    for key, t in (("gold", GOLD), ("diamond", DIAMOND), ("platinum", PLATINUM)):
+        met = (
+            chat_msgs >= t["chat_msgs"] and wins >= t["wins"] and gmv >= t.get("gmv", 0)
+        )
+        if met and BADGE_ORDER.index(key) > best_idx:
+            best, best_idx = key, BADGE_ORDER.index(key)
+    return best
+
+
+def test_gated_decisions_match_the_per_message_check():
+    engine = RankEngine(
+        [Threshold("gold", **GOLD), Threshold("diamond", **DIAMOND), Threshold("platinum", **PLATINUM)],
+        ROLE_IDS,
+    )
+    rng = random.Random(3)
+    upgrades = 0
+    for user_id in range(40):
+        start = rng.choice([None, "bronze", "silver", "diamond"])
+        member = SimpleNamespace(
+            id=user_id, roles=[SimpleNamespace(id=ROLE_IDS[start])] if start else []
+        )
+        stats = SimpleNamespace(chat_msgs=0, wins=0, gmv=0)
+        for _ in range(1_500):
+            stats.chat_msgs += 1
+            if rng.random() < 0.05:
+                stats.wins += 1
+            if rng.random() < 0.05:
+                stats.gmv += rng.randrange(2_000)
+
+            expected = _legacy_check(member.roles, stats.chat_msgs, stats.wins, stats.gmv)
+            got = engine.evaluate(member, stats) if engine.needs_check(member.id, stats) else None
+            assert got == expected
+            if got:
+                upgrades += 1
+                member.roles = [SimpleNamespace(id=ROLE_IDS[got])]
+    assert upgrades > 20
@@ -0,0 +1,26 @@
+import random
+
+import ranked_index
+from ranked_index import RankedIndex
+
+
+def test_rank_and_page_match_a_full_sort(monkeypatch):
+    monkeypatch.setattr(ranked_index, "_LOAD", 4)  # force many splits and empty buckets
+    rng = random.Random(7)
+    values = {uid: rng.randrange(0, 50) for uid in range(200)}
+    index = RankedIndex(values)
+
+    for step in range(3000):
+        uid = rng.randrange(300)
+        values[uid] = rng.randrange(0, 50) if step % 3 else 0
+        index.update(uid, values[uid])
+
+        if step % 100 == 0:
+            expected = sorted((-v, uid) for uid, v in values.items() if v > 0)
+            assert len(index) == len(expected)
+            for pos, (_, uid) in enumerate(expected):
+                assert index.rank(uid) == pos + 1
+            for start in (0, 1, 7, len(expected) - 3, len(expected)):
+                page = [(uid, -neg) for neg, uid in expected[start:start + 10]]
+                assert index.page(start, 10) == page
+    assert index.rank(10_000) is None
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import rate_limiter
+from rate_limiter import Budget, RateLimiter
+
+
+def _limiter(**kwargs):
+    return RateLimiter(
+        [Budget("user_calls", "calls", capacity=2, period=60)],
+        shared=[Budget("tokens", "tokens", capacity=1_000, period=100)],
+        **kwargs,
+    )
+
+
+def test_buckets_refill_over_the_period():
+    limiter = _limiter()
+    assert limiter.acquire(1, {"calls": 1}, now=0.0)
+    assert limiter.acquire(1, {"calls": 1}, now=0.0)
+    assert limiter.acquire(1, {"calls": 1}, now=10.0) is None  # 1/6 of a call back
+    assert limiter.denied["user_calls"] == 1
+    assert limiter.acquire(1, {"calls": 1}, now=30.0)  # half the period: one call back
+    assert limiter.acquire(2, {"calls": 1}, now=30.0)  # other keys have their own bucket
+
+
+def test_denial_charges_nothing():
+    limiter = _limiter()
+    assert limiter.acquire(1, {"calls": 1, "tokens": 900}, now=0.0)
+    assert limiter.acquire(2, {"calls": 1, "tokens": 200}, now=0.0) is None  # shared budget short
+    assert limiter.acquire(2, {"calls": 2}, now=0.0)  # key 2's calls were not charged
+    assert limiter.denied == {"user_calls": 0, "tokens": 1}
+
+
+def test_refund_gives_the_reservation_back():
+    limiter = _limiter()
+    first = limiter.acquire(1, {"calls": 1, "tokens": 600}, now=0.0)
+    limiter.refund(first, now=0.0)
+    assert first.charges == []
+    assert limiter.acquire(1, {"calls": 2, "tokens": 1_000}, now=0.0)
+    assert limiter.acquire(1, {"calls": 1}, now=0.0) is None
+
+
+def test_refund_never_overfills_and_drops_full_buckets():
+    limiter = _limiter()
+    reservation = limiter.acquire(1, {"calls": 1}, now=0.0)
+    assert len(limiter) == 1
+    limiter.refund(reservation, now=50.0)  # already refilled most of the way
+    assert len(limiter) == 0
+    assert limiter.acquire(1, {"calls": 2}, now=50.0)
+    assert limiter.acquire(1, {"calls": 1}, now=50.0) is None
+
+
+def test_oversized_cost_is_capped_at_capacity():
+    limiter = _limiter()
+    assert limiter.acquire(None, {"tokens": 5_000}, now=0.0)  # capped to a full bucket
+    assert limiter.acquire(None, {"tokens": 5_000}, now=50.0) is None
+    assert limiter.acquire(None, {"tokens": 5_000}, now=100.0)
+
+
+def test_full_buckets_expire_from_memory():
+    limiter = _limiter()
+    limiter.acquire(1, {"calls": 1}, now=0.0)
+    limiter.acquire(2, {"calls": 1}, now=0.0)
+    assert len(limiter) == 2
+    limiter.acquire(3, {"calls": 0}, now=31.0)  # both refilled by t=30
+    assert len(limiter) == 0
+
+
+def test_snapshot_resumes_with_downtime_refill(monkeypatch):
+    path = Path("limiter.json")
+    limiter = _limiter(path=path)
+    limiter.acquire(1, {"calls": 2}, now=1_000.0)
+    limiter.save()
+
+    monkeypatch.setattr(rate_limiter.time, "time", lambda: 1_030.0)
+    restored = _limiter(path=path)
+    assert not restored.dirty
+    assert restored.acquire(1, {"calls": 1}, now=1_030.0)
+    assert restored.acquire(1, {"calls": 1}, now=1_030.0) is None
@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import cogs.reactions as reactions
+from cooldowns import CooldownStore
+from store import BindingTable, CompiledBinding
+
+MESSAGE_ID, GUILD_ID, CHANNEL_ID, USER_ID = 100, 200, 300, 400
+
+
+def _setup(monkeypatch, queue_accepts: bool, role_id=None):
+    record = {
+        "message_id": str(MESSAGE_ID), "brand": "Acme", "form": "https://forms.example/acme",
+        "guild_id": str(GUILD_ID), "channel_id": str(CHANNEL_ID), "emoji": "ANY",
+        "kind": "form", "role_id": str(role_id) if role_id else None,
+    }
+    monkeypatch.setattr(reactions, "binding_table", lambda: BindingTable([record]))
+    cooldowns = CooldownStore()
+    monkeypatch.setattr(reactions, "COOLDOWNS", cooldowns)
+    cog = reactions.ReactionsCog(SimpleNamespace(user=SimpleNamespace(id=1)))
+    submitted = []
+
+    def submit(job):
+        submitted.append(job)
+        return queue_accepts
+
+    cog._dm_queue.submit = submit
+    return cog, cooldowns, submitted
+
+
+def _react():
+    return SimpleNamespace(
+        message_id=MESSAGE_ID, user_id=USER_ID, guild_id=GUILD_ID, channel_id=CHANNEL_ID,
+        emoji=discord.PartialEmoji(name="✅"),
+    )
+
+
+def test_queued_form_starts_cooldown(monkeypatch):
+    cog, cooldowns, submitted = _setup(monkeypatch, queue_accepts=True)
+    asyncio.run(cog.on_raw_reaction_add(_react()))
+    asyncio.run(cog.on_raw_reaction_add(_react()))
+    assert len(submitted) == 1
+    assert cooldowns.active(reactions.COOLDOWN_SCOPE, (MESSAGE_ID, USER_ID))
+
+
+def test_full_queue_does_not_start_cooldown(monkeypatch):
+    cog, cooldowns, submitted = _setup(monkeypatch, queue_accepts=False)
+    asyncio.run(cog.on_raw_reaction_add(_react()))
+    assert not cooldowns.active(reactions.COOLDOWN_SCOPE, (MESSAGE_ID, USER_ID))
+    asyncio.run(cog.on_raw_reaction_add(_react()))
+    assert len(submitted) == 2
+
+
+def test_form_dm_is_queued_without_waiting_for_the_role_edit(monkeypatch):
+    role = SimpleNamespace(id=500)
+    cog, cooldowns, submitted = _setup(monkeypatch, queue_accepts=True, role_id=role.id)
+    guild = SimpleNamespace(id=GUILD_ID, get_role=lambda role_id: role)
+
+    async def lookup_guild(guild_id):
+        return guild
+
+    async def lookup_member(guild, user_id):
+        return SimpleNamespace(id=user_id, guild=guild)
+
+    cog.bot.resolver = SimpleNamespace(guild=lookup_guild, member=lookup_member)
+    changes = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow_change(member, add=(), remove=(), reason=""):
+            await release.wait()
+            changes.append([r.id for r in add])
+
+        monkeypatch.setattr(reactions.ROLE_QUEUE, "change", slow_change)
+        await cog.on_raw_reaction_add(_react())
+        assert len(submitted) == 1 and changes == []
+        assert cooldowns.active(reactions.COOLDOWN_SCOPE, (MESSAGE_ID, USER_ID))
+        release.set()
+        await asyncio.gather(*cog._role_tasks)
+
+    asyncio.run(run())
+    assert changes == [[500]]
+
+
+def test_custom_emoji_binding_matches_the_full_form_only():
+    binding = CompiledBinding({"message_id": "1", "emoji": "<:deal:123>"})
+    assert binding.accepts_emoji(discord.PartialEmoji(name="deal", id=123))
+    assert not binding.accepts_emoji(discord.PartialEmoji(name="deal", id=456))
+    assert not binding.accepts_emoji(discord.PartialEmoji(name="deal"))
+    assert CompiledBinding({"message_id": "1", "emoji": "ANY"}).accepts_emoji(
+        discord.PartialEmoji(name="✅️")
+    )
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import resolver
+from resolver import Resolver
+
+
+class FakeBot:
+    def __init__(self, cached=()):
+        self.cached = set(cached)  # user IDs discord.py's own cache has
+        self.fetches = []
+        self.release: asyncio.Event | None = None
+        self.fail = False
+
+    def get_user(self, user_id):
+        return SimpleNamespace(id=user_id, source="gateway") if user_id in self.cached else None
+
+    async def fetch_user(self, user_id):
+        self.fetches.append(user_id)
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail:
+            raise LookupError(user_id)
+        return SimpleNamespace(id=user_id, source="rest")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(resolver.time, "monotonic", lambda: clock.now)
+    return clock
+
+
+def test_gateway_cache_is_used_before_rest(clock):
+    bot = FakeBot(cached={1})
+    res = Resolver(bot, max_entries=10, ttl=60)
+    assert asyncio.run(res.user(1)).source == "gateway"
+    assert bot.fetches == [] and len(res) == 0
+    assert res.stats["user"].gateway == 1
+
+
+def test_fetched_objects_expire_after_ttl(clock):
+    bot = FakeBot()
+    res = Resolver(bot, max_entries=10, ttl=60)
+    first = asyncio.run(res.user(1))
+    clock.now += 59
+    assert asyncio.run(res.user(1)) is first
+    clock.now += 1
+    assert asyncio.run(res.user(1)) is not first
+    assert bot.fetches == [1, 1]
+    stats = res.stats["user"]
+    assert (stats.cached, stats.fetched) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    bot = FakeBot()
+    res = Resolver(bot, max_entries=2, ttl=60)
+
+    async def run():
+        await res.user(1)
+        await res.user(2)
+        await res.user(1)  # 2 is now the least recently used
+        await res.user(3)
+        await res.user(1)
+        await res.user(2)
+
+    asyncio.run(run())
+    assert bot.fetches == [1, 2, 3, 2]
+    assert len(res) == 2
+
+
+def test_forget_drops_a_cached_object(clock):
+    bot = FakeBot()
+    res = Resolver(bot, max_entries=10, ttl=60)
+    asyncio.run(res.user(1))
+    res.forget("user", 1)
+    asyncio.run(res.user(1))
+    assert bot.fetches == [1, 1]
+
+
+def test_concurrent_misses_share_one_fetch(clock):
+    bot = FakeBot()
+    res = Resolver(bot, max_entries=10, ttl=60)
+
+    async def run():
+        bot.release = asyncio.Event()
+        lookups = [asyncio.create_task(res.user(1)) for _ in range(5)]
+        await asyncio.sleep(0)
+        bot.release.set()
+        return await asyncio.gather(*lookups)
+
+    users = asyncio.run(run())
+    assert bot.fetches == [1]
+    assert all(u is users[0] for u in users)
+    stats = res.stats["user"]
+    assert (stats.fetched, stats.shared) == (1, 4)
+    assert stats.hit_rate == pytest.approx(0.8)
+
+
+def test_failed_fetch_is_shared_but_not_cached(clock):
+    bot = FakeBot()
+    bot.fail = True
+    res = Resolver(bot, max_entries=10, ttl=60)
+
+    async def run():
+        bot.release = asyncio.Event()
+        lookups = [asyncio.create_task(res.user(1)) for _ in range(3)]
+        await asyncio.sleep(0)
+        bot.release.set()
+        return await asyncio.gather(*lookups, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, LookupError) for r in results)
+    assert bot.fetches == [1] and res.stats["user"].errors == 1
+
+    bot.fail = False
+    bot.release = None
+    assert asyncio.run(res.user(1)).source == "rest"
+    assert bot.fetches == [1, 1] and len(res) == 1
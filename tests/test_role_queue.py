@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+from config import TRUSTED_USER_IDS
+from role_queue import RoleQueue
+
+GUILD_ID = 1
+
+
+class FakeGuild:
+    id = GUILD_ID
+
+    def __init__(self, live_roles, cached=True):
+        self.live_roles = live_roles  # role IDs as Discord has them
+        self.cached = cached  # whether the gateway cache has the member
+        self.fail_edits = 0
+        self.edits = []
+        self.fetches = 0
+
+    def get_role(self, role_id):
+        return SimpleNamespace(id=role_id)
+
+    def get_member(self, user_id):
+        return FakeMember(self, user_id, self.live_roles) if self.cached else None
+
+    async def fetch_member(self, user_id):
+        self.fetches += 1
+        return FakeMember(self, user_id, self.live_roles)
+
+
+class FakeMember:
+    def __init__(self, guild, user_id, role_ids):
+        self.guild = guild
+        self.id = user_id
+        self.roles = [SimpleNamespace(id=rid) for rid in role_ids]
+
+    async def edit(self, roles, reason=None):
+        if self.guild.fail_edits:
+            self.guild.fail_edits -= 1
+            raise discord.HTTPException(SimpleNamespace(status=500, reason="Server Error"), "boom")
+        self.guild.edits.append(sorted(r.id for r in roles))
+        self.guild.live_roles = [r.id for r in roles]
+
+
+def _change(member, add=(), remove=()):
+    async def run():
+        queue = RoleQueue(coalesce_delay=0, min_interval=0)
+        await queue.change(
+            member,
+            add=[SimpleNamespace(id=rid) for rid in add],
+            remove=[SimpleNamespace(id=rid) for rid in remove],
+        )
+
+    asyncio.run(run())
+
+
+def test_edit_starts_from_the_gateway_member_without_fetching():
+    guild = FakeGuild(live_roles=[10, 30])  # staff added 30 and removed 20 meanwhile
+    stale = FakeMember(guild, 5, [10, 20])
+
+    _change(stale, add=[40], remove=[10])
+    assert guild.edits == [[30, 40]]
+    assert guild.fetches == 0
+
+
+def test_edit_uses_the_passed_member_when_not_in_the_gateway_cache():
+    guild = FakeGuild(live_roles=[10, 30], cached=False)
+    passed = FakeMember(guild, 5, [10, 20])
+
+    _change(passed, add=[40], remove=[10])
+    assert guild.edits == [[20, 40]]
+    assert guild.fetches == 0
+
+
+def test_failed_edit_is_retried_once_with_a_fetched_member():
+    guild = FakeGuild(live_roles=[10, 30], cached=False)
+    guild.fail_edits = 1
+    stale = FakeMember(guild, 5, [10, 20])
+
+    _change(stale, add=[40], remove=[10])
+    assert guild.edits == [[30, 40]]
+    assert guild.fetches == 1
+
+
+def test_setbadge_defers_before_waiting_on_the_role_queue(monkeypatch):
+    import cogs.admin as admin
+    import cogs.badges as badges
+
+    calls = []
+
+    async def slow_assign(member, badge, reason=""):
+        calls.append("assign")
+
+    monkeypatch.setattr(badges, "assign_badge", slow_assign)
+
+    class Response:
+        async def defer(self, ephemeral=False):
+            calls.append("defer")
+
+        async def send_message(self, *args, **kwargs):
+            calls.append("send_message")
+
+    class Followup:
+        async def send(self, *args, **kwargs):
+            calls.append("followup")
+
+    interaction = SimpleNamespace(
+        user=SimpleNamespace(id=TRUSTED_USER_IDS[0]), response=Response(), followup=Followup()
+    )
+    user = SimpleNamespace(id=5, mention="<@5>")
+    cog = admin.Admin(SimpleNamespace())
+    asyncio.run(cog.setbadge.callback(cog, interaction, user, "gold"))
+    assert calls == ["defer", "assign", "followup"]
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import cogs.reactions as reactions
+import store
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    def reset():
+        if store._conn is not None:
+            store._conn.close()
+            store._conn = None
+        store._BY_MESSAGE.clear()
+        store._BY_GUILD.clear()
+        store._BY_CHANNEL.clear()
+        store._TABLE = store.BindingTable()
+
+    reset()
+    yield
+    reset()
+
+
+def test_binding_table_is_updated_in_place():
+    table = store.binding_table()
+    store.upsert_binding(1, "Acme", "https://forms.example/acme", 10, 20)
+    store.upsert_binding(2, "Beta", "", 10, 21, emoji="🔥", role_id=30)
+    assert store.binding_table() is table
+    assert set(table.message_ids) == {1, 2}
+    assert table.get(2).role_id == 30
+
+    store.upsert_binding(2, "Beta", "", 10, 21, emoji="✅")
+    assert table.get(2).role_id is None and table.get(2).accepts == "✅"
+
+    store.remove_binding(1)
+    assert 1 not in table.message_ids and table.get(1) is None
+    assert len(table) == 1
+
+
+def test_guild_and_channel_indexes_follow_upserts_and_removals():
+    store.upsert_binding(1, "Acme", "", 10, 20)
+    store.upsert_binding(2, "Beta", "", 10, 21)
+    store.upsert_binding(3, "Anywhere", "", None, None)
+    assert [b["message_id"] for b in store.list_bindings_for_guild(10)] == ["1", "2", "3"]
+    assert [b["message_id"] for b in store.list_bindings_for_guild(11)] == ["3"]
+
+    store.upsert_binding(2, "Beta", "", 11, 22)  # moved to another guild and channel
+    assert [b["message_id"] for b in store.list_bindings_for_guild(10)] == ["1", "3"]
+    assert store.list_bindings_for_channel(21) == []
+    assert [b["brand"] for b in store.list_bindings_for_channel(22)] == ["Beta"]
+
+    assert store.remove_bindings([1, 3, 99]) == 2
+    assert store._BY_GUILD.keys() == {"11"} and store._BY_CHANNEL.keys() == {"22"}
+
+
+def test_indexes_reload_from_sqlite():
+    store.upsert_binding(1, "Acme", "https://forms.example/acme", 10, 20, role_id=30)
+    store.upsert_binding(2, "Beta", "", 10, 21)
+    store.remove_binding(2)
+    before = store.load_bindings()
+
+    store._conn.close()
+    store._conn = None
+    store._BY_MESSAGE.clear()
+    store._BY_GUILD.clear()
+    store._BY_CHANNEL.clear()
+    store._TABLE = store.BindingTable()
+
+    assert store.load_bindings() == before
+    assert store.find_binding(1)["role_id"] == "30"
+    assert set(store.binding_table().message_ids) == {1}
+
+
+def test_deleted_messages_are_pruned_by_the_reactions_listeners():
+    for message_id in (1, 2, 3, 4):
+        store.upsert_binding(message_id, "Acme", "", 10, 20)
+    cog = reactions.ReactionsCog(SimpleNamespace(user=SimpleNamespace(id=1)))
+
+    asyncio.run(cog.on_raw_message_delete(SimpleNamespace(message_id=1)))
+    asyncio.run(cog.on_raw_message_delete(SimpleNamespace(message_id=99)))
+    asyncio.run(cog.on_raw_bulk_message_delete(SimpleNamespace(message_ids={2, 3, 98})))
+
+    assert set(store.binding_table().message_ids) == {4}
+    assert [b["message_id"] for b in store.list_bindings_for_channel(20)] == ["4"]
+    assert store._conn.execute("SELECT message_id FROM bindings").fetchall() == [(4,)]
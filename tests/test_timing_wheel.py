@@ -0,0 +1,40 @@
+from timing_wheel import TimingWheel
+
+
+def test_past_deadline_expires_on_next_advance():
+    wheel = TimingWheel(resolution=1.0, slots=8)
+    wheel.advance(100.0)
+    wheel.schedule("late", 95.0)  # slot the cursor has already passed
+    assert wheel.advance(100.5) == ["late"]
+    assert len(wheel) == 0
+
+
+def test_past_deadline_before_first_advance():
+    wheel = TimingWheel(resolution=1.0, slots=8)
+    wheel.schedule("late", 50.0)
+    assert wheel.advance(100.0) == ["late"]
+
+
+def test_key_due_later_in_last_visited_tick():
+    wheel = TimingWheel(resolution=1.0, slots=8)
+    wheel.schedule("a", 100.5)
+    assert wheel.advance(100.1) == []
+    assert wheel.advance(101.2) == ["a"]
+
+
+def test_cancel_clamped_key():
+    wheel = TimingWheel(resolution=1.0, slots=8)
+    wheel.advance(100.0)
+    wheel.schedule("late", 95.0)
+    wheel.cancel("late")
+    assert "late" not in wheel
+    assert wheel.advance(101.0) == []
+
+
+def test_far_deadline_survives_revolutions():
+    wheel = TimingWheel(resolution=1.0, slots=8)
+    wheel.advance(0.0)
+    wheel.schedule("far", 20.0)
+    assert wheel.advance(10.0) == []
+    assert wheel.deadline("far") == 20.0
+    assert wheel.advance(20.0) == ["far"]
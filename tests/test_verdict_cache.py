@@ -0,0 +1,33 @@
+import verdict_cache
+from verdict_cache import VerdictCache
+
+PHASH = 0x0F0F_F0F0_1234_5678
+
+
+def _cache(ttl=3600.0):
+    return VerdictCache(max_entries=10, ttl=ttl, max_distance=6)
+
+
+def test_exact_image_reuses_verdict():
+    cache = _cache()
+    cache.put("a" * 64, PHASH, True, "big payout")
+    assert cache.get("a" * 64, PHASH) == {"is_big_win": True, "reasoning": "big payout"}
+    assert cache.exact_hits == 1
+
+
+def test_near_duplicate_is_classified_again():
+    cache = _cache()
+    cache.put("a" * 64, PHASH, True, "THC Circle LLC $400")
+    # One bit apart: could be a different sender or amount.
+    assert cache.get("b" * 64, PHASH ^ 1) is None
+    assert (cache.misses, cache.near_matches, cache.exact_hits) == (1, 1, 0)
+
+
+def test_expired_exact_entry_is_a_miss(monkeypatch):
+    cache = _cache(ttl=60)
+    cache.put("a" * 64, PHASH, True, "big payout")
+    real_time = verdict_cache.time.time
+    monkeypatch.setattr(verdict_cache.time, "time", lambda: real_time() + 120)
+    assert cache.get("a" * 64, PHASH) is None
+    assert (cache.misses, cache.near_matches) == (1, 0)
+    assert cache.get("a" * 64, PHASH) is None  # and it was dropped
@@ -0,0 +1,17 @@
+from weekly_counters import WeeklyCounters, iso_week
+
+
+def test_take_covers_the_current_week_and_restore_puts_it_back():
+    counters = WeeklyCounters({"weeks": {"2000-W01": {"wins": {"5": 2}, "chat_msgs": {"5": 3}}}})
+    counters.record("wins", 5)
+    counters.record("chat_msgs", 6)
+
+    summary = counters.take()
+    assert summary["wins"] == {5: 3}
+    assert summary["chat_msgs"] == {5: 3, 6: 1}
+    assert counters.summarize()["wins"] == {}
+
+    counters.record("wins", 5)
+    counters.restore(summary)  # the post failed
+    assert counters.summarize()["wins"] == {5: 4}
+    assert list(counters.to_dict()["weeks"]) == [iso_week()]
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+
+import cogs.wins_ai as wins_ai
+from config import WINS_CHANNEL_ID
+from message_router import MessageRouter
+
+
+def _message(channel_id: int, filenames):
+    channel = discord.TextChannel.__new__(discord.TextChannel)
+    channel.id = channel_id
+    return SimpleNamespace(
+        id=1,
+        author=SimpleNamespace(id=2, bot=False),
+        content="",
+        channel=channel,
+        mentions=[],
+        attachments=[SimpleNamespace(filename=f, content_type=None) for f in filenames],
+    )
+
+
+def test_cog_loads_and_queues_wins_screenshots(monkeypatch):
+    monkeypatch.setattr(wins_ai, "OPENAI_API_KEY", "test")
+
+    async def run():
+        bot = SimpleNamespace(user=SimpleNamespace(id=99))
+        bot.router = MessageRouter(bot)
+        cog = wins_ai.WinsAICog(bot)
+        await cog.cog_load()
+        try:
+            submitted = []
+            cog._queue.submit = submitted.append
+            await bot.router.dispatch(_message(WINS_CHANNEL_ID, ["payout.png"]))
+            await bot.router.dispatch(_message(WINS_CHANNEL_ID, ["notes.txt"]))
+            await bot.router.dispatch(_message(WINS_CHANNEL_ID + 1, ["payout.png"]))
+            return submitted, bot.router.stats["wins_ai"]
+        finally:
+            await cog.cog_unload()
+
+    submitted, stats = asyncio.run(run())
+    assert stats.errors == 0
+    assert len(submitted) == 1
+    message, images, _ = submitted[0]
+    assert [a.filename for a in images] == ["payout.png"]
+
+
+def test_cascade_escalates_when_the_fast_pass_gives_no_verdict(monkeypatch):
+    monkeypatch.setattr(wins_ai, "WINS_AI_CASCADE_ENABLED", True)
+    cog = wins_ai.WinsAICog(SimpleNamespace(user=SimpleNamespace(id=99)))
+    cog._batcher = None
+    calls = []
+
+    async def classify(image_urls, caption, message_id=None, fast=False):
+        calls.append(fast)
+        return None if fast else {"is_big_win": True, "reasoning": "payout", "confidence": 0.9}
+
+    cog._classify_images = classify
+    result = asyncio.run(cog._classify_message(["https://cdn.example/a.png"], "", 1))
+    assert calls == [True, False]
+    assert result["is_big_win"]
+    assert cog._metrics.counters["escalations"] == 1
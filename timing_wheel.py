@@ -0,0 +1,79 @@
+"""Hashed timing wheel for expiring many keys cheaply.
+
+Keys are scheduled at an absolute deadline and hashed into one of ``slots``
+buckets, each ``resolution`` seconds wide. ``advance(now)`` only visits the
+buckets the clock has passed since the last call, so expiring idle entries
+costs time proportional to the entries that are due (plus deadlines more
+than one revolution out, which are re-checked and kept), not to the total
+number of keys. Rescheduling a key just moves it to another bucket.
+"""
+
+import math
+from typing import Hashable
+
+
+class TimingWheel:
+    def __init__(self, resolution: float = 1.0, slots: int = 512):
+        self._resolution = resolution
+        self._slots: list[set] = [set() for _ in range(slots)]
+        self._deadlines: dict[Hashable, float] = {}
+        self._ticks: dict[Hashable, int] = {}  # tick of the slot each key sits in
+        self._tick: int | None = None  # last tick advanced to
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key) -> bool:
+        return key in self._deadlines
+
+    def _slot(self, tick: int) -> set:
+        return self._slots[tick % len(self._slots)]
+
+    def schedule(self, key: Hashable, deadline: float):
+        """(Re)schedule ``key`` to expire at ``deadline``. A deadline the wheel
+        has already passed expires on the next ``advance``."""
+        self.cancel(key)
+        tick = math.floor(deadline / self._resolution)
+        if self._tick is not None and tick < self._tick:
+            tick = self._tick  # advance() re-checks the last tick it visited
+        self._deadlines[key] = deadline
+        self._ticks[key] = tick
+        self._slot(tick).add(key)
+
+    def cancel(self, key: Hashable):
+        tick = self._ticks.pop(key, None)
+        if tick is not None:
+            del self._deadlines[key]
+            self._slot(tick).discard(key)
+
+    def deadline(self, key: Hashable) -> float | None:
+        return self._deadlines.get(key)
+
+    def advance(self, now: float) -> list:
+        """Remove and return every key whose deadline is at or before ``now``."""
+        tick = math.floor(now / self._resolution)
+        if self._tick is None:
+            self._tick = tick - len(self._slots)
+        if tick <= self._tick:
+            if not self._slot(tick):
+                return []
+            first = tick  # clock didn't move a full tick: re-check the current slot
+        else:
+            # Start at the last tick visited: it may hold keys that fell due
+            # after that visit. A full revolution visits every slot once.
+            first = max(self._tick, tick - len(self._slots) + 1)
+        self._tick = max(self._tick, tick)
+
+        expired = []
+        for t in range(first, tick + 1):
+            slot = self._slot(t)
+            due = [k for k in slot if self._deadlines[k] <= now]
+            for key in due:
+                slot.discard(key)
+                del self._deadlines[key]
+                del self._ticks[key]
+            expired += due
+        return expired
+
+    def items(self) -> list[tuple[Hashable, float]]:
+        return list(self._deadlines.items())
@@ -0,0 +1,136 @@
+"""On-disk LRU cache of win-classification verdicts keyed by image hash.
+
+Verdicts are only reused for the exact same image bytes (SHA-256). A 64-bit
+perceptual hash of a downsampled screenshot can't tell payouts apart by
+sender or amount, which is exactly what the classification depends on, so a
+stored image within ``max_distance`` bits is only logged as a near-duplicate
+and the new image is still classified. Entries expire after ``ttl`` seconds
+and the least recently used ones are evicted beyond ``max_entries``.
+"""
+
+from pathlib import Path
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger("thcbot")
+
+DB_PATH = Path("data/verdict_cache.db")
+
+
+def _to_signed(h: int) -> int:
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _to_unsigned(h: int) -> int:
+    return h + (1 << 64) if h < 0 else h
+
+
+class VerdictCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        max_distance: int,
+        path: Path = DB_PATH,
+    ):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._max_distance = max_distance
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            " sha256 TEXT PRIMARY KEY,"
+            " phash INTEGER NOT NULL,"
+            " is_big_win INTEGER NOT NULL,"
+            " reasoning TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL"
+            ")"
+        )
+        self._conn.execute(
+            "DELETE FROM verdicts WHERE created_at < ?", (time.time() - self._ttl,)
+        )
+        # sha256 -> (phash, created_at) for the near-duplicate scan
+        self._phashes: dict[str, tuple[int, float]] = {
+            sha: (_to_unsigned(ph), created)
+            for sha, ph, created in self._conn.execute(
+                "SELECT sha256, phash, created_at FROM verdicts"
+            )
+        }
+        self.exact_hits = 0
+        self.near_matches = 0  # misses that looked like a cached image
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.exact_hits + self.misses
+        return self.exact_hits / total if total else 0.0
+
+    def _nearest(self, phash: int, now: float) -> tuple[str | None, int]:
+        best, best_dist = None, self._max_distance + 1
+        for sha, (ph, created) in self._phashes.items():
+            if created < now - self._ttl:
+                continue
+            dist = (ph ^ phash).bit_count()
+            if dist < best_dist:
+                best, best_dist = sha, dist
+        return best, best_dist
+
+    def get(self, sha256: str, phash: int) -> dict | None:
+        now = time.time()
+        entry = self._phashes.get(sha256)
+        if entry is not None and entry[1] < now - self._ttl:
+            self._delete(sha256)
+            entry = None
+        row = None
+        if entry is not None:
+            row = self._conn.execute(
+                "SELECT is_big_win, reasoning FROM verdicts WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            if row is None:
+                self._phashes.pop(sha256, None)
+        if row is None:
+            self.misses += 1
+            near, dist = self._nearest(phash, now)
+            if near is not None:
+                # A hint only: the payout may differ in exactly the fields that matter.
+                self.near_matches += 1
+                logger.info(
+                    "Image %s is %d bits from cached %s; classifying it anyway",
+                    sha256[:12], dist, near[:12],
+                )
+            return None
+
+        self._conn.execute("UPDATE verdicts SET last_used = ? WHERE sha256 = ?", (now, sha256))
+        self.exact_hits += 1
+        return {"is_big_win": bool(row[0]), "reasoning": row[1]}
+
+    def put(self, sha256: str, phash: int, is_big_win: bool, reasoning: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO verdicts "
+            "(sha256, phash, is_big_win, reasoning, created_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (sha256, _to_signed(phash), int(is_big_win), reasoning, now, now),
+        )
+        self._phashes[sha256] = (phash, now)
+        overflow = len(self._phashes) - self._max_entries
+        if overflow > 0:
+            evicted = [
+                sha for (sha,) in self._conn.execute(
+                    "SELECT sha256 FROM verdicts ORDER BY last_used LIMIT ?", (overflow,)
+                )
+            ]
+            for sha in evicted:
+                self._delete(sha)
+
+    def _delete(self, sha256: str):
+        self._conn.execute("DELETE FROM verdicts WHERE sha256 = ?", (sha256,))
+        self._phashes.pop(sha256, None)
+
+    def close(self):
+        self._conn.close()
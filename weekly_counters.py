@@ -0,0 +1,103 @@
+"""In-memory weekly activity counters for the weekly summary.
+
+Counters are bucketed by ISO week (``"2026-W42"``) and only hold users who
+were active that week, so building a summary reads exactly the aggregated
+data it needs and persisting them never copies the whole member table.
+
+A summary covers everything recorded since the previous one — the 7 days
+ending at post time on the weekly schedule, whatever day that falls on —
+so it merges every bucket rather than only completed ISO weeks.
+"""
+
+from datetime import datetime, timezone
+
+COUNTED_FIELDS = ("wins", "chat_msgs")
+
+
+def iso_week(now: datetime | None = None) -> str:
+    year, week, _ = (now or datetime.now(timezone.utc)).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _empty_week() -> dict:
+    return {"wins": {}, "chat_msgs": {}, "members_joined": []}
+
+
+def _merge(into: dict, bucket: dict):
+    for field in COUNTED_FIELDS:
+        counts = into[field]
+        for user_id, n in bucket[field].items():
+            counts[user_id] = counts.get(user_id, 0) + n
+    into["members_joined"].extend(bucket["members_joined"])
+
+
+class WeeklyCounters:
+    def __init__(self, data: dict | None = None):
+        data = data or {}
+        self._weeks: dict[str, dict] = {
+            week: {
+                "wins": {int(k): v for k, v in bucket.get("wins", {}).items()},
+                "chat_msgs": {int(k): v for k, v in bucket.get("chat_msgs", {}).items()},
+                "members_joined": list(bucket.get("members_joined", [])),
+            }
+            for week, bucket in data.get("weeks", {}).items()
+        }
+        # Pre-bucket snapshot files only kept the joins list; carry it over.
+        if data.get("members_joined"):
+            self._bucket()["members_joined"].extend(data["members_joined"])
+        self.snapshot_at: str | None = data.get("snapshot_at")
+        self.dirty = False
+
+    def _bucket(self, now: datetime | None = None) -> dict:
+        week = iso_week(now)
+        bucket = self._weeks.get(week)
+        if bucket is None:
+            bucket = self._weeks[week] = _empty_week()
+        return bucket
+
+    def record(self, field: str, user_id: int, amount: int = 1):
+        counts = self._bucket()[field]
+        counts[user_id] = counts.get(user_id, 0) + amount
+        self.dirty = True
+
+    def record_join(self, user_id: int, name: str):
+        self._bucket()["members_joined"].append({
+            "id": user_id,
+            "name": name,
+            "joined_at": datetime.now(timezone.utc).isoformat(),
+        })
+        self.dirty = True
+
+    def summarize(self) -> dict:
+        """Merge every week recorded since the last summary."""
+        merged = _empty_week()
+        for week in sorted(self._weeks):
+            _merge(merged, self._weeks[week])
+        return merged
+
+    def take(self) -> dict:
+        """``summarize`` and start counting afresh, in one step so nothing
+        recorded while the summary is being posted is lost. Hand the result
+        to ``restore`` if it could not be posted."""
+        merged = self.summarize()
+        self._weeks.clear()
+        self.snapshot_at = datetime.now(timezone.utc).isoformat()
+        self.dirty = True
+        return merged
+
+    def restore(self, summary: dict):
+        _merge(self._bucket(), summary)
+        self.dirty = True
+
+    def to_dict(self) -> dict:
+        return {
+            "weeks": {
+                week: {
+                    "wins": {str(k): v for k, v in bucket["wins"].items()},
+                    "chat_msgs": {str(k): v for k, v in bucket["chat_msgs"].items()},
+                    "members_joined": list(bucket["members_joined"]),
+                }
+                for week, bucket in self._weeks.items()
+            },
+            "snapshot_at": self.snapshot_at,
+        }
@@ -0,0 +1,144 @@
+"""CPU-only pre-filter that keeps obvious non-payouts away from the classifier.
+
+The only thing the model ever says yes to is a PayPal payout screenshot: a
+screen-shaped image that is mostly white/grey/black UI with a few PayPal-blue
+accents. Memes, photos and colourful dashboards fail that test on pixel
+statistics alone. Each image gets a cheap ``Signature`` (aspect ratio, share
+of neutral pixels, share of saturated pixels outside the accent hues) while
+it is already decoded for preprocessing, and ``PreFilter`` rejects images
+that are clearly off. Everything else still goes to the model.
+
+A sampled fraction of rejected messages is sent to the model anyway
+("audited") so the filter's precision and recall can be measured against
+the model's verdicts.
+"""
+
+import logging
+import random
+
+from PIL import Image
+
+logger = logging.getLogger("thcbot")
+
+_SAMPLE_EDGE = 64       # signatures are computed on a thumbnail this size
+_NEUTRAL_SATURATION = 48  # 0-255; below this a pixel counts as grey/white/black
+_DARK_VALUE = 40          # 0-255; below this a pixel counts as black
+
+
+class Signature:
+    __slots__ = ("aspect", "neutral", "off_palette")
+
+    def __init__(self, aspect: float, neutral: float, off_palette: float):
+        self.aspect = aspect
+        self.neutral = neutral
+        self.off_palette = off_palette
+
+    def __repr__(self):
+        return (
+            f"Signature(aspect={self.aspect:.2f}, neutral={self.neutral:.2f}, "
+            f"off_palette={self.off_palette:.2f})"
+        )
+
+
+def signature(img: Image.Image, original_size: tuple[int, int], accent_hues: tuple[int, int]) -> Signature:
+    """Colour signature of an RGB image. ``accent_hues`` is a (low, high) hue range in degrees."""
+    width, height = original_size
+    aspect = max(width, height) / max(1, min(width, height))
+
+    small = img.copy()
+    small.thumbnail((_SAMPLE_EDGE, _SAMPLE_EDGE), Image.Resampling.BILINEAR)
+    hsv = small.convert("HSV")
+    hue, sat, val = (hsv.getchannel(c).tobytes() for c in "HSV")
+
+    lo, hi = (round(deg * 255 / 360) for deg in accent_hues)
+    neutral = off_palette = 0
+    for h, s, v in zip(hue, sat, val):
+        if s < _NEUTRAL_SATURATION or v < _DARK_VALUE:
+            neutral += 1
+        elif not lo <= h <= hi:
+            off_palette += 1
+    total = len(sat) or 1
+    return Signature(aspect, neutral / total, off_palette / total)
+
+
+class PreFilter:
+    def __init__(
+        self,
+        *,
+        max_aspect: float,
+        min_neutral: float,
+        max_off_palette: float,
+        audit_rate: float,
+        report_every: int = 50,
+    ):
+        self.max_aspect = max_aspect
+        self.min_neutral = min_neutral
+        self.max_off_palette = max_off_palette
+        self.audit_rate = audit_rate
+        self._report_every = report_every
+
+        self.passed = 0
+        self.rejected = 0
+        self.audited = 0
+        # Confusion matrix against model verdicts. "Positive" = plausible payout.
+        self.true_pos = 0
+        self.false_pos = 0
+        self.true_neg = 0
+        self.false_neg = 0
+
+    def reject_reason(self, sig: Signature) -> str | None:
+        """Why ``sig`` is clearly not a payout screenshot, or None if it is plausible."""
+        if sig.aspect > self.max_aspect:
+            return f"aspect {sig.aspect:.2f} > {self.max_aspect}"
+        if sig.neutral < self.min_neutral:
+            return f"neutral {sig.neutral:.2f} < {self.min_neutral}"
+        if sig.off_palette > self.max_off_palette:
+            return f"off_palette {sig.off_palette:.2f} > {self.max_off_palette}"
+        return None
+
+    def count(self, plausible: bool):
+        if plausible:
+            self.passed += 1
+        else:
+            self.rejected += 1
+
+    def should_audit(self) -> bool:
+        if random.random() < self.audit_rate:
+            self.audited += 1
+            return True
+        return False
+
+    def record(self, plausible: bool, is_big_win: bool):
+        """Score one pre-filter decision against the model's verdict."""
+        if plausible:
+            if is_big_win:
+                self.true_pos += 1
+            else:
+                self.false_pos += 1
+        elif is_big_win:
+            self.false_neg += 1
+            logger.warning("Win pre-filter rejected an image the model judged a big win.")
+        else:
+            self.true_neg += 1
+
+        scored = self.true_pos + self.false_pos + self.true_neg + self.false_neg
+        if self._report_every and scored % self._report_every == 0:
+            logger.info(
+                "Win pre-filter: passed=%d rejected=%d audited=%d precision=%.2f recall=%.2f",
+                self.passed, self.rejected, self.audited, self.precision, self.recall,
+            )
+
+    @property
+    def precision(self) -> float:
+        flagged = self.true_pos + self.false_pos
+        return self.true_pos / flagged if flagged else 0.0
+
+    @property
+    def recall(self) -> float:
+        """Share of big wins that got past the filter. Audited rejects stand in
+        for all rejects, so missed wins are scaled up by the audit rate."""
+        if self.audit_rate <= 0:
+            return 1.0 if self.true_pos else 0.0
+        missed = self.false_neg / self.audit_rate
+        total = self.true_pos + missed
+        return self.true_pos / total if total else 0.0
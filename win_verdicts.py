@@ -0,0 +1,66 @@
+"""Per-message record of #wins classification verdicts.
+
+Unlike the verdict cache (keyed by image hash, expiring), this is the durable
+answer for each message: what was decided, by which source, and when. Live
+classification and /backfill_wins both write here, which is how a backfill
+knows whether a big win is newly detected.
+"""
+
+from pathlib import Path
+import sqlite3
+import time
+
+DB_PATH = Path("data/win_verdicts.db")
+
+
+class VerdictStore:
+    def __init__(self, path: Path = DB_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS win_verdicts ("
+            " message_id INTEGER PRIMARY KEY,"
+            " channel_id INTEGER NOT NULL,"
+            " author_id INTEGER NOT NULL,"
+            " is_big_win INTEGER NOT NULL,"
+            " reasoning TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " classified_at REAL NOT NULL"
+            ")"
+        )
+
+    def get(self, message_id: int) -> dict | None:
+        row = self._conn.execute(
+            "SELECT is_big_win, reasoning, source, classified_at FROM win_verdicts "
+            "WHERE message_id = ?",
+            (message_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "is_big_win": bool(row[0]),
+            "reasoning": row[1],
+            "source": row[2],
+            "classified_at": row[3],
+        }
+
+    def put(
+        self,
+        message_id: int,
+        channel_id: int,
+        author_id: int,
+        is_big_win: bool,
+        reasoning: str,
+        source: str,
+    ):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO win_verdicts "
+            "(message_id, channel_id, author_id, is_big_win, reasoning, source, classified_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (message_id, channel_id, author_id, int(is_big_win), reasoning, source, time.time()),
+        )
+
+    def close(self):
+        self._conn.close()
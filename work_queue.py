@@ -0,0 +1,95 @@
+"""Bounded asyncio work queue served by a fixed pool of workers.
+
+Producers call ``submit`` from event handlers and return immediately. When
+the queue is full the overflow policy decides what gives: ``"drop_oldest"``
+evicts the longest-waiting item to make room, ``"reject_newest"`` refuses the
+new one. Queue depth, drops and per-item wait time are tracked for metrics.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger("thcbot")
+
+DROP_OLDEST = "drop_oldest"
+REJECT_NEWEST = "reject_newest"
+
+
+class WorkQueue:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Awaitable[None]],
+        *,
+        workers: int,
+        maxsize: int,
+        overflow: str = DROP_OLDEST,
+    ):
+        if overflow not in (DROP_OLDEST, REJECT_NEWEST):
+            raise ValueError(f"Unknown overflow policy {overflow!r}")
+        self.name = name
+        self._handler = handler
+        self._n_workers = workers
+        self._overflow = overflow
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._workers: list[asyncio.Task] = []
+
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def wait_avg(self) -> float:
+        return self.wait_total / self.processed if self.processed else 0.0
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self._n_workers)
+        ]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, item) -> bool:
+        """Enqueue ``item`` without waiting. Returns False if it was rejected."""
+        if self._queue.full():
+            if self._overflow == REJECT_NEWEST:
+                self.rejected += 1
+                logger.warning("%s queue full (%d); rejecting new item", self.name, self.depth)
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+            logger.warning("%s queue full (%d); dropped oldest item", self.name, self.depth + 1)
+        self._queue.put_nowait((time.monotonic(), item))
+        self.submitted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            enqueued_at, item = await self._queue.get()
+            wait = time.monotonic() - enqueued_at
+            self.wait_total += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+            try:
+                await self._handler(item)
+            except Exception:
+                logger.exception("%s worker failed on %r", self.name, item)
+            finally:
+                self.processed += 1
+                self._queue.task_done()